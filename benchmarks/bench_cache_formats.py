@@ -0,0 +1,54 @@
+"""解析結果キャッシュの保存形式 (JSON Lines / SQLite) ごとのファイルサイズと読み込み時間を比較する
+
+使い方 (リポジトリのルートで):
+    python -m benchmarks.bench_cache_formats --jobs 20000 --repeat 3
+
+一時ディレクトリに合成した JSON Lines のキャッシュを作り、convert_cache で SQLite に変換してから、
+形式ごとに解析対象の選定に使う要約の読み込み (load_cache) と全件の読み込み (iter_cache_entries) を計測する。
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+
+from benchmarks.bench_cache_loading import write_synthetic_cache
+from findy_scraper.infrastructure import cache_manager
+
+def _measure(func, repeat: int) -> float:
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations)
+
+def main():
+    parser = argparse.ArgumentParser(description='解析結果キャッシュの保存形式ごとのサイズと読み込み時間を計測します。')
+    parser.add_argument('--jobs', type=int, default=20000, help='合成するキャッシュの件数 (デフォルト: 20000)')
+    parser.add_argument('--repeat', type=int, default=3, help='読み込み方ごとの繰り返し回数 (デフォルト: 3)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    with tempfile.TemporaryDirectory(prefix="findy-cache-formats-") as workdir:
+        # キャッシュのパスは作業ディレクトリからの相対パス
+        os.chdir(workdir)
+        os.makedirs(cache_manager.CACHE_DIR, exist_ok=True)
+        write_synthetic_cache(cache_manager.CACHE_FILE, args.jobs)
+        started = time.perf_counter()
+        if cache_manager.convert_cache(cache_manager.CACHE_FORMAT_SQLITE, keep_source=True) is None:
+            raise SystemExit("SQLite への変換に失敗しました。")
+        convert_sec = time.perf_counter() - started
+
+        print(f"キャッシュ: {args.jobs} 件, {args.repeat} 回の中央値 (JSON Lines -> SQLite の変換: {convert_sec:.2f}秒)")
+        print(f"{'形式':<8} {'サイズ(MB)':>11} {'要約の読み込み(秒)':>18} {'全件の読み込み(秒)':>18}")
+        for fmt in cache_manager.CACHE_FORMATS:
+            os.environ[cache_manager.CACHE_FORMAT_ENV] = fmt
+            size_mb = os.path.getsize(cache_manager.cache_file_path(fmt)) / (1024 * 1024)
+            index_sec = _measure(lambda: cache_manager.load_cache(False), args.repeat)
+            full_sec = _measure(lambda: sum(1 for _ in cache_manager.iter_cache_entries()), args.repeat)
+            print(f"{fmt:<8} {size_mb:>11.1f} {index_sec:>18.3f} {full_sec:>18.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""大きな解析結果キャッシュの読み込み方ごとのピークメモリと所要時間を比較する
+
+使い方 (リポジトリのルートで):
+    python -m benchmarks.bench_cache_loading --jobs 20000
+
+一時ディレクトリに合成したキャッシュを作り、全件をリストで読み込む場合・URLのインデックスだけを作る場合 (load_cache)・
+1件ずつ読み進める場合 (iter_cache_entries) のそれぞれを tracemalloc で計測する。
+"""
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+from findy_scraper.infrastructure import cache_manager
+
+def write_synthetic_cache(path: str, count: int, seed: int = 0):
+    """長い自由記述の項目と、一部に LLM応答 を含む解析結果を count 件書き出す"""
+    rng = random.Random(seed)
+    long_fields = ["主な職務内容", "必須スキル/経験 (要約)", "歓迎スキル/経験 (要約)", "仕事の魅力/アピール内容 (要約)", "求める人物像 (要約)", "福利厚生 (特筆事項)"]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            link = f"https://findy-code.io/companies/{i % 97}/jobs/{i}"
+            entry = {"会社名": f"株式会社サンプル{i}", "URL": link, "元タイトル": f"求人タイトル {i}", "元リンク": link}
+            for field in long_fields:
+                entry[field] = f"{field}の説明文 {i}。" * rng.randint(10, 40)
+            entry[cache_manager.CONTENT_HASH_KEY] = f"{i:064x}"
+            entry["トークン使用量"] = {"prompt_tokens": 3000, "completion_tokens": 600, "total_tokens": 3600}
+            if rng.random() < 0.1:
+                entry["エラー"] = "LLM応答パース失敗"
+                entry["LLM応答"] = "{" + "壊れた応答" * 800
+            f.write(json.dumps(entry, ensure_ascii=False))
+            f.write("\n")
+
+def _measure(func) -> tuple[float, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024), count
+
+def main():
+    parser = argparse.ArgumentParser(description='解析結果キャッシュの読み込み方ごとのピークメモリを計測します。')
+    parser.add_argument('--jobs', type=int, default=20000, help='合成するキャッシュの件数 (デフォルト: 20000)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    with tempfile.TemporaryDirectory(prefix="findy-cache-bench-") as workdir:
+        # キャッシュのパスは作業ディレクトリからの相対パス
+        os.chdir(workdir)
+        os.makedirs(cache_manager.CACHE_DIR, exist_ok=True)
+        write_synthetic_cache(cache_manager.CACHE_FILE, args.jobs)
+        size_mb = os.path.getsize(cache_manager.CACHE_FILE) / (1024 * 1024)
+
+        def stream():
+            return sum(1 for _ in cache_manager.iter_cache_entries())
+
+        cases = [
+            ("全件をリストで読み込み", lambda: len(cache_manager.read_cache_entries())),
+            ("URLのインデックス (load_cache)", lambda: len(cache_manager.load_cache(False))),
+            ("1件ずつ読み込み (iter_cache_entries)", stream),
+        ]
+        print(f"キャッシュ: {args.jobs} 件, {size_mb:.1f} MB")
+        print(f"{'読み込み方':<36} {'件数':>7} {'時間(秒)':>9} {'ピーク(MB)':>11}")
+        for name, func in cases:
+            elapsed, peak_mb, count = _measure(func)
+            print(f"{name:<36} {count:>7} {elapsed:>9.2f} {peak_mb:>11.1f}")
+
+if __name__ == "__main__":
+    main()
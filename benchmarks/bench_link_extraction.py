@@ -0,0 +1,70 @@
+"""いいね一覧のリンク抽出を、要素ごとの取得 (従来) とページ内での一括抽出 (現在) で比較する
+
+使い方 (リポジトリのルートで):
+    python -m benchmarks.bench_link_extraction --links 20 100 --repeat 50
+
+ローカルの Findy スタブが返す一覧ページを読み込み、同じページに対して各方式を repeat 回ずつ実行する。
+"""
+import asyncio
+import logging
+import argparse
+import statistics
+import time
+
+from playwright.async_api import async_playwright
+
+from benchmarks.stub_servers import FindyStub
+from findy_scraper.infrastructure.playwright_handler import JOB_LISTINGS_SELECTOR, _EXTRACT_LINKS_JS
+
+async def legacy_extract(page, selector: str) -> list[dict]:
+    """従来の方式: 要素ごとに text_content / get_attribute を呼ぶ (リンク数×2回の往復)"""
+    raw_links = []
+    for element in await page.query_selector_all(selector):
+        raw_links.append({"title": await element.text_content(), "href": await element.get_attribute('href')})
+    return raw_links
+
+async def _measure(extract, repeat: int) -> tuple[list[float], int]:
+    durations = []
+    link_count = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        link_count = len(await extract())
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations, link_count
+
+async def run(link_counts: list[int], repeat: int):
+    results = []
+    for link_count in link_counts:
+        with FindyStub(link_count, jobs_per_page=link_count) as findy:
+            async with async_playwright() as playwright:
+                browser = await playwright.chromium.launch(headless=True)
+                context = await browser.new_context()
+                await context.add_cookies([{"name": FindyStub.SESSION_COOKIE_NAME, "value": "1", "url": findy.base_url}])
+                page = await context.new_page()
+                await page.goto(f"{findy.base_url}/likes", wait_until='domcontentloaded')
+
+                async def current():
+                    return await page.eval_on_selector_all(JOB_LISTINGS_SELECTOR, _EXTRACT_LINKS_JS)
+
+                async def legacy():
+                    return await legacy_extract(page, JOB_LISTINGS_SELECTOR)
+
+                for name, extract in (("要素ごと (従来)", legacy), ("一括抽出 (現在)", current)):
+                    durations, found = await _measure(extract, repeat)
+                    results.append((link_count, name, found, statistics.median(durations), max(durations)))
+                await browser.close()
+
+    print(f"{'リンク数':>8}  {'方式':<14} {'抽出数':>6} {'中央値(ms)':>10} {'最大(ms)':>9}")
+    for link_count, name, found, median, worst in results:
+        print(f"{link_count:>8}  {name:<14} {found:>6} {median:>10.2f} {worst:>9.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='いいね一覧のリンク抽出方式ごとの所要時間を計測します。')
+    parser.add_argument('--links', type=int, nargs='+', default=[20, 100], help='1ページあたりのリンク数 (デフォルト: 20 100)')
+    parser.add_argument('--repeat', type=int, default=50, help='方式ごとの繰り返し回数 (デフォルト: 50)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(run(args.links, args.repeat))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""求人データからNotionプロパティへの変換を、1件ずつの変換と事前に組み立てた変換手順での一括変換で比較する
+
+使い方 (リポジトリのルートで):
+    python -m benchmarks.bench_property_conversion --jobs 10000 --repeat 5
+
+変更前の変換 (_legacy_convert) はスキーマの参照・型の分岐・Titleプロパティの検索を求人ごとに行う。
+変換手順を使う変換の比較対象 (ベースライン) であり、計測の前に両者の結果が一致することも確かめる。
+"""
+import gc
+import time
+import random
+import logging
+import argparse
+import statistics
+from datetime import datetime
+
+from notion_updater.core.models import DESIRED_PROPERTIES_SCHEMA, PROPERTY_MAP
+from notion_updater.core.notion_formatter import compile_property_plan
+
+# --- 変更前の変換 (PropertyPlan 導入前の notion_formatter から写したもの。比較と正しさの基準に使うため変更しない) ---
+
+def _legacy_format_value(key: str, value, db_properties: dict):
+    prop_config = db_properties.get(key)
+    if not prop_config:
+        logging.warning(f"プロパティ '{key}' のスキーマ情報が見つかりません。フォーマットをスキップします。")
+        return None
+
+    prop_type = prop_config['type']
+
+    if value is None or value == "該当なし":
+        return None # 空の値は設定しない
+
+    try:
+        if prop_type == 'title':
+            return [{"type": "text", "text": {"content": str(value)[:2000]}}]
+        elif prop_type == 'rich_text':
+            return [{"type": "text", "text": {"content": str(value)[:2000]}}]
+        elif prop_type == 'number':
+            if isinstance(value, str):
+                 # 数字、小数点、マイナス記号以外を除去してから変換 (より頑健に)
+                 cleaned_value = ''.join(filter(lambda x: x.isdigit() or x == '.' or (x == '-' and value.startswith('-')), str(value)))
+                 if not cleaned_value: return None
+                 return float(cleaned_value)
+            elif isinstance(value, (int, float)):
+                 return float(value)
+            else:
+                 raise ValueError("Invalid number format")
+        elif prop_type == 'url':
+            # 簡易的なURL形式チェック
+            return str(value) if isinstance(value, str) and value.startswith('http') and len(value) < 2001 else None
+        elif prop_type == 'select':
+            # Select/Multi-selectのoption名は100文字制限
+            return {"name": str(value)[:100]} if value else None
+        elif prop_type == 'multi_select':
+            options = []
+            if isinstance(value, list):
+                options = [{"name": str(v)[:100]} for v in value if v is not None]
+            elif isinstance(value, str):
+                 options = [{"name": v.strip()[:100]} for v in value.split(',') if v.strip()]
+            # Multi-select は空リストでも有効
+            return options
+        elif prop_type == 'date':
+             # スクリプト実行日の日付のみを設定
+             return {"start": datetime.now().strftime('%Y-%m-%d')}
+        elif prop_type == 'checkbox':
+             return bool(value)
+        else:
+            logging.warning(f"未対応または不明なプロパティタイプ '{prop_type}' (プロパティ: {key})。rich_textとして扱います。")
+            return [{"type": "text", "text": {"content": str(value)[:2000]}}]
+    except Exception as e:
+        logging.warning(f"値のフォーマット中にエラー (プロパティ: {key}, タイプ: {prop_type}, 値: {value}): {e}")
+        return None
+
+def _legacy_convert(job_data: dict, db_properties: dict) -> dict:
+    properties = {}
+    for notion_prop, json_key in PROPERTY_MAP.items():
+        # 最終更新日時は特別扱い (JSONに無くても生成)
+        if notion_prop == "最終更新日時":
+            value = datetime.now().strftime('%Y-%m-%d')
+        elif json_key in job_data:
+            value = job_data.get(json_key)
+        else:
+            continue # JSONに対応するキーがなければスキップ
+
+        if notion_prop not in db_properties:
+            logging.warning(f"変換対象のプロパティ '{notion_prop}' がDBスキーマに存在しません。スキップします。")
+            continue
+
+        formatted_value = _legacy_format_value(notion_prop, value, db_properties)
+
+        if formatted_value is not None:
+            prop_type = db_properties[notion_prop]['type']
+            properties[notion_prop] = {prop_type: formatted_value}
+
+    title_prop_name = next((k for k, v in db_properties.items() if v['type'] == 'title'), None)
+    if title_prop_name not in properties:
+        logging.error(f"必須プロパティ '{title_prop_name}' が変換後のデータに含まれていません。")
+    if "URL" not in properties:
+        logging.error("必須プロパティ 'URL' が変換後のデータに含まれていません。")
+    return properties
+
+def synthetic_db_properties() -> dict:
+    """DESIRED_PROPERTIES_SCHEMA どおりに作成済みのデータベースのプロパティ情報"""
+    return {name: {"id": f"p{i}", "name": name, "type": schema["type"]}
+            for i, (name, schema) in enumerate(DESIRED_PROPERTIES_SCHEMA.items())}
+
+def synthetic_jobs(count: int, seed: int = 0) -> list[dict]:
+    """LLMの解析結果に似た求人データ (一部の項目は欠損・該当なし・文字列の数値を含む)"""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        job = {}
+        for json_key in PROPERTY_MAP.values():
+            roll = rng.random()
+            if roll < 0.05:
+                continue
+            if roll < 0.1:
+                job[json_key] = "該当なし"
+            elif json_key.startswith("給与"):
+                job[json_key] = rng.choice([500 + i % 300, f"{600 + i % 200}万円"])
+            elif json_key.startswith("使用技術"):
+                job[json_key] = rng.sample(["Python", "Go", "TypeScript", "AWS", "GCP", "Kubernetes"], 3)
+            else:
+                job[json_key] = f"{json_key}のサンプル値 {i} " * rng.randint(1, 20)
+        job["会社名"] = f"株式会社サンプル{i}"
+        job["URL"] = f"https://findy-code.io/companies/{i % 97}/jobs/{i}"
+        jobs.append(job)
+    return jobs
+
+def _measure(func, repeat: int) -> list[float]:
+    # timeit と同様にGCを止めて計測する (大量の辞書を作るため、GCの実行タイミングで結果が大きくぶれる)
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return durations
+
+def main():
+    parser = argparse.ArgumentParser(description='Notionプロパティへの変換方式ごとの所要時間を計測します。')
+    parser.add_argument('--jobs', type=int, default=10000, help='変換する求人数 (デフォルト: 10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='方式ごとの繰り返し回数 (デフォルト: 5)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    db_properties = synthetic_db_properties()
+    jobs = synthetic_jobs(args.jobs)
+    plan = compile_property_plan(db_properties)
+
+    # 変更前の変換と結果が一致することを確認してから計測する (型ごとの期待値は check_property_plan で照合する)
+    if [_legacy_convert(job, db_properties) for job in jobs] != plan.convert_all(jobs):
+        raise SystemExit("変換結果が変更前の変換と一致しません。")
+
+    cases = [
+        ("変更前の変換", lambda: [_legacy_convert(job, db_properties) for job in jobs]),
+        ("変換手順で一括変換", lambda: plan.convert_all(jobs)),
+        ("変換手順の組み立て込み", lambda: compile_property_plan(db_properties).convert_all(jobs)),
+    ]
+    print(f"求人 {args.jobs} 件, {args.repeat} 回の中央値")
+    print(f"{'方式':<16} {'合計(ms)':>10} {'1件あたり(µs)':>14} {'件/秒':>10}")
+    for name, func in cases:
+        median = statistics.median(_measure(func, args.repeat))
+        print(f"{name:<16} {median * 1000:>10.1f} {median / args.jobs * 1_000_000:>14.2f} {args.jobs / median:>10.0f}")
+
+if __name__ == "__main__":
+    main()
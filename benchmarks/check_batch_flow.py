@@ -0,0 +1,131 @@
+"""Batch API での解析 (提出 → 終了待ち → 取り込み) をローカルの OpenAI スタブに対して通しで実行し、結果の取り込みを確認する
+
+使い方 (リポジトリのルートで):
+    python -m benchmarks.check_batch_flow
+    python -m benchmarks.check_batch_flow --jobs 30 --error-rate 0.2 --long-jobs 5
+
+Playwright は使わず、ページ本文を合成した求人を submit_fetched_pages で提出し、collect_analysis_batch で取り込む。
+スタブは出力ファイルの行を入力と異なる順に並べるため、custom_id で求人と対応付けていなければ
+URL・会社名が別の求人のものになる。一時ディレクトリを作業ディレクトリにして実行し、
+次を満たさない場合は終了コード1で終わる:
+  - 全ての求人がキャッシュに1件ずつ記録されている
+  - 成功した求人の URL・会社名が、その求人のプロンプトから作られた値になっている
+  - 失敗した求人はバッチ解析エラーとして記録され、その件数がスタブのエラーファイルの件数と矛盾しない
+  - マニフェストが取り込み済みになっている
+"""
+import os
+import asyncio
+import logging
+import argparse
+import tempfile
+
+from benchmarks.stub_servers import OpenAIStub
+
+# 分割解析も確かめるため、長い求人は複数チャンクになるようにトークン数の上限を小さくする
+CHECK_TEXT_TOKEN_BUDGET = 300
+
+def _build_pages(job_count: int, long_jobs: int) -> list[tuple[dict, str, str]]:
+    """(求人情報, ページ本文, コンテンツハッシュ) を job_count 件作る。先頭 long_jobs 件は複数チャンクに分かれる長さにする"""
+    from findy_scraper.infrastructure.llm_analyzer import compute_content_hash
+
+    pages = []
+    for i in range(job_count):
+        job_info = {"title": f"サンプル求人 {i}", "link": f"https://findy.example/jobs/{i}"}
+        paragraph = f"サンプル求人 {i} の仕事内容です。Python と TypeScript を使ったWebサービスの開発を担当します。\n"
+        page_content = paragraph * (15 if i < long_jobs else 3)
+        pages.append((job_info, page_content, compute_content_hash(page_content)))
+    return pages
+
+def _verify(pages: list[tuple[dict, str, str]], manifest: dict | None, entries: list[dict],
+            content_hash_key: str, failed_requests: int) -> list[str]:
+    """取り込み結果を確認し、満たさなかった条件のリストを返す"""
+    failures = []
+    if manifest is None or not manifest.get("merged"):
+        failures.append("マニフェストが取り込み済みになっていません。")
+
+    by_link = {}
+    for entry in entries:
+        by_link.setdefault(entry.get("元リンク"), []).append(entry)
+    errors = 0
+    for job_info, _, content_hash in pages:
+        link = job_info["link"]
+        found = by_link.get(link, [])
+        if len(found) != 1:
+            failures.append(f"{link} のキャッシュが {len(found)} 件あります (1件のはず)。")
+            continue
+        entry = found[0]
+        if entry.get("エラー"):
+            errors += 1
+            if not str(entry["エラー"]).startswith("バッチ解析エラー"):
+                failures.append(f"{link} がバッチ以外の理由で失敗しています: {entry['エラー']}")
+            continue
+        index = int(link.rsplit('/', 1)[-1])
+        if entry.get("URL") != link or entry.get("会社名") != f"株式会社サンプル{index}":
+            failures.append(f"{link} に別の求人の結果が取り込まれています (URL: {entry.get('URL')}, 会社名: {entry.get('会社名')})。")
+        if entry.get(content_hash_key) != content_hash:
+            failures.append(f"{link} のコンテンツハッシュが提出時のものと異なります。")
+
+    # 失敗した求人は少なくとも1リクエストが失敗しており、失敗リクエストがあれば失敗した求人もある
+    if errors > failed_requests or (failed_requests and not errors):
+        failures.append(f"失敗した求人 {errors} 件が、失敗したリクエスト {failed_requests} 件と矛盾します。")
+    if len(by_link) != len(pages):
+        failures.append(f"キャッシュの求人数 {len(by_link)} 件が提出した求人数 {len(pages)} 件と異なります。")
+    return failures
+
+async def run_check(args, openai_stub: OpenAIStub) -> list[str]:
+    # 接続先の環境変数を設定してからモジュールを読み込む
+    from findy_scraper.application import batch_logic
+    from findy_scraper.infrastructure.cache_manager import read_cache_entries, CONTENT_HASH_KEY
+
+    pages = _build_pages(args.jobs, args.long_jobs)
+    batch_id = await batch_logic.submit_fetched_pages(pages)
+    if batch_id is None:
+        return ["バッチを提出できませんでした。"]
+    if not await batch_logic.collect_analysis_batch(batch_id, poll_interval=args.poll_interval):
+        return [f"バッチ {batch_id} の結果を取り込めませんでした。"]
+    manifest = batch_logic._load_manifest(batch_id)
+    requests = sum(len(job["custom_ids"]) for job in (manifest or {}).get("jobs", []))
+    counts = openai_stub.batch_request_counts(batch_id)
+    logging.info(f"求人 {len(pages)} 件をリクエスト {requests} 件で提出し、取り込みました (スタブ側の失敗 {counts['failed']} 件)。")
+    if counts["total"] != requests:
+        return [f"スタブが受け取ったリクエスト {counts['total']} 件が、マニフェストのリクエスト {requests} 件と異なります。"]
+    return _verify(pages, manifest, read_cache_entries(), CONTENT_HASH_KEY, counts["failed"])
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch API での提出と取り込みを OpenAI スタブに対して実行し、custom_id ごとに結果が取り込まれることを確認します。')
+    parser.add_argument('--jobs', type=int, default=20, help='提出する求人数 (デフォルト: 20)')
+    parser.add_argument('--long-jobs', type=int, default=3, help='そのうち複数チャンクに分けて解析する求人数 (デフォルト: 3)')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='スタブがエラーにするリクエストの割合 (デフォルト: 0.1)')
+    parser.add_argument('--batch-delay-sec', type=float, default=1.0, help='スタブのバッチが完了するまでの秒数 (デフォルト: 1.0)')
+    parser.add_argument('--poll-interval', type=float, default=0.2, help='バッチの状態を確認する間隔(秒) (デフォルト: 0.2)')
+    parser.add_argument('--verbose', action='store_true', help='取り込み処理のログを表示します。')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    with OpenAIStub(error_rate=args.error_rate, batch_delay_sec=args.batch_delay_sec) as openai_stub, \
+            tempfile.TemporaryDirectory(prefix="findy-batch-check-") as workdir:
+        os.environ.update({
+            "OPENAI_BASE_URL": f"{openai_stub.base_url}/v1",
+            "OPENAI_API_KEY": "check",
+            "OPENAI_MODEL_NAME": "stub-model",
+            # .env の設定に左右されないよう、既定値を明示する (空文字は未設定として扱われる)
+            "OPENAI_TARGET_FIELDS": "",
+            "OPENAI_TEXT_TOKEN_BUDGET": str(CHECK_TEXT_TOKEN_BUDGET),
+        })
+        # キャッシュとバッチのマニフェストは作業ディレクトリからの相対パスに保存される
+        previous_dir = os.getcwd()
+        os.chdir(workdir)
+        try:
+            failures = asyncio.run(run_check(args, openai_stub))
+        finally:
+            os.chdir(previous_dir)
+        print(f"スタブへのリクエスト: {openai_stub.snapshot()['requests']}")
+
+    for failure in failures:
+        print(f"NG: {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("OK: バッチの結果が custom_id ごとに求人へ対応付けられ、キャッシュに取り込まれました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""CLIモジュールの読み込み時間を python -X importtime で計測し、起動時間の予算を超えていないか確認する
+
+使い方 (リポジトリのルートで):
+    python -m benchmarks.check_import_time
+    python -m benchmarks.check_import_time --budget-ms 150 --repeat 5
+
+CLIモジュールごとに新しいインタプリタで import だけを行い、モジュール自身の累積読み込み時間の中央値が予算以内であること、
+重い依存ライブラリ (Playwright・OpenAI・notion-client 等) を読み込んでいないことを確認する。どちらかを満たさない場合は終了コード1で終わる。
+"""
+import os
+import sys
+import logging
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CLI_MODULES = ["job_hunter.cli", "findy_scraper.cli", "notion_updater.cli"]
+# サブコマンドを実行するまで読み込まないはずのライブラリ
+HEAVY_MODULES = ["playwright", "openai", "notion_client", "httpx", "tiktoken"]
+DEFAULT_BUDGET_MS = 150.0
+
+def measure_import(module: str) -> tuple[float, dict[str, float]]:
+    """module を読み込む新しいインタプリタを起動し、(module の累積時間[ms], module が読み込んだモジュールごとの累積時間[ms]) を返す"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    # 各行は "import time: self [us] | cumulative | imported package" の形式で、子モジュールは親より先に字下げして出力される。
+    # 起動時に読み込まれる site 等と区別するため、字下げの無い行ごとに区切り、module の行の直前までを依存モジュールとする
+    children = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        cumulative_ms = int(fields[1]) / 1000
+        if fields[2].startswith("  "):
+            children[name] = cumulative_ms
+        elif name == module:
+            return cumulative_ms, children
+        else:
+            children = {}
+    return 0.0, children
+
+def main():
+    parser = argparse.ArgumentParser(description='CLIモジュールの読み込み時間が予算以内で、重い依存ライブラリを読み込んでいないことを確認します。')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help=f'CLIモジュールごとの累積読み込み時間の上限 (ミリ秒, デフォルト: {DEFAULT_BUDGET_MS:.0f})')
+    parser.add_argument('--repeat', type=int, default=5, help='モジュールごとの計測回数 (デフォルト: 5)')
+    parser.add_argument('--top', type=int, default=5, help='時間のかかったモジュールを何件表示するか (デフォルト: 5)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    failures = []
+    print(f"{'モジュール':<22} {'中央値(ms)':>10} {'最大(ms)':>9}  時間のかかった依存モジュール")
+    for module in CLI_MODULES:
+        durations = []
+        for _ in range(args.repeat):
+            total_ms, imported = measure_import(module)
+            durations.append(total_ms)
+        median = statistics.median(durations)
+        top = sorted(((ms, name) for name, ms in imported.items()), reverse=True)[:args.top]
+        print(f"{module:<22} {median:>10.1f} {max(durations):>9.1f}  {', '.join(f'{name} {ms:.1f}' for ms, name in top)}")
+
+        if median > args.budget_ms:
+            failures.append(f"{module} の読み込みに {median:.1f}ms かかりました (予算 {args.budget_ms:.0f}ms)。")
+        heavy = sorted({name.split('.')[0] for name in imported} & set(HEAVY_MODULES))
+        if heavy:
+            failures.append(f"{module} が起動時に {', '.join(heavy)} を読み込んでいます。")
+
+    for failure in failures:
+        print(f"NG: {failure}")
+    if failures:
+        raise SystemExit(1)
+    print(f"OK: すべてのCLIモジュールが予算 ({args.budget_ms:.0f}ms) 以内で、重い依存ライブラリを読み込んでいません。")
+
+if __name__ == "__main__":
+    main()
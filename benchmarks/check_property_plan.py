@@ -0,0 +1,119 @@
+"""Notionプロパティへの変換手順 (compile_property_plan / PropertyPlan.convert_all) の出力を、固定の期待値と照合する
+
+使い方 (リポジトリのルートで):
+    python -m benchmarks.check_property_plan
+
+DBスキーマの一部のプロパティの型を差し替え、対応する全ての型 (title, rich_text, number, url, select, multi_select, date, checkbox)
+と未対応の型・DBに無いプロパティを通す。期待値は手で書いた固定の値で、変更前の変換 (bench_property_conversion の
+_legacy_convert) の出力とも一致することを確かめる。どちらかを満たさない場合は終了コード1で終わる。
+"""
+import logging
+from datetime import datetime
+
+from benchmarks.bench_property_conversion import _legacy_convert, synthetic_db_properties
+from notion_updater.core.notion_formatter import compile_property_plan
+
+def check_db_properties() -> dict:
+    """全ての型を含むよう一部のプロパティの型を差し替え、手動入力項目 (メモ) を除いたDBのプロパティ情報"""
+    db_properties = synthetic_db_properties()
+    db_properties.pop("メモ")
+    for name, prop_type in {"状況": "select", "生成AI": "checkbox", "勤務地": "date", "特記事項": "status"}.items():
+        db_properties[name]["type"] = prop_type
+    return db_properties
+
+def _text(content: str) -> dict:
+    return {"rich_text": [{"type": "text", "text": {"content": content}}]}
+
+def check_cases(today: str) -> list[tuple[dict, dict]]:
+    """(求人データ, 期待する変換結果) のリスト"""
+    return [
+        (
+            {
+                "会社名": "株式会社サンプル" + "あ" * 2100,  # 2000文字で切り詰める
+                "URL": "https://findy-code.io/companies/1/jobs/1",
+                "状況": "書類選考" + "い" * 120,  # option名は100文字で切り詰める
+                "社員数": 120,  # rich_text には文字列にして入れる
+                "生成AI": "あり",
+                "給与下限(万)": "600万円",  # 文字列の数値は数字以外を除いて変換する
+                "給与上限(万)": 900,
+                "使用技術 (主要)": ["Python", None, "Go"],  # None は除く
+                "勤務地": "東京都",  # date は値によらず実行日になる
+                "特記事項": "未対応の型",  # 未対応の型は rich_text として扱う
+                "主な職務内容": "該当なし",  # 空の値は設定しない
+                "求める人物像 (要約)": None,
+                "メモ": "DBに無いプロパティ",
+            },
+            {
+                "会社名": {"title": [{"type": "text", "text": {"content": ("株式会社サンプル" + "あ" * 2100)[:2000]}}]},
+                "URL": {"url": "https://findy-code.io/companies/1/jobs/1"},
+                "状況": {"select": {"name": ("書類選考" + "い" * 120)[:100]}},
+                "社員数": _text("120"),
+                "生成AI": {"checkbox": True},
+                "給与下限(万)": {"number": 600.0},
+                "給与上限(万)": {"number": 900.0},
+                "使用技術": {"multi_select": [{"name": "Python"}, {"name": "Go"}]},
+                "勤務地": {"date": {"start": today}},
+                "特記事項": {"status": [{"type": "text", "text": {"content": "未対応の型"}}]},
+                "最終更新日時": {"date": {"start": today}},
+            },
+        ),
+        (
+            {
+                "会社名": "株式会社サンプル2",
+                "URL": "findy-code.io/companies/2/jobs/2",  # http で始まらないURLは設定しない
+                "状況": "",  # 空文字の select は設定しない
+                "生成AI": 0,
+                "給与下限(万)": "応相談",  # 数字を含まない文字列は設定しない
+                "給与上限(万)": ["900"],  # 数値に変換できない型は警告して設定しない
+                "使用技術 (主要)": " Python, ,TypeScript ",  # カンマ区切りの文字列は分割する
+                "フレックス (コアタイム)": "なし",
+            },
+            {
+                "会社名": {"title": [{"type": "text", "text": {"content": "株式会社サンプル2"}}]},
+                "生成AI": {"checkbox": False},
+                "使用技術": {"multi_select": [{"name": "Python"}, {"name": "TypeScript"}]},
+                "フレックス": _text("なし"),
+                "最終更新日時": {"date": {"start": today}},
+            },
+        ),
+        (
+            {"使用技術 (主要)": 3},  # リスト・文字列以外の multi_select は空リストにする
+            {
+                "使用技術": {"multi_select": []},
+                "最終更新日時": {"date": {"start": today}},
+            },
+        ),
+    ]
+
+def run_check() -> list[str]:
+    """照合し、満たさなかった条件のリストを返す"""
+    db_properties = check_db_properties()
+    plan = compile_property_plan(db_properties)
+    today = datetime.now().strftime('%Y-%m-%d')
+    cases = check_cases(today)
+    jobs = [job for job, _ in cases]
+
+    failures = []
+    for i, ((job, expected), converted, legacy) in enumerate(zip(cases, plan.convert_all(jobs), [_legacy_convert(job, db_properties) for job in jobs])):
+        if converted != expected:
+            failures.append(f"ケース{i}: convert_all の結果が期待値と異なります。\n  期待値: {expected}\n  結果: {converted}")
+        if legacy != expected:
+            failures.append(f"ケース{i}: 変更前の変換の結果が期待値と異なります。\n  期待値: {expected}\n  結果: {legacy}")
+    # 日付を指定した変換では、date 型と最終更新日時の両方に指定した日付が入る
+    fixed = plan.convert(jobs[0], "2000-01-01")
+    if fixed.get("勤務地") != {"date": {"start": "2000-01-01"}} or fixed.get("最終更新日時") != {"date": {"start": "2000-01-01"}}:
+        failures.append(f"指定した日付が date 型のプロパティに設定されていません: {fixed.get('勤務地')}, {fixed.get('最終更新日時')}")
+    return failures
+
+def main():
+    # 期待どおりの警告 (型の不一致・必須プロパティの欠落) は表示しない
+    logging.basicConfig(level=logging.CRITICAL, format='%(asctime)s - %(levelname)s - %(message)s')
+    failures = run_check()
+    for failure in failures:
+        print(f"NG: {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("OK: 全ての型のプロパティが期待どおりに変換されました。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""ローカルのスタブサーバーに対して scrape_and_analyze と Notion への反映を通しで実行し、規模ごとの計測値を出力する
+
+使い方 (リポジトリのルートで):
+    python -m benchmarks.run_benchmark --jobs 50 500 5000
+    python -m benchmarks.run_benchmark --jobs 500 --fetch-concurrency 6 --llm-latency-ms 800 --output bench.json
+
+規模ごとに Findy / OpenAI / Notion のスタブサーバーを起動し、一時ディレクトリを作業ディレクトリにした
+子プロセスで計測する (キャッシュ・ページインデックスを毎回空の状態から始め、ピークメモリを規模ごとに分けるため)。
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import resource
+import subprocess
+import tempfile
+from pathlib import Path
+
+from benchmarks.stub_servers import FindyStub, OpenAIStub, NotionStub
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SCALES = [50, 500, 5000]
+BENCH_DATABASE_ID = "00000000000000000000000000000bench"
+
+def _peak_rss_mb(who: int) -> float:
+    # ru_maxrss は Linux では KB、macOS ではバイト
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+# --- 子プロセス側 ---
+
+async def _run_worker(config: dict) -> dict:
+    # 接続先の環境変数を読んでからモジュールを読み込む
+    from notion_client import AsyncClient
+    from findy_scraper.application import main_logic as findy_main_logic
+    from notion_updater.application import main_logic as notion_main_logic
+    from notion_updater.infrastructure import notion_api
+
+    result = {}
+    started = time.perf_counter()
+    await findy_main_logic.scrape_and_analyze(
+        False, True,
+        fetch_concurrency=config["fetch_concurrency"],
+        llm_concurrency=config["llm_concurrency"],
+        queue_size=config["queue_size"],
+        llm_max_in_flight=config["llm_max_in_flight"],
+        parallel_pagination=config["parallel_pagination"],
+        block_resources=config["block_resources"],
+        pack_max_jobs=config["pack_max_jobs"],
+        report_path=findy_main_logic.DEFAULT_REPORT_FILE,
+    )
+    result["scrape_sec"] = round(time.perf_counter() - started, 3)
+    result["python_peak_rss_mb_after_scrape"] = _peak_rss_mb(resource.RUSAGE_SELF)
+    try:
+        with open(findy_main_logic.DEFAULT_REPORT_FILE, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        result["jobs"] = report.get("jobs", {})
+        result["jobs_per_minute"] = report.get("jobs_per_minute")
+        result["stages"] = {
+            stage: {key: stats[key] for key in ("count", "errors", "p50_sec", "p95_sec", "max_sec")}
+            for stage, stats in report.get("stages", {}).items()
+        }
+    except Exception as e:
+        logging.warning(f"実行レポートを読み込めませんでした: {e}")
+
+    notion_api.configure_rate_limiter(config["notion_rate_limit"], config["notion_burst"])
+    async with AsyncClient(auth="bench", base_url=config["notion_base_url"], timeout_ms=60000, log_level=logging.WARNING) as client:
+        # 1回目は全件作成、2回目はページインデックスを使った差分なしの反映
+        for key in ("notion_first_sec", "notion_second_sec"):
+            started = time.perf_counter()
+            await notion_main_logic.run(client, BENCH_DATABASE_ID, workers=config["notion_workers"])
+            result[key] = round(time.perf_counter() - started, 3)
+
+    result["python_peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_SELF)
+    # 終了済みの子孫プロセス (Playwright のドライバーとブラウザ) のうち最大のもの
+    result["browser_peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    return result
+
+def worker_main(config: dict):
+    logging.basicConfig(level=config["log_level"], format='%(asctime)s - %(levelname)s - %(message)s')
+    result = asyncio.run(_run_worker(config))
+    # 最後の1行を親プロセスが結果として読む
+    print(json.dumps(result, ensure_ascii=False), flush=True)
+
+# --- 親プロセス側 ---
+
+def run_scale(job_count: int, args) -> dict:
+    """job_count 件の求人で1回計測し、子プロセスの結果にスタブサーバー側のリクエスト数を加えて返す"""
+    with FindyStub(job_count, jobs_per_page=args.jobs_per_page, latency_ms=args.findy_latency_ms) as findy, \
+            OpenAIStub(latency_ms=args.llm_latency_ms, error_rate=args.llm_error_rate) as openai_stub, \
+            NotionStub(BENCH_DATABASE_ID, latency_ms=args.notion_latency_ms, rate_limit=args.notion_server_rate_limit) as notion, \
+            tempfile.TemporaryDirectory(prefix="findy-bench-") as workdir:
+        env = dict(os.environ)
+        env.update({
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")])),
+            "FINDY_BASE_URL": findy.base_url,
+            "FINDY_EMAIL": "bench@example.com",
+            "FINDY_PASSWORD": "bench",
+            "OPENAI_BASE_URL": f"{openai_stub.base_url}/v1",
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_MODEL_NAME": args.model,
+            # .env の設定に左右されないよう、既定値を明示する (空文字は未設定として扱われる)
+            "OPENAI_TARGET_FIELDS": "",
+            "FINDY_CACHE_FORMAT": args.cache_format,
+        })
+        config = {
+            "fetch_concurrency": args.fetch_concurrency,
+            "llm_concurrency": args.llm_concurrency,
+            "queue_size": args.queue_size,
+            "llm_max_in_flight": args.llm_max_in_flight,
+            "parallel_pagination": args.parallel_pagination,
+            "block_resources": not args.no_block_resources,
+            "pack_max_jobs": args.pack_max_jobs,
+            "notion_base_url": notion.base_url,
+            "notion_rate_limit": args.notion_rate_limit,
+            "notion_burst": args.notion_burst,
+            "notion_workers": args.notion_workers,
+            "log_level": logging.INFO if args.verbose else logging.WARNING,
+        }
+        logging.info(f"--- {job_count} 件で計測を開始します ---")
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run_benchmark", "--worker", json.dumps(config)],
+            cwd=workdir, env=env, stdout=subprocess.PIPE, text=True, timeout=args.timeout,
+        )
+        wall_sec = round(time.perf_counter() - started, 3)
+        lines = process.stdout.strip().splitlines()
+        if process.returncode != 0 or not lines:
+            logging.error(f"{job_count} 件の計測に失敗しました (終了コード {process.returncode})。")
+            return {"job_count": job_count, "error": f"exit code {process.returncode}"}
+        result = json.loads(lines[-1])
+        return {
+            "job_count": job_count,
+            "wall_sec": wall_sec,
+            **result,
+            "notion_pages": notion.page_count,
+            "stub_requests": {"findy": findy.snapshot(), "openai": openai_stub.snapshot(), "notion": notion.snapshot()},
+        }
+
+def print_summary(results: list[dict]):
+    header = f"{'件数':>6} {'全体(秒)':>9} {'取得+解析':>9} {'Notion1':>8} {'Notion2':>8} {'件/分':>8} {'Py RSS':>7} {'Browser':>8}  リクエスト数"
+    print(header)
+    for r in results:
+        if "error" in r:
+            print(f"{r['job_count']:>6} 失敗: {r['error']}")
+            continue
+        requests = "  ".join(
+            f"{server}[{', '.join(f'{stage}={count}' for stage, count in sorted(snapshot['requests'].items()))}]"
+            for server, snapshot in r["stub_requests"].items()
+        )
+        print(
+            f"{r['job_count']:>6} {r['wall_sec']:>9.1f} {r['scrape_sec']:>9.1f} {r['notion_first_sec']:>8.1f} "
+            f"{r['notion_second_sec']:>8.1f} {r.get('jobs_per_minute') or 0:>8.1f} {r['python_peak_rss_mb']:>6.0f}M "
+            f"{r['browser_peak_rss_mb']:>7.0f}M  {requests}"
+        )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='ローカルのスタブサーバーを使って、求人の取得・解析とNotionへの反映を通しで計測します。')
+    parser.add_argument('--jobs', type=int, nargs='+', default=DEFAULT_SCALES, help=f'計測する求人数 (デフォルト: {DEFAULT_SCALES})')
+    parser.add_argument('--jobs-per-page', type=int, default=20, help='いいね一覧の1ページあたりの求人数 (デフォルト: 20)')
+    parser.add_argument('--findy-latency-ms', type=float, default=50.0, help='Findyスタブの応答遅延 (ミリ秒, デフォルト: 50)')
+    parser.add_argument('--llm-latency-ms', type=float, default=500.0, help='OpenAIスタブの応答遅延 (ミリ秒, デフォルト: 500)')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='OpenAIスタブが 429/500 を返す割合 (デフォルト: 0)')
+    parser.add_argument('--notion-latency-ms', type=float, default=100.0, help='Notionスタブの応答遅延 (ミリ秒, デフォルト: 100)')
+    parser.add_argument('--notion-server-rate-limit', type=float, default=None, help='Notionスタブが 429 を返し始めるリクエスト数/秒 (デフォルト: 制限なし)')
+    parser.add_argument('--notion-rate-limit', type=float, default=50.0, help='クライアント側のNotionリクエスト数/秒 (デフォルト: 50。本番の既定値は3)')
+    parser.add_argument('--notion-burst', type=int, default=10, help='クライアント側のNotionバースト数 (デフォルト: 10)')
+    parser.add_argument('--notion-workers', type=int, default=4, help='Notionに反映するワーカー数 (デフォルト: 4)')
+    parser.add_argument('--cache-format', choices=['jsonl', 'sqlite'], default='jsonl', help='解析結果キャッシュの保存形式 (デフォルト: jsonl)')
+    parser.add_argument('--model', default='gpt-4o-mini', help='プロンプトのトークン数計算に使うモデル名 (デフォルト: gpt-4o-mini)')
+    # 以下は findy_scraper の同名オプションと同じ
+    parser.add_argument('--fetch-concurrency', type=int, default=3)
+    parser.add_argument('--llm-concurrency', type=int, default=5)
+    parser.add_argument('--queue-size', type=int, default=10)
+    parser.add_argument('--llm-max-in-flight', type=int, default=10)
+    parser.add_argument('--pack-max-jobs', type=int, default=1)
+    parser.add_argument('--parallel-pagination', action='store_true')
+    parser.add_argument('--no-block-resources', action='store_true')
+    parser.add_argument('--timeout', type=float, default=3600.0, help='1規模あたりの制限時間 (秒, デフォルト: 3600)')
+    parser.add_argument('--output', help='結果をJSONで保存するパス')
+    parser.add_argument('--verbose', action='store_true', help='子プロセスのINFOログも表示します')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        worker_main(json.loads(args.worker))
+        return
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    results = [run_scale(job_count, args) for job_count in args.jobs]
+    print_summary(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"options": {k: v for k, v in vars(args).items() if k != "worker"}, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        logging.info(f"計測結果を {args.output} に保存しました。")
+
+if __name__ == "__main__":
+    main()
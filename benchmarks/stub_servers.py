@@ -0,0 +1,605 @@
+"""ベンチマーク用に Findy / OpenAI / Notion の代わりをするローカルHTTPサーバー
+
+いずれも標準ライブラリの ThreadingHTTPServer をバックグラウンドスレッドで動かす。
+応答ごとに latency_ms だけ待ってから返し、ステージ別のリクエスト数・送信バイト数を数える。
+"""
+import re
+import json
+import time
+import uuid
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from html import escape
+from email import policy as email_policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+def _json_body(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+def _parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def _make_handler(stub: "StubServer"):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _dispatch(self, method: str):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b""
+            if stub.latency_sec:
+                time.sleep(stub.latency_sec)
+            status, headers, payload, stage = stub.handle(method, self.path, self.headers, body)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            stub.count(stage, len(payload))
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PATCH(self):
+            self._dispatch("PATCH")
+    return Handler
+
+class StubServer:
+    """ローカルのスタブサーバーの共通部分 (with ブロックの間だけ起動する)"""
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_sec = latency_ms / 1000
+        self.requests = Counter()
+        self.bytes_sent = Counter()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        return False
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, stage: str, size: int):
+        with self._lock:
+            self.requests[stage] += 1
+            self.bytes_sent[stage] += size
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"requests": dict(self.requests), "bytes": dict(self.bytes_sent)}
+
+    def handle(self, method: str, path: str, headers, body: bytes) -> tuple[int, dict, bytes, str]:
+        """(ステータス, ヘッダー, 本文, 集計用のステージ名) を返す"""
+        raise NotImplementedError
+
+# --- Findy ---
+
+_STYLESHEET = b"body { font-family: sans-serif; }\n" + b"/* padding */\n" * 600
+_IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(24 * 1024)
+
+class FindyStub(StubServer):
+    """ログイン・いいね一覧・求人詳細ページを返す Findy の代わり
+
+    いいね一覧は jobs_per_page 件ずつページ分割し、ページネーションは前後2ページと先頭・末尾だけを表示する
+    (並行取得で省略表示のページを辿る処理も通るように)。詳細ページは JSON-LD と、ブロック対象の画像と、CSSを含む。
+    """
+    SESSION_COOKIE_NAME = "bench_session"
+
+    def __init__(self, job_count: int, jobs_per_page: int = 20, latency_ms: float = 0.0, description_chars: int = 1500):
+        super().__init__(latency_ms)
+        self.job_count = job_count
+        self.jobs_per_page = max(1, jobs_per_page)
+        self.description_chars = description_chars
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.job_count // self.jobs_per_page))
+
+    @staticmethod
+    def job_path(index: int) -> str:
+        return f"/companies/company-{index % 97}/jobs/{index}"
+
+    def _html(self, title: str, body: str) -> bytes:
+        return (
+            f'<!DOCTYPE html><html lang="ja"><head><meta charset="utf-8"><title>{escape(title)}</title>'
+            f'<link rel="stylesheet" href="/static/app.css"></head><body>{body}</body></html>'
+        ).encode('utf-8')
+
+    def _login_page(self) -> bytes:
+        return self._html("ログイン", (
+            '<form method="post" action="/login">'
+            '<input name="email" type="email"><input name="password" type="password">'
+            '<button type="submit">ログインする</button></form>'
+        ))
+
+    def _pagination(self, current: int) -> str:
+        last = self.page_count
+        numbers = sorted({1, last, *range(max(1, current - 2), min(last, current + 2) + 1)})
+        items = []
+        previous = None
+        for number in numbers:
+            if previous is not None and number - previous > 1:
+                items.append('<li class="ellipsis">…</li>')
+            active = ' class="active"' if number == current else ''
+            items.append(f'<li{active}><a href="/likes?page={number}">{number}</a></li>')
+            previous = number
+        if current < last:
+            items.append(f'<li><a href="/likes?page={current + 1}">次へ</a></li>')
+        else:
+            items.append('<li class="disabled"><a>次へ</a></li>')
+        return f'<ul class="pagination_component_pagination__h4ax6">{"".join(items)}</ul>'
+
+    def likes_page(self, page_number: int) -> bytes:
+        start = (page_number - 1) * self.jobs_per_page
+        cards = "".join(
+            f'<div class="card"><a href="{self.job_path(i)}">求人タイトル {i} (バックエンドエンジニア)</a></div>'
+            for i in range(start, min(start + self.jobs_per_page, self.job_count))
+        )
+        return self._html("いいね", f"<h1>いいねした求人</h1>{cards}{self._pagination(page_number)}")
+
+    def _description(self, index: int) -> str:
+        sentence = f"求人{index}では、自社サービスの開発をリードするエンジニアを募集しています。Python と TypeScript を用いて機能を設計・実装します。"
+        return (sentence * (self.description_chars // len(sentence) + 1))[:self.description_chars]
+
+    def detail_page(self, index: int) -> bytes:
+        title = f"求人タイトル {index} (バックエンドエンジニア)"
+        json_ld = json.dumps({
+            "@context": "https://schema.org",
+            "@type": "JobPosting",
+            "title": title,
+            "description": self._description(index),
+            "hiringOrganization": {"@type": "Organization", "name": f"株式会社サンプル{index % 97}"},
+        }, ensure_ascii=False)
+        body = (
+            f'<script type="application/ld+json">{json_ld}</script>'
+            f'<header><img src="/static/logo.png?job={index}"></header>'
+            f'<main><h1>{escape(title)}</h1><p>{escape(self._description(index))}</p></main>'
+            '<footer>おすすめの求人 ...</footer>'
+        )
+        return self._html(title, body)
+
+    def handle(self, method, path, headers, body):
+        parsed = urlparse(path)
+        route = parsed.path
+        logged_in = f"{self.SESSION_COOKIE_NAME}=1" in (headers.get('Cookie') or "")
+        html = {"Content-Type": "text/html; charset=utf-8"}
+
+        if route in ("/", "/home"):
+            return 200, html, self._html("ホーム", '<a href="/login">ログイン</a>'), "login"
+        if route == "/login":
+            if method == "POST":
+                return 303, {"Location": "/home", "Set-Cookie": f"{self.SESSION_COOKIE_NAME}=1; Path=/"}, b"", "login"
+            return 200, html, self._login_page(), "login"
+        if route == "/likes":
+            if not logged_in:
+                return 302, {"Location": "/login"}, b"", "likes"
+            try:
+                page_number = int(parse_qs(parsed.query).get('page', ['1'])[0])
+            except ValueError:
+                page_number = 1
+            page_number = min(max(1, page_number), self.page_count)
+            return 200, html, self.likes_page(page_number), "likes"
+        match = re.fullmatch(r"/companies/[^/]+/jobs/(\d+)", route)
+        if match and int(match.group(1)) < self.job_count:
+            return 200, html, self.detail_page(int(match.group(1))), "detail"
+        if route == "/static/app.css":
+            return 200, {"Content-Type": "text/css"}, _STYLESHEET, "static"
+        if route == "/static/logo.png":
+            return 200, {"Content-Type": "image/png"}, _IMAGE, "static"
+        return 404, html, self._html("Not Found", "<h1>404</h1>"), "other"
+
+# --- OpenAI ---
+
+_PROMPT_URL_PATTERN = re.compile(r"求人URL: 「(.+?)」")
+_PROMPT_TITLE_PATTERN = re.compile(r"求人タイトル: 「(.+?)」")
+_PROMPT_FIELDS_PATTERN = re.compile(r"抽出項目:\n(\[.*?\])\n", re.DOTALL)
+
+class OpenAIStub(StubServer):
+    """Chat Completions API と Batch API (files.create/content, batches.create/retrieve) の代わり
+
+    プロンプトの求人URLと抽出項目から、それらしい解析結果を返す。
+    error_rate の割合で 429 (Retry-After 付き) か 500 を返し、再試行の動作も計測できる。
+    バッチは作成から batch_delay_sec 秒後に completed になり、error_rate の割合のリクエストはエラーファイルに入る。
+    出力ファイルの行は入力と異なる順に並べ、custom_id で対応付けていることを確かめられるようにする。
+    """
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0, batch_delay_sec: float = 0.0):
+        super().__init__(latency_ms)
+        self.error_rate = error_rate
+        self.batch_delay_sec = batch_delay_sec
+        self._random = random.Random(seed)
+        self._files: dict[str, dict] = {}
+        self._batches: dict[str, dict] = {}
+
+    @staticmethod
+    def _field_value(field: str, link: str, title: str, index: int):
+        if field == "URL":
+            return link
+        if field == "会社名":
+            return f"株式会社サンプル{index}"
+        if field.startswith("給与下限"):
+            return 500 + index % 200
+        if field.startswith("給与上限"):
+            return 800 + index % 400
+        if field.startswith("使用技術"):
+            return ["Python", "TypeScript", "AWS"]
+        return f"{field}のサンプル値 ({title})"
+
+    def _job_result(self, fields: list, link: str, title: str, index: int) -> dict:
+        return {field: self._field_value(field, link, title, index) for field in fields}
+
+    @staticmethod
+    def _error_body(message: str, error_type: str, code: str | None = None) -> dict:
+        return {"error": {"message": message, "type": error_type, "code": code}}
+
+    def _chat_completion(self, request: dict) -> tuple[dict, str]:
+        """Chat Completions のリクエスト本体から (応答本体, 集計用のステージ名) を作る"""
+        prompt = "\n".join(m.get("content", "") for m in request.get("messages", []) if isinstance(m.get("content"), str))
+        links = _PROMPT_URL_PATTERN.findall(prompt)
+        titles = _PROMPT_TITLE_PATTERN.findall(prompt)
+        fields_match = _PROMPT_FIELDS_PATTERN.search(prompt)
+        fields = json.loads(fields_match.group(1)) if fields_match else ["会社名", "URL"]
+
+        results = []
+        for i, link in enumerate(links or ["https://example.com/unknown"]):
+            index = int(link.rstrip('/').rsplit('/', 1)[-1]) if link.rstrip('/').rsplit('/', 1)[-1].isdigit() else i
+            title = titles[i] if i < len(titles) else ""
+            results.append(self._job_result(fields, link, title, index))
+        if "求人ごとに" in prompt:
+            # まとめて解析するプロンプトには {"jobs": [...]} で、入力URLを付けて返す
+            for result, link in zip(results, links):
+                result["入力URL"] = link
+            content = {"jobs": results}
+        else:
+            content = results[0]
+
+        content_text = json.dumps(content, ensure_ascii=False)
+        prompt_tokens = len(prompt) // 2
+        completion_tokens = len(content_text) // 2
+        response = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content_text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+        return response, "packed_chat" if len(links) > 1 else "chat"
+
+    def _handle_chat(self, body: bytes, json_headers: dict):
+        with self._lock:
+            failing = self._random.random() < self.error_rate
+            rate_limited = self._random.random() < 0.5
+        if failing and rate_limited:
+            error = self._error_body("Rate limit reached", "requests", "rate_limit_exceeded")
+            return 429, {**json_headers, "retry-after-ms": "200"}, _json_body(error), "chat_error"
+        if failing:
+            return 500, json_headers, _json_body(self._error_body("Internal server error", "server_error")), "chat_error"
+        response, stage = self._chat_completion(json.loads(body or b"{}"))
+        return 200, json_headers, _json_body(response), stage
+
+    def _store_file(self, content: bytes, filename: str, purpose: str) -> dict:
+        file_object = {
+            "id": f"file-{uuid.uuid4().hex[:24]}", "object": "file", "bytes": len(content),
+            "created_at": int(time.time()), "filename": filename, "purpose": purpose, "status": "processed",
+        }
+        with self._lock:
+            self._files[file_object["id"]] = {**file_object, "content": content}
+        return file_object
+
+    def _upload_file(self, headers, body: bytes) -> dict | None:
+        """multipart/form-data の file と purpose を取り出して保存する"""
+        message = BytesParser(policy=email_policy.default).parsebytes(
+            f"Content-Type: {headers.get('Content-Type', '')}\r\n\r\n".encode('utf-8') + body
+        )
+        if not message.is_multipart():
+            return None
+        fields, content, filename = {}, None, "upload.jsonl"
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name == "file":
+                content = part.get_payload(decode=True) or b""
+                filename = part.get_filename() or filename
+            elif name:
+                fields[name] = part.get_content().strip()
+        if content is None:
+            return None
+        return self._store_file(content, filename, fields.get("purpose", "batch"))
+
+    def _batch_line_output(self, line: dict) -> tuple[dict, bool]:
+        """入力ファイルの1行を処理し、(出力ファイルの1行, 成功したか) を返す"""
+        with self._lock:
+            failing = self._random.random() < self.error_rate
+        request_id = f"req_{uuid.uuid4().hex[:16]}"
+        if failing:
+            body = self._error_body("Internal server error", "server_error")
+            response = {"status_code": 500, "request_id": request_id, "body": body}
+        else:
+            body, _ = self._chat_completion(line.get("body") or {})
+            response = {"status_code": 200, "request_id": request_id, "body": body}
+        output = {"id": f"batch_req_{uuid.uuid4().hex[:16]}", "custom_id": line.get("custom_id"), "response": response, "error": None}
+        return output, not failing
+
+    def _create_batch(self, request: dict) -> dict | None:
+        with self._lock:
+            input_file = self._files.get(request.get("input_file_id"))
+        if input_file is None:
+            return None
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        lines = [json.loads(line) for line in input_file["content"].decode('utf-8').splitlines() if line.strip()]
+        outputs, errors = [], []
+        for line in lines:
+            output, succeeded = self._batch_line_output(line)
+            (outputs if succeeded else errors).append(output)
+        with self._lock:
+            self._random.shuffle(outputs)
+            self._random.shuffle(errors)
+
+        def to_file(records: list, kind: str) -> str | None:
+            if not records:
+                return None
+            content = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode('utf-8')
+            return self._store_file(content, f"{batch_id}_{kind}.jsonl", "batch_output")["id"]
+
+        output_file_id, error_file_id = to_file(outputs, "output"), to_file(errors, "error")
+        created_at = int(time.time())
+        batch = {
+            "id": batch_id, "object": "batch", "endpoint": request.get("endpoint"), "errors": None,
+            "input_file_id": input_file["id"], "completion_window": request.get("completion_window"),
+            "status": "validating", "output_file_id": None, "error_file_id": None, "created_at": created_at,
+            "request_counts": {"total": len(lines), "completed": 0, "failed": 0},
+            "metadata": request.get("metadata"),
+        }
+        with self._lock:
+            self._batches[batch_id] = {
+                "batch": batch, "completes_at": time.monotonic() + self.batch_delay_sec,
+                "output_file_id": output_file_id, "error_file_id": error_file_id,
+                "completed": len(outputs), "failed": len(errors),
+            }
+        return batch
+
+    def _retrieve_batch(self, batch_id: str) -> dict | None:
+        with self._lock:
+            state = self._batches.get(batch_id)
+            if state is None:
+                return None
+            batch = state["batch"]
+            if batch["status"] == "validating":
+                batch["status"] = "in_progress"
+            elif batch["status"] == "in_progress" and time.monotonic() >= state["completes_at"]:
+                batch.update({
+                    "status": "completed", "completed_at": int(time.time()),
+                    "output_file_id": state["output_file_id"], "error_file_id": state["error_file_id"],
+                    "request_counts": {"total": state["completed"] + state["failed"],
+                                       "completed": state["completed"], "failed": state["failed"]},
+                })
+            return dict(batch)
+
+    def batch_request_counts(self, batch_id: str) -> dict:
+        """バッチの {"total", "completed", "failed"} (エラーファイルに入れたリクエスト数が failed)"""
+        with self._lock:
+            state = self._batches[batch_id]
+            return {"total": state["completed"] + state["failed"], "completed": state["completed"], "failed": state["failed"]}
+
+    def handle(self, method, path, headers, body):
+        json_headers = {"Content-Type": "application/json"}
+        route = urlparse(path).path
+        not_found = 404, json_headers, _json_body(self._error_body("not found", "invalid_request_error")), "other"
+
+        if method == "POST" and route.endswith("/chat/completions"):
+            return self._handle_chat(body, json_headers)
+        if method == "POST" and route.endswith("/files"):
+            file_object = self._upload_file(headers, body)
+            if file_object is None:
+                error = self._error_body("file is required", "invalid_request_error")
+                return 400, json_headers, _json_body(error), "batch_error"
+            return 200, json_headers, _json_body(file_object), "file_upload"
+        if method == "GET" and (match := re.search(r"/files/([^/]+)/content$", route)):
+            with self._lock:
+                stored = self._files.get(match.group(1))
+            if stored is None:
+                return not_found
+            return 200, {"Content-Type": "application/octet-stream"}, stored["content"], "file_content"
+        if method == "POST" and route.endswith("/batches"):
+            batch = self._create_batch(json.loads(body or b"{}"))
+            if batch is None:
+                error = self._error_body("input file not found", "invalid_request_error")
+                return 400, json_headers, _json_body(error), "batch_error"
+            return 200, json_headers, _json_body(batch), "batch_create"
+        if method == "GET" and (match := re.search(r"/batches/([^/]+)$", route)):
+            batch = self._retrieve_batch(match.group(1))
+            return (200, json_headers, _json_body(batch), "batch_retrieve") if batch else not_found
+        return not_found
+
+# --- Notion ---
+
+class NotionStub(StubServer):
+    """データベース1つ分の Notion API (databases.retrieve/update/query, pages.create/update) の代わり
+
+    データベースは Title プロパティ "名前" だけの状態から始まる。rate_limit (req/s) を指定すると、
+    それを超えたリクエストに 429 (rate_limited) を返す。
+    """
+    def __init__(self, database_id: str, latency_ms: float = 0.0, rate_limit: float | None = None):
+        super().__init__(latency_ms)
+        self.database_id = database_id
+        self.rate_limit = rate_limit
+        self._properties = {"名前": {"id": "title", "name": "名前", "type": "title", "title": {}}}
+        self._pages: dict[str, dict] = {}
+        self._page_order: list[str] = []
+        self._window_start = 0.0
+        self._window_count = 0
+
+    def _rate_limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            return self._window_count > self.rate_limit
+
+    @staticmethod
+    def _error(status: int, code: str, message: str) -> tuple[int, dict, bytes]:
+        payload = {"object": "error", "status": status, "code": code, "message": message}
+        return status, {"Content-Type": "application/json"}, _json_body(payload)
+
+    def _database(self) -> dict:
+        return {"object": "database", "id": self.database_id, "properties": self._properties}
+
+    def _update_schema(self, properties: dict):
+        for name, definition in properties.items():
+            prop_type = next((k for k in definition if k != "name"), None)
+            if prop_type == "title":
+                # Title プロパティのリネーム
+                old_name = next(k for k, v in self._properties.items() if v["type"] == "title")
+                self._properties.pop(old_name)
+            self._properties[definition.get("name", name)] = {
+                "id": uuid.uuid4().hex[:4], "name": definition.get("name", name),
+                "type": prop_type, prop_type: definition.get(prop_type) or {},
+            }
+
+    def _response_property(self, name: str, value: dict) -> dict:
+        prop_type = self._properties.get(name, {}).get("type") or next(iter(value))
+        content = value.get(prop_type)
+        if prop_type in ("title", "rich_text"):
+            content = [
+                {"type": "text", "text": item.get("text", {}), "plain_text": item.get("text", {}).get("content", "")}
+                for item in content or []
+            ]
+        elif prop_type == "multi_select":
+            content = [{"id": uuid.uuid4().hex[:4], "name": option.get("name"), "color": "default"} for option in content or []]
+        return {"id": self._properties.get(name, {}).get("id", name), "type": prop_type, prop_type: content}
+
+    def _save_page(self, page_id: str, properties: dict) -> dict:
+        page = self._pages.setdefault(page_id, {
+            "object": "page", "id": page_id, "created_time": _now_iso(), "archived": False, "in_trash": False,
+            "parent": {"type": "database_id", "database_id": self.database_id}, "properties": {},
+        })
+        for name, value in properties.items():
+            page["properties"][name] = self._response_property(name, value)
+        page["last_edited_time"] = _now_iso()
+        return page
+
+    def _matches(self, page: dict, condition: dict) -> bool:
+        if condition.get("timestamp") == "last_edited_time":
+            edited_since = _parse_iso(condition["last_edited_time"]["on_or_after"])
+            return _parse_iso(page["last_edited_time"]) >= edited_since
+        if "url" in condition:
+            url = (page["properties"].get(condition.get("property")) or {}).get("url")
+            if condition["url"].get("is_not_empty"):
+                return bool(url)
+            if "equals" in condition["url"]:
+                return url == condition["url"]["equals"]
+        return True
+
+    def _query(self, request: dict) -> dict:
+        query_filter = request.get("filter") or {}
+        conditions = query_filter.get("and", [query_filter])
+        with self._lock:
+            # Notion と同じく、アーカイブ済み (ゴミ箱を含む) のページは返さない
+            page_ids = [
+                page_id for page_id in self._page_order
+                if not self._pages[page_id]["archived"]
+                and all(self._matches(self._pages[page_id], condition) for condition in conditions)
+            ]
+        start = int(request.get("start_cursor") or 0)
+        page_size = min(int(request.get("page_size") or 100), 100)
+        end = start + page_size
+        return {
+            "object": "list",
+            "results": [self._pages[page_id] for page_id in page_ids[start:end]],
+            "has_more": end < len(page_ids),
+            "next_cursor": str(end) if end < len(page_ids) else None,
+            "type": "page_or_database",
+        }
+
+    def handle(self, method, path, headers, body):
+        route = urlparse(path).path
+        json_headers = {"Content-Type": "application/json"}
+        if self._rate_limited():
+            status, error_headers, payload = self._error(429, "rate_limited", "Rate limited")
+            return status, {**error_headers, "Retry-After": "1"}, payload, "rate_limited"
+        request = json.loads(body or b"{}")
+
+        database_path = f"/v1/databases/{self.database_id}"
+        if route == database_path and method == "GET":
+            return 200, json_headers, _json_body(self._database()), "schema"
+        if route == database_path and method == "PATCH":
+            with self._lock:
+                self._update_schema(request.get("properties", {}))
+            return 200, json_headers, _json_body(self._database()), "schema"
+        if route == f"{database_path}/query" and method == "POST":
+            return 200, json_headers, _json_body(self._query(request)), "query"
+        if route.startswith("/v1/databases/"):
+            return (*self._error(404, "object_not_found", "Could not find database."), "other")
+        if route == "/v1/pages" and method == "POST":
+            with self._lock:
+                page_id = str(uuid.uuid4())
+                page = self._save_page(page_id, request.get("properties", {}))
+                self._page_order.append(page_id)
+            return 200, json_headers, _json_body(page), "create"
+        match = re.fullmatch(r"/v1/pages/([0-9a-f-]+)", route)
+        if match and method == "PATCH":
+            with self._lock:
+                if match.group(1) not in self._pages:
+                    return (*self._error(404, "object_not_found", "Could not find page."), "update")
+                if self._pages[match.group(1)]["archived"]:
+                    message = "Can't edit block that is archived. You must unarchive the block before editing."
+                    return (*self._error(400, "validation_error", message), "update")
+                page = self._save_page(match.group(1), request.get("properties", {}))
+            return 200, json_headers, _json_body(page), "update"
+        return (*self._error(404, "invalid_request_url", "Invalid request URL."), "other")
+
+    def archive_page(self, url: str, url_property_name: str = "URL"):
+        """URL が一致するページを Notion 上でアーカイブされた状態にする (ページインデックスの検証用)"""
+        with self._lock:
+            for page in self._pages.values():
+                if (page["properties"].get(url_property_name) or {}).get("url") == url:
+                    page.update({"archived": True, "in_trash": True, "last_edited_time": _now_iso()})
+
+    def clear_page_url(self, url: str, url_property_name: str = "URL"):
+        """URL が一致するページの URL プロパティを空にする (Notion 上での手動編集の代わり)"""
+        with self._lock:
+            for page in self._pages.values():
+                if (page["properties"].get(url_property_name) or {}).get("url") == url:
+                    page["properties"][url_property_name]["url"] = None
+                    page["last_edited_time"] = _now_iso()
+
+    @property
+    def page_count(self) -> int:
+        with self._lock:
+            return len(self._pages)
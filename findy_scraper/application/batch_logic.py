@@ -0,0 +1,221 @@
+import os
+import json
+import logging
+import traceback
+from datetime import datetime
+
+from findy_scraper.application import main_logic
+from findy_scraper.infrastructure.playwright_handler import PlaywrightManager
+from findy_scraper.infrastructure.llm_analyzer import (
+    OpenAIClientManager, TOKEN_USAGE_KEY, get_openai_model_name,
+    build_analysis_prompts, build_chat_completion_body, assemble_analysis_result,
+)
+from findy_scraper.infrastructure.batch_api import (
+    write_batch_input, submit_batch, wait_for_batch, download_batch_results,
+)
+from findy_scraper.infrastructure.cache_manager import load_cache, compact_cache, summarize_entry, CacheJournal, CACHE_DIR
+from findy_scraper.core.settings import DEFAULT_POLL_INTERVAL_SEC, get_findy_credentials
+
+# バッチの入力ファイルと、custom_id -> 求人 の対応 (マニフェスト) の保存先
+BATCH_DIR = os.path.join(CACHE_DIR, "batches")
+
+def _manifest_path(batch_id: str) -> str:
+    return os.path.join(BATCH_DIR, f"{batch_id}.json")
+
+def _save_manifest(manifest: dict):
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    path = _manifest_path(manifest["batch_id"])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def _load_manifest(batch_id: str) -> dict | None:
+    try:
+        with open(_manifest_path(batch_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logging.error(f"バッチ {batch_id} のマニフェストが {BATCH_DIR} に見つかりません。")
+    except Exception as e:
+        logging.error(f"バッチ {batch_id} のマニフェストの読み込みに失敗しました: {e}")
+    return None
+
+def pending_batch_links() -> set:
+    """提出済みで、まだキャッシュに取り込んでいないバッチに含まれる求人のリンク"""
+    links = set()
+    if not os.path.isdir(BATCH_DIR):
+        return links
+    for file_name in os.listdir(BATCH_DIR):
+        if not file_name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(BATCH_DIR, file_name), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            logging.warning(f"バッチのマニフェスト {file_name} を読み込めないためスキップします: {e}")
+            continue
+        if not manifest.get("merged"):
+            links.update(job["link"] for job in manifest.get("jobs", []))
+    return links
+
+async def submit_analysis_batch(force_reload: bool, headless: bool,
+                                fetch_concurrency: int = main_logic.DEFAULT_FETCH_CONCURRENCY,
+                                refresh_changed_only: bool = False, parallel_pagination: bool = False,
+                                block_resources: bool = True, allowed_hosts: list[str] | None = None,
+                                reuse_session: bool = True) -> str | None:
+    """解析が必要な求人のページを取得し、全プロンプトを1つのバッチとして提出する。提出したバッチIDを返す"""
+    if not all(get_findy_credentials()):
+        logging.error("エラー: 環境変数 FINDY_EMAIL または FINDY_PASSWORD が設定されていません。")
+        return None
+
+    cached_results = load_cache(force_reload)
+    fetched_pages = []
+
+    playwright_manager = PlaywrightManager(headless=headless, page_pool_size=fetch_concurrency,
+                                           block_resources=block_resources, allowed_hosts=allowed_hosts,
+                                           storage_state_path=main_logic.STORAGE_STATE_FILE, restore_storage_state=reuse_session)
+    async with playwright_manager as page:
+        try:
+            await main_logic.ensure_logged_in(playwright_manager, page, reuse_session)
+            all_job_links_info = await main_logic.collect_liked_job_links(playwright_manager, page, parallel_pagination)
+            # 別のバッチで解析中の求人は二重に提出しない
+            links_to_process = main_logic.select_jobs_to_process(all_job_links_info, cached_results, refresh_changed_only,
+                                                                 excluded_links=pending_batch_links())
+            logging.info(f"--- 今回ページを取得する求人数: {len(links_to_process)} 件 --- ")
+
+            if links_to_process:
+                # ページ取得に失敗した求人はその場でキャッシュにエラーとして記録する
+                with CacheJournal() as journal:
+                    def record_result(result: dict):
+                        link = result.get("元リンク")
+                        if link:
+                            cached_results[link] = summarize_entry(result)
+                            journal.append(result)
+
+                    fetched_pages = await main_logic.fetch_job_pages(playwright_manager, links_to_process,
+                                                                     on_result=record_result, cached_results=cached_results)
+        except Exception as e:
+            logging.error(f"バッチ用のページ取得中に予期せぬエラーが発生しました: {e}")
+            traceback.print_exc()
+        finally:
+            compact_cache()
+
+    if not fetched_pages:
+        logging.info("バッチで解析する求人はありません。")
+        return None
+    return await submit_fetched_pages(fetched_pages)
+
+async def submit_fetched_pages(fetched_pages: list[tuple[dict, str, str]]) -> str | None:
+    """取得済みの (求人情報, ページ本文, コンテンツハッシュ) を1つのバッチとして提出し、マニフェストを保存してバッチIDを返す"""
+    # 求人ごとにチャンク単位のリクエストを作り、custom_id で求人と対応付ける
+    requests = []
+    jobs = []
+    for job_index, (job_info, page_content, content_hash) in enumerate(fetched_pages):
+        job_title = job_info.get('title', 'タイトル不明')
+        job_link = job_info.get('link', 'リンク不明')
+        custom_ids = []
+        for chunk_index, prompt in enumerate(build_analysis_prompts(page_content, job_title, job_link)):
+            custom_id = f"job-{job_index}-chunk-{chunk_index}"
+            requests.append((custom_id, build_chat_completion_body(prompt)))
+            custom_ids.append(custom_id)
+        jobs.append({"title": job_title, "link": job_link, "content_hash": content_hash, "custom_ids": custom_ids})
+
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    created_at = datetime.now()
+    input_path = os.path.join(BATCH_DIR, f"{created_at.strftime('%Y%m%d-%H%M%S')}_input.jsonl")
+    write_batch_input(input_path, requests)
+
+    async with OpenAIClientManager(max_in_flight=1) as llm:
+        if llm.client is None:
+            logging.error("エラー: OPENAI_API_KEYが設定されていません。バッチを提出できません。")
+            return None
+        batch_id = await submit_batch(llm, input_path, metadata={"description": f"findy jobs ({len(jobs)})"})
+    if batch_id is None:
+        return None
+
+    _save_manifest({
+        "batch_id": batch_id,
+        "created_at": created_at.isoformat(),
+        "model": get_openai_model_name(),
+        "input_file": input_path,
+        "merged": False,
+        "jobs": jobs,
+    })
+    logging.info(f"バッチ {batch_id} を提出しました (求人 {len(jobs)} 件, リクエスト {len(requests)} 件)。")
+    return batch_id
+
+def merge_batch_results(manifest: dict, results: dict, cached_results: dict, journal: CacheJournal) -> tuple[int, int]:
+    """バッチ結果を求人ごとにまとめてキャッシュへ反映し、(成功件数, 失敗件数) を返す"""
+    succeeded, failed = 0, 0
+    for job in manifest.get("jobs", []):
+        job_title, job_link = job["title"], job["link"]
+        responses = [results.get(custom_id) for custom_id in job["custom_ids"]]
+        errors = [response if isinstance(response, str) else "結果がありません"
+                  for response in responses if not isinstance(response, tuple)]
+        if errors:
+            failed += 1
+            previous_entry = cached_results.get(job_link)
+            if previous_entry and not previous_entry.get("エラー"):
+                logging.warning(f"  [{job_title}] バッチ解析に失敗しましたが、前回の解析結果を保持します: {errors[0]}")
+                continue
+            logging.error(f"  [{job_title}] バッチ解析に失敗しました: {errors[0]}")
+            result = {"元タイトル": job_title, "元リンク": job_link, "エラー": f"バッチ解析エラー: {errors[0]}"}
+        else:
+            result = assemble_analysis_result(responses, job_title, job_link, job["content_hash"])
+            if result.get("エラー"):
+                failed += 1
+            else:
+                succeeded += 1
+                token_usage = result[TOKEN_USAGE_KEY]
+                logging.info(f"  [{job_title}] バッチ解析結果を反映しました。トークン: 入力 {token_usage['prompt_tokens']}, 出力 {token_usage['completion_tokens']}")
+        cached_results[job_link] = summarize_entry(result)
+        journal.append(result)
+    return succeeded, failed
+
+async def collect_analysis_batch(batch_id: str, poll_interval: float = DEFAULT_POLL_INTERVAL_SEC) -> bool:
+    """バッチの終了を待ち、結果をURLごとにキャッシュへ取り込む。取り込めた場合は True"""
+    manifest = _load_manifest(batch_id)
+    if manifest is None:
+        return False
+    if manifest.get("merged"):
+        logging.info(f"バッチ {batch_id} の結果は取り込み済みです。")
+        return True
+
+    async with OpenAIClientManager(max_in_flight=1) as llm:
+        if llm.client is None:
+            logging.error("エラー: OPENAI_API_KEYが設定されていません。バッチの結果を取得できません。")
+            return False
+        try:
+            batch = await wait_for_batch(llm, batch_id, poll_interval)
+            results = await download_batch_results(llm, batch)
+        except Exception as e:
+            logging.error(f"バッチ {batch_id} の状態確認・結果取得に失敗しました: {e}")
+            return False
+
+    if batch.status != "completed":
+        # 期限切れ・キャンセルでも完了済みの分は取り込み、残りはエラーとして次回の再解析対象にする
+        logging.warning(f"バッチ {batch_id} は {batch.status} で終了しました。取得できた結果のみ取り込みます。")
+
+    cached_results = load_cache(False)
+    with CacheJournal() as journal:
+        succeeded, failed = merge_batch_results(manifest, results, cached_results, journal)
+    compact_cache()
+
+    manifest["merged"] = True
+    manifest["status"] = batch.status
+    manifest["merged_at"] = datetime.now().isoformat()
+    _save_manifest(manifest)
+    logging.info(f"--- バッチ {batch_id} の結果を取り込みました (成功 {succeeded} 件, 失敗 {failed} 件) ---")
+    return True
+
+async def run_batch(force_reload: bool, headless: bool, batch_id: str | None = None, wait: bool = True,
+                    poll_interval: float = DEFAULT_POLL_INTERVAL_SEC, **fetch_options):
+    """batch サブコマンドの本体: 提出 → 終了待ち → 取り込み (batch_id 指定時は提出済みバッチの取り込みのみ)"""
+    if batch_id is None:
+        batch_id = await submit_analysis_batch(force_reload, headless, **fetch_options)
+        if batch_id is None:
+            return
+        if not wait:
+            logging.info(f"結果は後で `batch --resume {batch_id}` で取り込めます。")
+            return
+    await collect_analysis_batch(batch_id, poll_interval)
@@ -1,47 +1,278 @@
-import os
 import asyncio
-import json
 import traceback
 import logging
-from dotenv import load_dotenv
 
 # 相対インポートに変更
-from findy_scraper.infrastructure.playwright_handler import PlaywrightManager, login_findy, get_all_liked_job_links, get_job_page_content
-from findy_scraper.infrastructure.llm_analyzer import analyze_job_page_with_gpt
-from findy_scraper.infrastructure.cache_manager import load_cache, save_cache
-
-# 環境変数を読み込む (cli.pyでも読むが、念のためここでも)
-load_dotenv()
-
-# ログイン情報を環境変数から取得
-EMAIL = os.getenv('FINDY_EMAIL')
-PASSWORD = os.getenv('FINDY_PASSWORD')
-
-# 個別の求人処理を行う非同期関数
-async def process_single_job(page, job_info, index, total):
-    job_link = job_info.get('link', 'リンク不明')
-    job_title = job_info.get('title', 'タイトル不明')
-    logging.info(f"[{index+1}/{total}] 処理開始: {job_title} ({job_link})")
-
-    # 1. テキスト取得
-    await asyncio.sleep(1)
-    page_content = await get_job_page_content(page, job_link, job_title)
-
-    analysis_result = None
-    if page_content:
-        # 2. LLM解析
-        analysis_result = await analyze_job_page_with_gpt(page_content, job_title, job_link)
-    else:
-        # テキスト取得失敗
-        logging.warning(f"  [{job_title}] テキスト取得失敗のためLLM解析をスキップ")
-        analysis_result = {"元タイトル": job_title, "元リンク": job_link, "エラー": "ページテキスト取得失敗"}
-
-    return analysis_result
+from findy_scraper.infrastructure.playwright_handler import PlaywrightManager, login_findy, get_all_liked_job_links, get_all_liked_job_links_parallel, fetch_job_page_content
+from findy_scraper.infrastructure.llm_analyzer import (
+    analyze_job_page_with_gpt, analyze_job_pages_packed, compute_content_hash, count_tokens, is_packable,
+    get_text_token_budget, OpenAIClientManager, CONTENT_HASH_KEY,
+)
+from findy_scraper.infrastructure.cache_manager import load_cache, compact_cache, summarize_entry, CacheJournal
+from findy_scraper.infrastructure.instrumentation import RunRecorder, span
+# 既定値・保存先はCLIからも参照するため settings に置く (環境変数の読み込みは cli.py の load_dotenv で行う)
+from findy_scraper.core.settings import (
+    STORAGE_STATE_FILE, DEFAULT_REPORT_FILE, DEFAULT_FETCH_CONCURRENCY, DEFAULT_LLM_CONCURRENCY, DEFAULT_QUEUE_SIZE,
+    DEFAULT_MAX_IN_FLIGHT, DEFAULT_PACK_MAX_JOBS, get_findy_credentials,
+)
+
+# キューの終端を示す目印
+_PIPELINE_END = None
+
+# 取得ワーカー: 求人リストからジョブを取り出し、プールのタブで詳細ページを取得してキューへ流す
+async def _fetch_worker(worker_id: int, playwright_manager: PlaywrightManager, job_iter, total: int,
+                        fetched_queue: asyncio.Queue, on_result, stats: dict, cached_results: dict):
+    loop = asyncio.get_running_loop()
+    for index, job_info in job_iter:
+        job_link = job_info.get('link', 'リンク不明')
+        job_title = job_info.get('title', 'タイトル不明')
+        logging.info(f"[取得 {index+1}/{total}] (fetch-{worker_id}) 処理開始: {job_title} ({job_link})")
+
+        # 1. テキスト取得 (プールからタブを借り、取得が終わったらすぐ返却する。一時的なエラーは再試行する)
+        started = loop.time()
+        page_content = await fetch_job_page_content(playwright_manager, job_link, job_title)
+        stats['fetch_time'] += loop.time() - started
+        stats['fetched'] += 1
+
+        previous_entry = cached_results.get(job_link)
+        has_valid_previous = bool(previous_entry) and not previous_entry.get("エラー")
+
+        if not page_content:
+            # テキスト取得失敗はLLMに回さず、その場で結果とする (有効な前回結果があればそれを残す)
+            if has_valid_previous:
+                logging.warning(f"  [{job_title}] テキスト取得に失敗しましたが、前回の解析結果を保持します。")
+                continue
+            logging.warning(f"  [{job_title}] テキスト取得失敗のためLLM解析をスキップ")
+            on_result({"元タイトル": job_title, "元リンク": job_link, "エラー": "ページテキスト取得失敗"})
+            continue
+
+        # 2. 本文・モデル・抽出項目が前回解析時と同じなら、LLMを呼ばずに前回結果を使う
+        content_hash = compute_content_hash(page_content)
+        if has_valid_previous and previous_entry.get(CONTENT_HASH_KEY) == content_hash:
+            logging.info(f"  [{job_title}] 内容に変更がないためLLM解析をスキップします。")
+            stats['unchanged'] += 1
+            continue
+
+        # 3. キューへ投入 (満杯ならLLM側が追いつくまで待つ = バックプレッシャー)
+        put_started = loop.time()
+        await fetched_queue.put((job_info, page_content, content_hash, loop.time()))
+        put_wait = loop.time() - put_started
+        stats['fetch_put_wait'] += put_wait
+        stats['max_queue_depth'] = max(stats['max_queue_depth'], fetched_queue.qsize())
+        logging.info(f"  [{job_title}] 解析キューへ投入 (待ち {put_wait:.2f}秒, キュー深さ {fetched_queue.qsize()}/{fetched_queue.maxsize})")
+
+# LLMワーカー: キューから取得済みページを取り出して解析する
+async def _analyze_worker(worker_id: int, llm: OpenAIClientManager, fetched_queue: asyncio.Queue, on_result, stats: dict,
+                          pack_max_jobs: int = DEFAULT_PACK_MAX_JOBS):
+    loop = asyncio.get_running_loop()
+    while True:
+        get_started = loop.time()
+        item = await fetched_queue.get()
+        get_wait = loop.time() - get_started
+        dequeued = [item]
+        try:
+            if item is _PIPELINE_END:
+                return
+
+            # 短い求人は、キューに既に溜まっている短い求人と合わせて1リクエストで解析する (待ってまでは集めない)
+            pack, leftover, reached_end = [item], None, False
+            if pack_max_jobs > 1 and is_packable(text_tokens := count_tokens(item[1])):
+                while len(pack) < pack_max_jobs and not fetched_queue.empty():
+                    next_item = fetched_queue.get_nowait()
+                    dequeued.append(next_item)
+                    if next_item is _PIPELINE_END:
+                        # 自分宛ての終了の目印として受け取り、手元の求人を解析してから終了する
+                        reached_end = True
+                        break
+                    next_tokens = count_tokens(next_item[1])
+                    if not is_packable(next_tokens) or text_tokens + next_tokens > get_text_token_budget():
+                        leftover = next_item
+                        break
+                    pack.append(next_item)
+                    text_tokens += next_tokens
+
+            for job_info, _, _, enqueued_at in pack + ([leftover] if leftover else []):
+                queued_for = loop.time() - enqueued_at
+                stats['queue_residence'] += queued_for
+                logging.info(f"  [{job_info.get('title', 'タイトル不明')}] (llm-{worker_id}) 解析開始 (取り出し待ち {get_wait:.2f}秒, キュー滞留 {queued_for:.2f}秒, 残りキュー {fetched_queue.qsize()})")
+            stats['llm_get_wait'] += get_wait
+
+            started = loop.time()
+            if len(pack) > 1:
+                analysis_results = await analyze_job_pages_packed(
+                    [(page_content, job_info.get('title', 'タイトル不明'), job_info.get('link', 'リンク不明'), content_hash)
+                     for job_info, page_content, content_hash, _ in pack],
+                    llm)
+                stats['packed_requests'] += 1
+                stats['packed_jobs'] += len(pack)
+            else:
+                analysis_results = [await _analyze_single(llm, item)]
+            if leftover:
+                analysis_results.append(await _analyze_single(llm, leftover))
+            stats['llm_time'] += loop.time() - started
+            stats['analyzed'] += len(analysis_results)
+            for analysis_result in analysis_results:
+                if analysis_result:
+                    on_result(analysis_result)
+            if reached_end:
+                return
+        finally:
+            for _ in dequeued:
+                fetched_queue.task_done()
+
+async def _analyze_single(llm: OpenAIClientManager, item) -> dict | None:
+    job_info, page_content, content_hash, _ = item
+    return await analyze_job_page_with_gpt(page_content, job_info.get('title', 'タイトル不明'), job_info.get('link', 'リンク不明'), llm, content_hash)
+
+def _new_pipeline_stats() -> dict:
+    return {
+        'fetched': 0, 'analyzed': 0, 'unchanged': 0,
+        'fetch_time': 0.0, 'fetch_put_wait': 0.0,
+        'llm_time': 0.0, 'llm_get_wait': 0.0, 'queue_residence': 0.0,
+        'max_queue_depth': 0, 'packed_requests': 0, 'packed_jobs': 0,
+    }
+
+async def fetch_job_pages(playwright_manager: PlaywrightManager, links_to_process: list[dict], on_result=None,
+                          cached_results: dict | None = None) -> list[tuple[dict, str, str]]:
+    """LLM解析を行わず、詳細ページの取得だけをタブ数分の並列で行う (Batch API用)
+
+    戻り値は解析が必要な (求人情報, ページ本文, コンテンツハッシュ) のリスト。
+    取得失敗の扱いと、内容に変更がない求人の除外はパイプラインと同じ。
+    """
+    fetched_queue: asyncio.Queue = asyncio.Queue() # LLM側がいないため上限なし
+    stats = _new_pipeline_stats()
+    job_iter = iter(enumerate(links_to_process))
+    await asyncio.gather(*(
+        _fetch_worker(i + 1, playwright_manager, job_iter, len(links_to_process), fetched_queue,
+                      on_result or (lambda result: None), stats, cached_results or {})
+        for i in range(playwright_manager.page_pool_size)
+    ))
+    fetched_pages = []
+    while not fetched_queue.empty():
+        job_info, page_content, content_hash, _ = fetched_queue.get_nowait()
+        fetched_pages.append((job_info, page_content, content_hash))
+    logging.info(f"詳細ページの取得完了: 取得 {stats['fetched']} 件, うち変更なし {stats['unchanged']} 件, 解析対象 {len(fetched_pages)} 件")
+    playwright_manager.retry_policy.log_summary()
+    return fetched_pages
+
+# 詳細ページ取得とLLM解析を別々の並列度で流すパイプライン
+async def run_analysis_pipeline(playwright_manager: PlaywrightManager, llm: OpenAIClientManager, links_to_process: list[dict],
+                                llm_concurrency: int = DEFAULT_LLM_CONCURRENCY,
+                                queue_size: int = DEFAULT_QUEUE_SIZE, on_result=None,
+                                cached_results: dict | None = None, pack_max_jobs: int = DEFAULT_PACK_MAX_JOBS) -> list[dict]:
+    """取得ワーカー(タブ数分)とLLMワーカーを有界キューで繋ぎ、両者の処理時間を重ねる
+
+    on_result が指定されていれば、結果が1件確定するたびに呼び出す (キャッシュへの逐次保存用)。
+    cached_results に同じコンテンツハッシュの解析結果があるジョブはLLMに回さない。
+    pack_max_jobs が2以上なら、LLMワーカーはキューに溜まった短い求人を最大その件数までまとめて解析する。
+    """
+    cached_results = cached_results or {}
+    fetch_concurrency = playwright_manager.page_pool_size
+    total = len(links_to_process)
+    fetched_queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+    results: list[dict] = []
+
+    def emit(result: dict):
+        results.append(result)
+        if on_result:
+            on_result(result)
+    stats = _new_pipeline_stats()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    # 全取得ワーカーで同じイテレータを共有し、ジョブを1件ずつ取り合う
+    job_iter = iter(enumerate(links_to_process))
+    analyze_tasks = [
+        asyncio.create_task(_analyze_worker(i + 1, llm, fetched_queue, emit, stats, pack_max_jobs), name=f"llm-{i + 1}")
+        for i in range(max(1, llm_concurrency))
+    ]
+    fetch_tasks = [
+        asyncio.create_task(_fetch_worker(i + 1, playwright_manager, job_iter, total, fetched_queue, emit, stats, cached_results), name=f"fetch-{i + 1}")
+        for i in range(fetch_concurrency)
+    ]
+    try:
+        await asyncio.gather(*fetch_tasks)
+        # 取得が全て終わったらLLMワーカーに終了を伝える
+        for _ in analyze_tasks:
+            await fetched_queue.put(_PIPELINE_END)
+        await asyncio.gather(*analyze_tasks)
+    finally:
+        for task in fetch_tasks + analyze_tasks:
+            if not task.done():
+                task.cancel()
+
+    elapsed = loop.time() - started
+    logging.info("--- パイプライン統計 ---")
+    logging.info(f"  全体: {elapsed:.1f}秒 (対象 {total} 件)")
+    logging.info(f"  取得ステージ: 並列 {fetch_concurrency}, 取得 {stats['fetched']} 件 (うち変更なし {stats['unchanged']} 件), 取得時間合計 {stats['fetch_time']:.1f}秒, キュー投入待ち合計 {stats['fetch_put_wait']:.1f}秒")
+    logging.info(f"  LLMステージ: 並列 {len(analyze_tasks)}, 解析 {stats['analyzed']} 件, 解析時間合計 {stats['llm_time']:.1f}秒, 取り出し待ち合計 {stats['llm_get_wait']:.1f}秒")
+    if stats['packed_requests']:
+        logging.info(f"  まとめて解析: {stats['packed_requests']} リクエストで {stats['packed_jobs']} 件 (1リクエストあたり最大 {pack_max_jobs} 件)")
+    logging.info(f"  キュー: 上限 {fetched_queue.maxsize}, 最大深さ {stats['max_queue_depth']}, 平均滞留 {stats['queue_residence'] / max(1, stats['analyzed']):.2f}秒")
+    playwright_manager.retry_policy.log_summary()
+    llm.retry_policy.log_summary()
+    return results
+
+async def ensure_logged_in(playwright_manager: PlaywrightManager, page, reuse_session: bool = True):
+    """保存済みのログインセッションが有効ならそれを使い、無効ならログインしてセッションを保存する"""
+    with span("login") as metrics:
+        if reuse_session and await playwright_manager.is_session_valid():
+            logging.info("保存済みのログインセッションを再利用するため、ログインをスキップします。")
+            metrics["reused_session"] = True
+        else:
+            # 復元したCookieが残っているとログイン済みの画面が表示され、ログインフォームが見つからない
+            await playwright_manager.clear_session()
+            email, password = get_findy_credentials()
+            await login_findy(page, email, password)
+            await playwright_manager.save_storage_state()
+            metrics["reused_session"] = False
+
+async def collect_liked_job_links(playwright_manager: PlaywrightManager, page, parallel_pagination: bool = False) -> list[dict]:
+    with span("likes_pagination", "parallel" if parallel_pagination else "sequential") as metrics:
+        if parallel_pagination:
+            all_job_links_info = await get_all_liked_job_links_parallel(page, playwright_manager, metrics)
+        else:
+            all_job_links_info = await get_all_liked_job_links(page)
+        metrics["links"] = len(all_job_links_info)
+    return all_job_links_info
+
+def select_jobs_to_process(all_job_links_info: list[dict], cached_results: dict, refresh_changed_only: bool = False,
+                           excluded_links: set | None = None) -> list[dict]:
+    """キャッシュと照らし合わせて、今回ページを取得する求人を選ぶ (excluded_links に含まれる求人は除く)"""
+    links_to_process = []
+    excluded_links = excluded_links or set()
+    for job_info in all_job_links_info:
+        link = job_info.get('link')
+        if link in excluded_links:
+            logging.info(f"提出済みのバッチで解析中のためスキップ: {link}")
+        elif link and link != "不明":
+            # キャッシュにない or キャッシュがエラーだった場合に対象とする
+            cache_key = link
+            cached_entry = cached_results.get(cache_key)
+
+            if not cached_entry or cached_entry.get("エラー"):
+                if cached_entry and cached_entry.get("エラー"):
+                     logging.info(f"キャッシュにエラー記録あり、再試行: {link}")
+                links_to_process.append(job_info)
+            elif refresh_changed_only:
+                # ページは再取得し、内容が変わっていた場合だけ再解析する
+                links_to_process.append(job_info)
+            # else:
+            #     logging.debug(f"キャッシュヒット: {link}") # デバッグ用
+        else:
+            logging.warning(f"無効なリンクまたはタイトル不明のためスキップ: {job_info}")
+    return links_to_process
 
 # メインの処理関数
-async def scrape_and_analyze(force_reload: bool, headless: bool):
+async def scrape_and_analyze(force_reload: bool, headless: bool, fetch_concurrency: int = DEFAULT_FETCH_CONCURRENCY,
+                             llm_concurrency: int = DEFAULT_LLM_CONCURRENCY, queue_size: int = DEFAULT_QUEUE_SIZE,
+                             llm_max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, refresh_changed_only: bool = False,
+                             parallel_pagination: bool = False, block_resources: bool = True,
+                             allowed_hosts: list[str] | None = None, reuse_session: bool = True,
+                             pack_max_jobs: int = DEFAULT_PACK_MAX_JOBS, report_path: str | None = DEFAULT_REPORT_FILE,
+                             trace_path: str | None = None):
     # 環境変数のチェック
-    if not EMAIL or not PASSWORD:
+    if not all(get_findy_credentials()):
         logging.error("エラー: 環境変数 FINDY_EMAIL または FINDY_PASSWORD が設定されていません。")
         return
 
@@ -51,70 +282,81 @@ async def scrape_and_analyze(force_reload: bool, headless: bool):
     all_job_links_info = [] # 全ページのリンク情報 [{title: str, link: str}]
     links_to_process = []   # 今回処理が必要なリンク情報
     newly_analyzed_jobs = [] # 新しく解析されたジョブ
+    failed_jobs = []         # 取得・解析に失敗したジョブ
 
-    # Playwrightの管理
-    async with PlaywrightManager(headless=headless) as page:
-        try:
-            # === ログイン ===
-            await login_findy(page, EMAIL, PASSWORD)
+    # Playwrightの管理 (詳細ページ取得用のタブ数 = 同時取得数)
+    # OpenAIクライアントは実行全体で1つを使い回し、終了時に閉じる
+    # 保存済みのログインセッションは reuse_session が True の場合だけ読み込み、False の場合は必ずログインし直して保存する
+    playwright_manager = PlaywrightManager(headless=headless, page_pool_size=fetch_concurrency,
+                                           block_resources=block_resources, allowed_hosts=allowed_hosts,
+                                           storage_state_path=STORAGE_STATE_FILE, restore_storage_state=reuse_session)
+    # ログイン・いいね一覧・詳細ページ取得・LLM呼び出しの所要時間を計測する
+    with RunRecorder() as recorder:
+        async with playwright_manager as page, OpenAIClientManager(max_in_flight=llm_max_in_flight) as llm:
+            try:
+                # === ログイン (保存済みセッションが有効ならスキップ) ===
+                await ensure_logged_in(playwright_manager, page, reuse_session)
 
-            # === いいねページの全リンク収集 ===
-            all_job_links_info = await get_all_liked_job_links(page)
+                # === いいねページの全リンク収集 ===
+                all_job_links_info = await collect_liked_job_links(playwright_manager, page, parallel_pagination)
 
-            # === 解析対象の選定 ===
-            for job_info in all_job_links_info:
-                link = job_info.get('link')
-                if link and link != "不明":
-                    # キャッシュにない or キャッシュがエラーだった場合に対象とする
-                    cache_key = link
-                    cached_entry = cached_results.get(cache_key)
-
-                    if not cached_entry or cached_entry.get("エラー"):
-                        if cached_entry and cached_entry.get("エラー"):
-                             logging.info(f"キャッシュにエラー記録あり、再試行: {link}")
-                        links_to_process.append(job_info)
-                    # else:
-                    #     logging.debug(f"キャッシュヒット: {link}") # デバッグ用
+                # === 解析対象の選定 ===
+                links_to_process = select_jobs_to_process(all_job_links_info, cached_results, refresh_changed_only)
+
+                if refresh_changed_only:
+                    logging.info(f"--- 今回取得する求人数: {len(links_to_process)} 件 (内容に変更があったものだけ解析します) --- ")
                 else:
-                    logging.warning(f"無効なリンクまたはタイトル不明のためスキップ: {job_info}")
-
-            logging.info(f"--- 今回解析が必要な求人数: {len(links_to_process)} 件 --- ")
-
-            # === 各求人詳細ページのテキスト取得 & LLM解析 ===
-            if links_to_process:
-                logging.info("\n--- 詳細ページのテキスト取得とLLM解析開始 (1秒間隔) ---")
-                tasks = []
-                for i, job_info in enumerate(links_to_process):
-                    tasks.append(process_single_job(page, job_info, i, len(links_to_process)))
-
-                # asyncio.gatherでタスクを実行
-                results = await asyncio.gather(*tasks)
-
-                # 結果をキャッシュに反映
-                for result in results:
-                    if result:
-                        link = result.get("元リンク")
-                        if link:
-                             cached_results[link] = result
-                             if not result.get("エラー"):
+                    logging.info(f"--- 今回解析が必要な求人数: {len(links_to_process)} 件 --- ")
+
+                # === 各求人詳細ページのテキスト取得 & LLM解析 ===
+                if links_to_process:
+                    logging.info(f"\n--- 詳細ページのテキスト取得とLLM解析開始 (取得並列: {playwright_manager.page_pool_size}, LLM並列: {llm_concurrency}, キュー上限: {queue_size}) ---")
+
+                    # 結果は確定するたびにキャッシュへ追記し、途中で落ちても失われないようにする
+                    with CacheJournal() as journal:
+                        def record_result(result: dict):
+                            link = result.get("元リンク")
+                            if link:
+                                cached_results[link] = summarize_entry(result)
+                                journal.append(result)
+                            # テキスト取得失敗・解析エラー・リンクの無い結果は失敗として実行レポートに数える
+                            if link and not result.get("エラー"):
                                 newly_analyzed_jobs.append(result)
+                            else:
+                                failed_jobs.append(result)
 
-                logging.info(f"--- 詳細ページのテキスト取得とLLM解析完了 ({len(newly_analyzed_jobs)} 件成功) --- ")
-            else:
-                logging.info("テキストを取得・解析する新しい求人はありません。")
+                        await run_analysis_pipeline(playwright_manager, llm, links_to_process, llm_concurrency, queue_size,
+                                                    on_result=record_result, cached_results=cached_results,
+                                                    pack_max_jobs=pack_max_jobs)
 
-        except Exception as e:
-            logging.error(f"メイン処理で予期せぬエラーが発生しました: {e}")
-            traceback.print_exc()
-            logging.warning("エラーが発生しましたが、途中までの結果をキャッシュに保存します。")
-        finally:
-            # === 結果の保存 ===
-            save_cache(cached_results)
-
-            # === コンソール出力 (最終結果) ===
-            # logging.info("\n--- 最終結果（キャッシュ全体から最初の5件）--- ") # 冗長なのでコメントアウト
-            # final_results_list = list(cached_results.values())
-            # for i, job_data in enumerate(final_results_list[:5]):
-            #     logging.info(f"\n--- 求人 {i+1} ---") # print -> logging
-            #     for key, value in job_data.items():
-            #         logging.info(f"{key}: {value}") # print -> logging 
\ No newline at end of file
+                    logging.info(f"--- 詳細ページのテキスト取得とLLM解析完了 ({len(newly_analyzed_jobs)} 件成功, {len(failed_jobs)} 件失敗) --- ")
+                else:
+                    logging.info("テキストを取得・解析する新しい求人はありません。")
+
+            except Exception as e:
+                logging.error(f"メイン処理で予期せぬエラーが発生しました: {e}")
+                traceback.print_exc()
+                logging.warning("エラーが発生しましたが、途中までの結果をキャッシュに保存します。")
+            finally:
+                # === 結果の保存 (結果は追記済みのため、URLごとに最新の1件ずつに圧縮する) ===
+                compact_cache()
+
+                # === 実行レポート (ステージごとの所要時間の分布とスループット) ===
+                jobs_summary = {
+                    "liked": len(all_job_links_info),
+                    "targets": len(links_to_process),
+                    "analyzed": len(newly_analyzed_jobs),
+                    "errors": len(failed_jobs),
+                }
+                if report_path:
+                    recorder.write_report(report_path, jobs_summary)
+                if trace_path:
+                    recorder.write_chrome_trace(trace_path)
+
+                # === コンソール出力 (最終結果) ===
+                # logging.info("\n--- 最終結果（キャッシュ全体から最初の5件）--- ") # 冗長なのでコメントアウト
+                # final_results_list = list(cached_results.values())
+                # for i, job_data in enumerate(final_results_list[:5]):
+                #     logging.info(f"\n--- 求人 {i+1} ---") # print -> logging
+                #     for key, value in job_data.items():
+                #         logging.info(f"{key}: {value}") # print -> logging 
\ No newline at end of file
@@ -1,32 +1,225 @@
-import os
 import asyncio
 import argparse
+import logging
 from dotenv import load_dotenv
 
-# 相対インポートに変更
-from findy_scraper.application import main_logic
+# Playwright・OpenAI を読み込むモジュール (application 以下) は、実行するコマンドが決まってから読み込む
+from findy_scraper.core import settings
+from findy_scraper.infrastructure import cache_manager
 
-async def main():
-    # 環境変数を読み込む
-    load_dotenv()
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-    # コマンドライン引数の設定
-    parser = argparse.ArgumentParser(description='Findyからいいねされた求人情報を取得し、LLMで解析します。')
-    parser.add_argument(
+# 取得・解析の数値オプションのうち、1以上でなければならないもの
+_POSITIVE_INT_OPTIONS = ('fetch_concurrency', 'llm_concurrency', 'queue_size', 'llm_max_in_flight', 'pack_max_jobs')
+
+def add_fetch_arguments(parser: argparse.ArgumentParser):
+    """いいね一覧と詳細ページの取得に関するオプション (通常の解析と Batch API での解析で共通)"""
+    reload_group = parser.add_mutually_exclusive_group()
+    reload_group.add_argument(
         '--force-reload',
         action='store_true',
         help='キャッシュを無視して全ての求人を再取得・再解析します。'
     )
+    reload_group.add_argument(
+        '--refresh-changed-only',
+        action='store_true',
+        help='全ての求人ページを再取得し、本文・モデル・抽出項目のいずれかが前回解析時から変わったものだけ再解析します。'
+    )
     parser.add_argument(
         '--no-headless',
         action='store_false',
         dest='headless', # headlessをTrueにするのをデフォルトに
         help='ブラウザを非ヘッドレスモードで起動します（デバッグ用）。'
     )
-    parser.set_defaults(headless=True)
+    parser.add_argument(
+        '--fetch-concurrency',
+        type=int,
+        default=settings.DEFAULT_FETCH_CONCURRENCY,
+        help=f'詳細ページを同時に取得するタブ数 (デフォルト: {settings.DEFAULT_FETCH_CONCURRENCY})。'
+    )
+    parser.add_argument(
+        '--parallel-pagination',
+        action='store_true',
+        help='いいね一覧の2ページ目以降を、ページURLを直接指定してタブプールで並行に取得します。'
+    )
+    parser.add_argument(
+        '--no-block-resources',
+        action='store_false',
+        dest='block_resources',
+        help='詳細ページ取得時に画像・フォント・計測スクリプト等の読み込みを中断しないようにします。'
+    )
+    parser.add_argument(
+        '--allowed-hosts',
+        type=lambda value: [host.strip() for host in value.split(',') if host.strip()],
+        default=None,
+        help='詳細ページ取得時に通信を許可するホスト (カンマ区切り、サブドメインを含む)。指定するとそれ以外のホストへの通信を全て中断します。'
+    )
+    parser.add_argument(
+        '--fresh-login',
+        action='store_false',
+        dest='reuse_session',
+        help='保存済みのログインセッションを使わず、必ずログインし直します。'
+    )
+    parser.set_defaults(headless=True, block_resources=True, reuse_session=True)
+
+def add_analysis_arguments(parser: argparse.ArgumentParser):
+    """取得したページをその場でLLM解析する場合のオプション"""
+    parser.add_argument(
+        '--llm-concurrency',
+        type=int,
+        default=settings.DEFAULT_LLM_CONCURRENCY,
+        help=f'LLM解析を同時に実行するワーカー数 (デフォルト: {settings.DEFAULT_LLM_CONCURRENCY})。'
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=settings.DEFAULT_QUEUE_SIZE,
+        help=f'取得済みでLLM解析待ちのページを溜めておける上限 (デフォルト: {settings.DEFAULT_QUEUE_SIZE})。'
+    )
+    parser.add_argument(
+        '--llm-max-in-flight',
+        type=int,
+        default=settings.DEFAULT_MAX_IN_FLIGHT,
+        help=f'OpenAI APIへ同時に送信中にできるリクエスト数の上限。接続プールの大きさもこれに合わせます (デフォルト: {settings.DEFAULT_MAX_IN_FLIGHT})。'
+    )
+    parser.add_argument(
+        '--pack-max-jobs',
+        type=int,
+        default=settings.DEFAULT_PACK_MAX_JOBS,
+        help='短い求人を最大この件数までまとめて1回のLLMリクエストで解析します。1ならまとめません (デフォルト: 1)。'
+    )
+    parser.add_argument(
+        '--report',
+        metavar='PATH',
+        default=settings.DEFAULT_REPORT_FILE,
+        help=f'ステージごとの所要時間 (p50/p95/最大) とスループットをまとめた実行レポート(JSON)の保存先 (デフォルト: {settings.DEFAULT_REPORT_FILE})。'
+    )
+    parser.add_argument(
+        '--trace',
+        metavar='PATH',
+        default=None,
+        help='並行タスクの処理区間を chrome://tracing / Perfetto 形式で保存します。'
+    )
+
+def add_batch_arguments(parser: argparse.ArgumentParser):
+    """OpenAI Batch API で解析する場合のオプション"""
+    parser.add_argument(
+        '--no-wait',
+        action='store_false',
+        dest='wait',
+        help='バッチを提出したら終了します。結果は後で --resume で取り込みます。'
+    )
+    parser.add_argument(
+        '--resume',
+        metavar='BATCH_ID',
+        dest='batch_id',
+        default=None,
+        help='提出済みのバッチの終了を待ち、結果をキャッシュに取り込みます (新しいバッチは提出しません)。'
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=settings.DEFAULT_POLL_INTERVAL_SEC,
+        help=f'バッチの状態を確認する間隔(秒) (デフォルト: {settings.DEFAULT_POLL_INTERVAL_SEC:.0f})。'
+    )
+    parser.set_defaults(wait=True)
+
+def add_convert_cache_arguments(parser: argparse.ArgumentParser):
+    """解析結果キャッシュの形式を変換する場合のオプション"""
+    parser.add_argument(
+        '--to',
+        dest='target_format',
+        required=True,
+        choices=cache_manager.CACHE_FORMATS,
+        help='変換先の形式 (jsonl: 1行1件のJSON, sqlite: 選定に使う項目を列に持ち、解析結果を圧縮して保存するSQLite)。'
+    )
+    parser.add_argument(
+        '--keep-source',
+        action='store_true',
+        help='変換元のファイルを削除せずに残します。'
+    )
+
+def validate_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """数値オプションの範囲を確認する (指定できないオプションは確認しない)"""
+    for option_name in _POSITIVE_INT_OPTIONS:
+        if getattr(args, option_name, 1) < 1:
+            parser.error(f"--{option_name.replace('_', '-')} には1以上の値を指定してください。")
+    if getattr(args, 'poll_interval', 1) <= 0:
+        parser.error("--poll-interval には0より大きい値を指定してください。")
+
+async def run_scrape(args: argparse.Namespace):
+    """求人ページを取得し、その場でLLM解析する"""
+    from findy_scraper.application import main_logic
+
+    await main_logic.scrape_and_analyze(
+        args.force_reload, args.headless,
+        fetch_concurrency=args.fetch_concurrency,
+        llm_concurrency=args.llm_concurrency,
+        queue_size=args.queue_size,
+        llm_max_in_flight=args.llm_max_in_flight,
+        refresh_changed_only=args.refresh_changed_only,
+        parallel_pagination=args.parallel_pagination,
+        block_resources=args.block_resources,
+        allowed_hosts=args.allowed_hosts,
+        reuse_session=args.reuse_session,
+        pack_max_jobs=args.pack_max_jobs,
+        report_path=args.report,
+        trace_path=args.trace,
+    )
+
+async def run_batch(args: argparse.Namespace):
+    """求人ページを取得し、OpenAI Batch API で一括解析する"""
+    from findy_scraper.application import batch_logic
+
+    await batch_logic.run_batch(
+        args.force_reload, args.headless,
+        batch_id=args.batch_id,
+        wait=args.wait,
+        poll_interval=args.poll_interval,
+        fetch_concurrency=args.fetch_concurrency,
+        refresh_changed_only=args.refresh_changed_only,
+        parallel_pagination=args.parallel_pagination,
+        block_resources=args.block_resources,
+        allowed_hosts=args.allowed_hosts,
+        reuse_session=args.reuse_session,
+    )
+
+def run_convert_cache(args: argparse.Namespace) -> bool:
+    """キャッシュの形式を変換する。成功した場合は True"""
+    return cache_manager.convert_cache(args.target_format, keep_source=args.keep_source) is not None
+
+async def main():
+    # 環境変数を読み込む
+    load_dotenv()
+
+    # コマンドライン引数の設定
+    parser = argparse.ArgumentParser(description='Findyからいいねされた求人情報を取得し、LLMで解析します。')
+    add_fetch_arguments(parser)
+    add_analysis_arguments(parser)
+
+    # サブコマンド (指定しない場合は通常どおり取得と解析を行う)
+    subparsers = parser.add_subparsers(dest='command')
+    add_batch_arguments(subparsers.add_parser(
+        'batch',
+        help='解析をOpenAI Batch APIで一括実行します (上記のオプションはサブコマンドより前に指定します)。'
+    ))
+    add_convert_cache_arguments(subparsers.add_parser(
+        'convert-cache',
+        help='解析結果キャッシュの保存形式を変換します (変換後は .env の FINDY_CACHE_FORMAT も合わせて変更します)。'
+    ))
     args = parser.parse_args()
 
-    await main_logic.scrape_and_analyze(args.force_reload, args.headless)
+    if args.command == 'convert-cache':
+        if not run_convert_cache(args):
+            raise SystemExit(1)
+        return
+
+    validate_arguments(parser, args)
+    if args.command == 'batch':
+        await run_batch(args)
+        return
+    await run_scrape(args)
 
 if __name__ == "__main__":
     # 実行環境のイベントループを取得または新規作成
@@ -36,4 +229,4 @@ if __name__ == "__main__":
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
-    loop.run_until_complete(main()) 
\ No newline at end of file
+    loop.run_until_complete(main())
@@ -0,0 +1,27 @@
+import os
+
+# CLIの既定値など、Playwright・OpenAI を読み込まずに参照できる設定値
+from findy_scraper.infrastructure.cache_manager import CACHE_DIR
+
+# ログイン済みセッションの保存先 (Cookieを含むためGit管理外のキャッシュディレクトリに置く)
+STORAGE_STATE_FILE = os.path.join(CACHE_DIR, "findy_storage_state.json")
+
+# 実行レポート (ステージごとの所要時間・スループット) の保存先
+DEFAULT_REPORT_FILE = os.path.join(CACHE_DIR, "findy_run_report.json")
+
+# 詳細ページ取得に使うタブ数のデフォルト値
+DEFAULT_FETCH_CONCURRENCY = 3
+# LLM解析を同時に実行するワーカー数のデフォルト値
+DEFAULT_LLM_CONCURRENCY = 5
+# 取得済みページを溜めておくキューの上限 (これを超えると取得側が待たされる)
+DEFAULT_QUEUE_SIZE = 10
+# 同時に送信中にできるLLMリクエスト数のデフォルト値
+DEFAULT_MAX_IN_FLIGHT = 10
+# 短い求人をまとめて解析する場合の、1リクエストあたりの求人数のデフォルト上限 (1 = まとめない)
+DEFAULT_PACK_MAX_JOBS = 1
+# バッチの状態を確認する間隔 (秒)
+DEFAULT_POLL_INTERVAL_SEC = 30.0
+
+def get_findy_credentials() -> tuple[str | None, str | None]:
+    """ログイン情報 (FINDY_EMAIL, FINDY_PASSWORD) を返す (CLIが .env を読み込んだ後に読むため、呼び出し時に取得する)"""
+    return os.getenv('FINDY_EMAIL'), os.getenv('FINDY_PASSWORD')
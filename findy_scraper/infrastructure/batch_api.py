@@ -0,0 +1,96 @@
+import json
+import asyncio
+import logging
+from findy_scraper.infrastructure.llm_analyzer import OpenAIClientManager, usage_to_dict
+from findy_scraper.core.settings import DEFAULT_POLL_INTERVAL_SEC
+
+# Batch API で実行するエンドポイントと完了期限
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+# これ以上状態が変わらないバッチのステータス
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+def write_batch_input(path: str, requests: list[tuple[str, dict]]):
+    """(custom_id, リクエスト本体) のリストを Batch API の入力形式 (JSONL) で書き出す"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for custom_id, body in requests:
+            line = {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    logging.info(f"バッチ入力ファイルを {path} に書き出しました ({len(requests)} リクエスト)。")
+
+async def submit_batch(llm: OpenAIClientManager, input_path: str, metadata: dict | None = None) -> str | None:
+    """入力ファイルをアップロードしてバッチを作成し、バッチIDを返す。失敗した場合は None"""
+    async def upload():
+        with open(input_path, 'rb') as f:
+            return await llm.client.files.create(file=f, purpose="batch")
+    try:
+        input_file = await llm.retry_policy.call(upload, label="バッチ入力ファイルのアップロード")
+        batch = await llm.retry_policy.call(
+            llm.client.batches.create,
+            label="バッチの作成",
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+            metadata=metadata,
+        )
+        logging.info(f"バッチを作成しました: {batch.id} (入力ファイル: {input_file.id}, ステータス: {batch.status})")
+        return batch.id
+    except Exception as e:
+        logging.error(f"バッチの作成に失敗しました: {e}")
+        return None
+
+async def wait_for_batch(llm: OpenAIClientManager, batch_id: str, poll_interval: float = DEFAULT_POLL_INTERVAL_SEC):
+    """バッチが終了状態になるまで poll_interval 秒ごとに確認し、最後に取得したバッチを返す"""
+    last_status = None
+    while True:
+        batch = await llm.retry_policy.call(llm.client.batches.retrieve, batch_id, label="バッチの状態確認")
+        counts = batch.request_counts
+        progress = f"{counts.completed + counts.failed}/{counts.total}" if counts else "-"
+        if batch.status != last_status:
+            logging.info(f"バッチ {batch_id} のステータス: {batch.status} (処理済み {progress})")
+            last_status = batch.status
+        else:
+            logging.debug(f"バッチ {batch_id} のステータス: {batch.status} (処理済み {progress})")
+        if batch.status in BATCH_TERMINAL_STATUSES:
+            return batch
+        await asyncio.sleep(poll_interval)
+
+def parse_batch_output(text: str) -> dict:
+    """Batch API の出力 (またはエラー) ファイルを custom_id -> (応答テキスト, トークン使用量) または エラーメッセージ(str) にする"""
+    results = {}
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            logging.warning(f"バッチ出力の {line_number} 行目を読み込めないためスキップします: {e}")
+            continue
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or body.get("error") or {}
+            message = error.get("message") if isinstance(error, dict) else str(error)
+            results[custom_id] = f"HTTP {response.get('status_code')}: {message or '不明なエラー'}"
+            continue
+        try:
+            content = body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            results[custom_id] = "応答にメッセージが含まれていません"
+            continue
+        results[custom_id] = (content, usage_to_dict(body.get("usage") or {}))
+    return results
+
+async def download_batch_results(llm: OpenAIClientManager, batch) -> dict:
+    """終了したバッチの出力ファイルとエラーファイルを取得し、custom_id ごとの結果にまとめる"""
+    results = {}
+    for file_id in (batch.error_file_id, batch.output_file_id):
+        if not file_id:
+            continue
+        try:
+            content = await llm.retry_policy.call(llm.client.files.content, file_id, label="バッチ結果の取得")
+            results.update(parse_batch_output(content.text))
+        except Exception as e:
+            logging.error(f"バッチ結果ファイル {file_id} の取得に失敗しました: {e}")
+    return results
@@ -1,52 +1,472 @@
 import os
 import json
+import time
+import zlib
+import sqlite3
 import logging # loggingを使うように修正
 
 CACHE_DIR = ".cache" # キャッシュディレクトリ名
-CACHE_FILE_NAME = "analyzed_findy_jobs.json"
+# 解析結果は1行1件の JSON Lines 形式で追記していく (同じURLは後の行が優先)
+CACHE_FILE_NAME = "analyzed_findy_jobs.jsonl"
 CACHE_FILE = os.path.join(CACHE_DIR, CACHE_FILE_NAME)
+# 旧形式 (JSON配列を一括で書き出していた頃) のキャッシュファイル。読み込み時に新形式へ移行する
+LEGACY_CACHE_FILE_NAME = "analyzed_findy_jobs.json"
+LEGACY_CACHE_FILE = os.path.join(CACHE_DIR, LEGACY_CACHE_FILE_NAME)
+# 省容量の保存形式: 選定に使う項目を列に、解析結果全体を zlib で圧縮して持つ SQLite データベース
+SQLITE_CACHE_FILE_NAME = "analyzed_findy_jobs.sqlite3"
+SQLITE_CACHE_FILE = os.path.join(CACHE_DIR, SQLITE_CACHE_FILE_NAME)
+SQLITE_COMPRESS_LEVEL = 6
 
-# キャッシュをロードする関数
+# キャッシュの保存形式は環境変数 FINDY_CACHE_FORMAT で選ぶ (未設定なら JSON Lines)
+CACHE_FORMAT_ENV = "FINDY_CACHE_FORMAT"
+CACHE_FORMAT_JSONL = "jsonl"
+CACHE_FORMAT_SQLITE = "sqlite"
+CACHE_FORMATS = (CACHE_FORMAT_JSONL, CACHE_FORMAT_SQLITE)
+
+# 解析結果に記録する、解析の入力 (ページ本文・モデル・抽出項目) のハッシュ値のキー
+CONTENT_HASH_KEY = "コンテンツハッシュ"
+# load_cache がURLごとに保持する項目 (解析対象の選定・前回結果の判定に使う)
+CACHE_INDEX_FIELDS = ("元タイトル", "元リンク", "URL", "エラー", CONTENT_HASH_KEY)
+# SQLite の列名 -> CACHE_INDEX_FIELDS の項目 (load_cache は本文の列を読まずにこれらの列だけを読む)
+_SQLITE_INDEX_COLUMNS = {
+    "title": "元タイトル",
+    "link": "元リンク",
+    "url": "URL",
+    "error": "エラー",
+    "content_hash": CONTENT_HASH_KEY,
+}
+_SQLITE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS analyzed_jobs (
+    cache_key TEXT PRIMARY KEY,
+    {", ".join(f"{column} TEXT" for column in _SQLITE_INDEX_COLUMNS)},
+    data BLOB NOT NULL
+)
+"""
+_SQLITE_UPSERT = (
+    f"INSERT OR REPLACE INTO analyzed_jobs (cache_key, {', '.join(_SQLITE_INDEX_COLUMNS)}, data) "
+    f"VALUES ({', '.join('?' * (len(_SQLITE_INDEX_COLUMNS) + 2))})"
+)
+
+def cache_format() -> str:
+    """環境変数 FINDY_CACHE_FORMAT で選ばれたキャッシュの保存形式 (jsonl / sqlite)"""
+    value = (os.getenv(CACHE_FORMAT_ENV) or CACHE_FORMAT_JSONL).strip().lower()
+    if value not in CACHE_FORMATS:
+        logging.warning(f"{CACHE_FORMAT_ENV}={value} は不明な形式のため、{CACHE_FORMAT_JSONL} を使用します ({'/'.join(CACHE_FORMATS)} のいずれかを指定してください)。")
+        return CACHE_FORMAT_JSONL
+    return value
+
+def cache_file_path(fmt: str | None = None) -> str:
+    """指定した形式 (省略時は現在の形式) のキャッシュファイルのパス"""
+    return SQLITE_CACHE_FILE if (fmt or cache_format()) == CACHE_FORMAT_SQLITE else CACHE_FILE
+
+# キャッシュエントリのキー (URL、なければ元リンク) を返す
+def _entry_key(item: dict) -> str | None:
+    return item.get("URL") or item.get("元リンク")
+
+def _ensure_cache_dir() -> bool:
+    if not os.path.exists(CACHE_DIR):
+        logging.info(f"キャッシュディレクトリ {CACHE_DIR} が存在しないため作成します。")
+        os.makedirs(CACHE_DIR, exist_ok=True)
+    elif not os.path.isdir(CACHE_DIR):
+        logging.error(f"キャッシュパス {CACHE_DIR} はディレクトリではありません。保存できません。")
+        return False
+    return True
+
+# JSON Lines ファイルを走査し、URLごとに最後の行の位置 (バイトオフセット) と、圧縮が必要かどうかを返す
+# 1行ずつ読み込んで捨てるため、レコード全体をメモリに保持しない
+def _scan_jsonl(path: str) -> tuple[dict[str, int], bool]:
+    last_offsets = {}
+    line_count = 0
+    broken_lines = 0
+    with open(path, 'rb') as f:
+        offset = 0
+        for line_no, line in enumerate(f, start=1):
+            line_offset, offset = offset, offset + len(line)
+            if not line.strip():
+                continue
+            line_count += 1
+            try:
+                item = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # 書き込み途中で強制終了した場合などは最終行が壊れている可能性がある
+                logging.warning(f"キャッシュファイル {path} の {line_no} 行目が壊れているためスキップします。")
+                broken_lines += 1
+                continue
+            link = _entry_key(item) if isinstance(item, dict) else None
+            if link:
+                last_offsets[link] = line_offset
+    needs_compaction = broken_lines > 0 or line_count != len(last_offsets)
+    return last_offsets, needs_compaction
+
+# 各URLの最後の行だけを残して書き直す (行はパースせずにそのままコピーする)
+def _compact_jsonl(path: str, last_offsets: dict[str, int]) -> None:
+    keep_offsets = set(last_offsets.values())
+    tmp_path = f"{path}.tmp"
+    with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        offset = 0
+        for line in src:
+            if offset in keep_offsets:
+                dst.write(line if line.endswith(b"\n") else line + b"\n")
+            offset += len(line)
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(tmp_path, path)
+
+# 重複・破損行の無い JSON Lines ファイルを1件ずつ読み込む
+def _iter_jsonl(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(item, dict) and _entry_key(item):
+                yield item
+
+# URLごとに最後の行だけを、壊れた行を飛ばして1件ずつ読み込む (ファイルは書き換えない)
+# 走査後に追記された行は読まないため、書き込み中のキャッシュも走査した時点の内容として読める
+def _iter_latest_jsonl(path: str):
+    last_offsets, _ = _scan_jsonl(path)
+    keep_offsets = set(last_offsets.values())
+    with open(path, 'rb') as f:
+        offset = 0
+        for line in f:
+            line_offset, offset = offset, offset + len(line)
+            if line_offset in keep_offsets:
+                yield json.loads(line)
+
+def _read_legacy_json(path: str) -> dict:
+    entries = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        cached_data_list = json.load(f)
+    # URL(元リンク)をキーにした辞書を作成
+    for item in cached_data_list:
+        link = _entry_key(item)
+        if link:
+            entries[link] = item
+    return entries
+
+# 一時ファイルに書いてから置き換えることで、途中で落ちても既存ファイルを壊さない
+def _write_jsonl_atomic(path: str, items) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False))
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _sqlite_connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path)
+    connection.execute(_SQLITE_SCHEMA)
+    return connection
+
+# SQLite の1行分の値 (キー、選定に使う列、圧縮した解析結果全体)
+def _sqlite_row(item: dict) -> tuple:
+    def column_value(value):
+        # 通常は文字列。LLMが想定外の型を返した場合も保存できるようJSON文字列にする
+        return value if value is None or isinstance(value, (str, int, float)) else json.dumps(value, ensure_ascii=False)
+    data = zlib.compress(json.dumps(item, ensure_ascii=False).encode('utf-8'), SQLITE_COMPRESS_LEVEL)
+    return (_entry_key(item), *(column_value(item.get(field)) for field in _SQLITE_INDEX_COLUMNS.values()), data)
+
+# 解析結果を1件ずつ返す (追記・更新された順)
+def _iter_sqlite(path: str):
+    connection = sqlite3.connect(path)
+    try:
+        for (data,) in connection.execute("SELECT data FROM analyzed_jobs ORDER BY rowid"):
+            yield json.loads(zlib.decompress(data))
+    finally:
+        connection.close()
+
+# 選定に使う列だけを読み、summarize_entry と同じ形の要約を1件ずつ返す (data 列は展開しない)
+def _iter_sqlite_summaries(path: str):
+    connection = sqlite3.connect(path)
+    try:
+        columns = ", ".join(_SQLITE_INDEX_COLUMNS)
+        for row in connection.execute(f"SELECT {columns} FROM analyzed_jobs ORDER BY rowid"):
+            yield {field: value for field, value in zip(_SQLITE_INDEX_COLUMNS.values(), row) if value is not None}
+    finally:
+        connection.close()
+
+def _write_sqlite_atomic(path: str, items) -> None:
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = _sqlite_connect(tmp_path)
+    try:
+        with connection:
+            connection.executemany(_SQLITE_UPSERT, (_sqlite_row(item) for item in items if _entry_key(item)))
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+
+def _prepare_jsonl_file():
+    """JSON Lines のキャッシュを1件ずつ読める状態にする (重複行・壊れた行の圧縮、旧形式からの移行)
+
+    どちらのファイルも無い場合は FileNotFoundError。
+    """
+    if os.path.isfile(CACHE_FILE):
+        last_offsets, needs_compaction = _scan_jsonl(CACHE_FILE)
+        if needs_compaction:
+            logging.info(f"キャッシュファイル {CACHE_FILE} を圧縮します ({len(last_offsets)} 件)。")
+            _compact_jsonl(CACHE_FILE, last_offsets)
+        return
+    if os.path.isfile(LEGACY_CACHE_FILE):
+        # 旧形式は1つのJSON配列のため、移行時の1回だけ全件を読み込む
+        entries = _read_legacy_json(LEGACY_CACHE_FILE)
+        logging.info(f"旧形式のキャッシュ {LEGACY_CACHE_FILE} を {CACHE_FILE} に移行します ({len(entries)} 件)。")
+        if _ensure_cache_dir():
+            _write_jsonl_atomic(CACHE_FILE, entries.values())
+            return
+    raise FileNotFoundError(CACHE_FILE)
+
+# source_format のキャッシュを target_format に書き換え、件数を返す (失敗時は例外)
+def _convert_cache_file(source_format: str, target_format: str, keep_source: bool = False) -> int:
+    if source_format == CACHE_FORMAT_SQLITE:
+        if not os.path.isfile(SQLITE_CACHE_FILE):
+            raise FileNotFoundError(SQLITE_CACHE_FILE)
+        entries = _iter_sqlite(SQLITE_CACHE_FILE)
+    else:
+        _prepare_jsonl_file()
+        entries = _iter_jsonl(CACHE_FILE)
+
+    count = 0
+    def counted(items):
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    source_path, target_path = cache_file_path(source_format), cache_file_path(target_format)
+    if not _ensure_cache_dir():
+        raise OSError(f"キャッシュディレクトリ {CACHE_DIR} を作成できません。")
+    if target_format == CACHE_FORMAT_SQLITE:
+        _write_sqlite_atomic(target_path, counted(entries))
+    else:
+        _write_jsonl_atomic(target_path, counted(entries))
+    logging.info(f"キャッシュ {source_path} を {target_path} に変換しました ({count} 件)。")
+    if not keep_source:
+        # 古い形式のファイルが残っていると、形式を戻したときに古い内容が読まれてしまう
+        os.remove(source_path)
+        logging.info(f"変換元のキャッシュ {source_path} を削除しました。")
+    return count
+
+def _migrate_from_other_format(fmt: str) -> None:
+    """現在の形式のファイルが無く、もう一方の形式のファイルがあれば現在の形式へ移行する"""
+    if os.path.isfile(cache_file_path(fmt)):
+        return
+    if fmt == CACHE_FORMAT_SQLITE and (os.path.isfile(CACHE_FILE) or os.path.isfile(LEGACY_CACHE_FILE)):
+        _convert_cache_file(CACHE_FORMAT_JSONL, CACHE_FORMAT_SQLITE)
+    elif fmt == CACHE_FORMAT_JSONL and os.path.isfile(SQLITE_CACHE_FILE):
+        _convert_cache_file(CACHE_FORMAT_SQLITE, CACHE_FORMAT_JSONL)
+
+def _prepare_cache_file() -> str:
+    """現在の形式 (cache_format) のキャッシュを1件ずつ読める状態にし、その形式を返す
+
+    もう一方の形式のファイルしか無い場合は移行する。どのファイルも無い場合は FileNotFoundError。
+    """
+    fmt = cache_format()
+    _migrate_from_other_format(fmt)
+    if fmt == CACHE_FORMAT_SQLITE:
+        if not os.path.isfile(SQLITE_CACHE_FILE):
+            raise FileNotFoundError(SQLITE_CACHE_FILE)
+    else:
+        _prepare_jsonl_file()
+    return fmt
+
+def _readable_cache_file() -> tuple[str | None, str]:
+    """書き換えずに読めるキャッシュファイルの (形式, パス) を返す (旧形式の場合の形式は None)
+
+    現在の形式 → もう一方の形式 → 旧形式 の順に探す。どのファイルも無い場合は FileNotFoundError。
+    """
+    fmt = cache_format()
+    other_format = CACHE_FORMAT_JSONL if fmt == CACHE_FORMAT_SQLITE else CACHE_FORMAT_SQLITE
+    for candidate in (fmt, other_format):
+        if os.path.isfile(cache_file_path(candidate)):
+            return candidate, cache_file_path(candidate)
+    if os.path.isfile(LEGACY_CACHE_FILE):
+        return None, LEGACY_CACHE_FILE
+    raise FileNotFoundError(cache_file_path(fmt))
+
+def iter_cache_summaries():
+    """URLごとに最新の1件の要約 (summarize_entry) を1件ずつ返すイテレータ。キャッシュファイルは書き換えない
+
+    解析の実行中に status などから読んでも、実行中の追記を失わせない。どのファイルも無い場合は呼び出し時に FileNotFoundError。
+    """
+    fmt, path = _readable_cache_file()
+    if fmt == CACHE_FORMAT_SQLITE:
+        return _iter_sqlite_summaries(path)
+    if fmt is None:
+        return (summarize_entry(item) for item in _read_legacy_json(path).values())
+    return (summarize_entry(item) for item in _iter_latest_jsonl(path))
+
+def iter_cache_entries():
+    """URLごとに最新の1件ずつを、1件ずつ返すイテレータ (全件をメモリに保持しない)
+
+    古い行・壊れた行は読み飛ばすだけで、キャッシュファイルは書き換えない (圧縮は書き込む側が compact_cache で行う)。
+    解析の実行中に Notion への反映などから読んでも、実行中の追記を失わせない。どのファイルも無い場合は呼び出し時に FileNotFoundError。
+    """
+    fmt, path = _readable_cache_file()
+    if fmt == CACHE_FORMAT_SQLITE:
+        return _iter_sqlite(path)
+    if fmt is None:
+        return iter(_read_legacy_json(path).values())
+    return _iter_latest_jsonl(path)
+
+def read_cache_entries() -> list[dict]:
+    """キャッシュを読み込み、URLごとに最新の1件ずつのリストを返す (どのファイルも無い場合は FileNotFoundError)"""
+    return list(iter_cache_entries())
+
+def summarize_entry(item: dict) -> dict:
+    """解析対象の選定に必要な項目 (CACHE_INDEX_FIELDS) だけを残した、キャッシュエントリの要約"""
+    return {key: item[key] for key in CACHE_INDEX_FIELDS if key in item}
+
+# キャッシュのインデックス (URL -> 要約) をロードする関数
 def load_cache(force_reload: bool) -> dict:
+    """キャッシュを1件ずつ読み、URLごとの要約 (summarize_entry) の辞書を返す
+
+    本文の長い項目や LLM応答 はメモリに残さない (SQLite 形式では選定に使う列だけを読み、解析結果全体は展開しない)。
+    解析結果はキャッシュファイルに追記済みのため、呼び出し側は最後に compact_cache でファイルを圧縮する。
+    キャッシュに書き込む側 (取得・解析) が追記を始める前に呼ぶため、形式の移行と重複行の圧縮もここで行う。
+    """
     cached_results = {}
-    if os.path.exists(CACHE_FILE) and not force_reload:
-        try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                cached_data_list = json.load(f)
-                # URL(元リンク)をキーにした辞書を作成
-                for item in cached_data_list:
-                    link = item.get("URL") or item.get("元リンク")
-                    if link:
-                        cached_results[link] = item
-            logging.info(f"キャッシュファイルを読み込みました: {CACHE_FILE} ({len(cached_results)} 件)")
-        except Exception as e:
-            logging.warning(f"キャッシュファイル ({CACHE_FILE}) の読み込みに失敗しました: {e}")
-            cached_results = {}
-    else:
-        if force_reload:
-            logging.info("--force-reload オプションによりキャッシュを無視します。")
-        elif not os.path.exists(CACHE_FILE):
-            logging.info(f"キャッシュファイル {CACHE_FILE} が見つかりません。")
-        # 他の理由でパスが存在しない場合も考慮 (ディレクトリでないなど)
-        elif not os.path.isfile(CACHE_FILE):
-             logging.warning(f"キャッシュパス {CACHE_FILE} はファイルではありません。")
+    if force_reload:
+        logging.info("--force-reload オプションによりキャッシュを無視します。")
+        return cached_results
+    cache_path = cache_file_path()
+    try:
+        if _prepare_cache_file() == CACHE_FORMAT_SQLITE:
+            summaries = _iter_sqlite_summaries(SQLITE_CACHE_FILE)
+        else:
+            summaries = (summarize_entry(item) for item in _iter_jsonl(CACHE_FILE))
+        for summary in summaries:
+            cached_results[_entry_key(summary)] = summary
+        logging.info(f"キャッシュファイルを読み込みました: {cache_path} ({len(cached_results)} 件)")
+    except FileNotFoundError:
+        logging.info(f"キャッシュファイル {cache_path} が見つかりません。")
+    except Exception as e:
+        logging.warning(f"キャッシュファイル ({cache_path}) の読み込みに失敗しました: {e}")
+        cached_results = {}
 
     return cached_results
 
-# 結果をキャッシュに保存する関数
-def save_cache(results_dict: dict):
+# 追記されたキャッシュを、URLごとに最新の1件ずつに圧縮する関数
+def compact_cache():
+    if cache_format() == CACHE_FORMAT_SQLITE:
+        # SQLite 形式はURLごとに上書きするため圧縮は不要
+        return
     try:
-        # キャッシュディレクトリが存在しない場合は作成
-        if not os.path.exists(CACHE_DIR):
-            logging.info(f"キャッシュディレクトリ {CACHE_DIR} が存在しないため作成します。")
-            os.makedirs(CACHE_DIR, exist_ok=True)
-        elif not os.path.isdir(CACHE_DIR):
-             logging.error(f"キャッシュパス {CACHE_DIR} はディレクトリではありません。保存できません。")
-             return
-
-        # 辞書の値をリストに変換して保存
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(list(results_dict.values()), f, ensure_ascii=False, indent=2)
-        logging.info(f"解析結果を {CACHE_FILE} に保存しました。")
+        if not os.path.isfile(CACHE_FILE):
+            return
+        last_offsets, needs_compaction = _scan_jsonl(CACHE_FILE)
+        if needs_compaction:
+            _compact_jsonl(CACHE_FILE, last_offsets)
+        logging.info(f"解析結果を {CACHE_FILE} に保存しました ({len(last_offsets)} 件)。")
     except Exception as e:
-        logging.error(f"キャッシュファイル ({CACHE_FILE}) の保存に失敗しました: {e}") 
\ No newline at end of file
+        logging.error(f"キャッシュファイル ({CACHE_FILE}) の圧縮に失敗しました: {e}")
+
+def convert_cache(target_format: str, keep_source: bool = False) -> int | None:
+    """キャッシュをもう一方の形式から target_format (jsonl / sqlite) に変換し、件数を返す。失敗した場合は None
+
+    変換後は FINDY_CACHE_FORMAT を target_format に合わせる (合わせない場合は次回の読み込み時に元の形式へ戻される)。
+    """
+    if target_format not in CACHE_FORMATS:
+        logging.error(f"不明なキャッシュ形式です: {target_format} ({'/'.join(CACHE_FORMATS)} のいずれかを指定してください)")
+        return None
+    source_format = CACHE_FORMAT_JSONL if target_format == CACHE_FORMAT_SQLITE else CACHE_FORMAT_SQLITE
+    try:
+        return _convert_cache_file(source_format, target_format, keep_source=keep_source)
+    except FileNotFoundError:
+        logging.error(f"変換元のキャッシュ {cache_file_path(source_format)} が見つかりません。")
+    except Exception as e:
+        logging.error(f"キャッシュの変換 ({source_format} -> {target_format}) に失敗しました: {e}")
+    return None
+
+# 解析結果を1件ずつキャッシュへ追記するクラス
+class CacheJournal:
+    """解析が終わるたびに結果を1行追記し、一定件数・一定時間ごとに fsync する
+
+    プロセスが途中で落ちても、それまでに追記した結果は次回の load_cache で読み込まれる。
+    SQLite 形式ではURLごとに上書きし、同じ間隔でコミットする。
+    """
+    def __init__(self, fsync_every: int = 10, fsync_interval_sec: float = 5.0):
+        self._fsync_every = max(1, fsync_every)
+        self._fsync_interval_sec = fsync_interval_sec
+        self._format = cache_format()
+        self._path = cache_file_path(self._format)
+        self._file = None
+        self._connection = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __enter__(self):
+        if not _ensure_cache_dir():
+            return self
+        try:
+            # --force-reload で load_cache が読み込みを省いた場合も、もう一方の形式の結果を引き継ぐ
+            _migrate_from_other_format(self._format)
+        except Exception as e:
+            logging.warning(f"キャッシュの形式の移行に失敗しました: {e}")
+        if self._format == CACHE_FORMAT_SQLITE:
+            try:
+                self._connection = _sqlite_connect(self._path)
+                # 追記のたびのコミットを軽くするため WAL を使う
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("PRAGMA synchronous=NORMAL")
+            except Exception as e:
+                logging.error(f"キャッシュファイル ({self._path}) を開けませんでした: {e}")
+                self._connection = None
+            return self
+        self._file = open(self._path, 'a', encoding='utf-8')
+        # 前回の書き込みが行の途中で途切れていた場合、新しい行がそれに連結されないよう改行を補う
+        if self._file.tell() > 0:
+            with open(self._path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+        return self
+
+    def append(self, entry: dict):
+        if self._file is None and self._connection is None:
+            return
+        try:
+            if self._connection is not None:
+                if not _entry_key(entry):
+                    return
+                self._connection.execute(_SQLITE_UPSERT, _sqlite_row(entry))
+            else:
+                self._file.write(json.dumps(entry, ensure_ascii=False))
+                self._file.write("\n")
+                self._file.flush()
+            self._unsynced += 1
+            if (self._unsynced >= self._fsync_every
+                    or time.monotonic() - self._last_sync >= self._fsync_interval_sec):
+                self._sync()
+        except Exception as e:
+            logging.error(f"キャッシュファイル ({self._path}) への追記に失敗しました: {e}")
+
+    def _sync(self):
+        if self._connection is not None:
+            self._connection.commit()
+        else:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._connection is not None:
+            try:
+                self._sync()
+            finally:
+                self._connection.close()
+                self._connection = None
+        if self._file is not None:
+            try:
+                self._sync()
+            finally:
+                self._file.close()
+                self._file = None
+        return False
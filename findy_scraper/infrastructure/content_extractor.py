@@ -0,0 +1,135 @@
+import re
+import json
+import html
+import logging
+
+# 抽出結果がこれより短い場合は情報不足とみなし、次の候補 (最終的には body 全体) を使う
+MIN_CONTENT_CHARS = 200
+
+# ブラウザ内で1回だけ実行し、抽出候補 (JSON-LD, __NEXT_DATA__, メインコンテンツ) をまとめて返すスクリプト
+COLLECT_CANDIDATES_JS = """() => {
+    const jsonLd = Array.from(document.querySelectorAll('script[type="application/ld+json"]')).map(s => s.textContent);
+    const nextData = document.getElementById('__NEXT_DATA__');
+    const main = document.querySelector('main, [role="main"], article');
+    return {
+        jsonLd: jsonLd,
+        nextData: nextData ? nextData.textContent : null,
+        mainText: main ? main.innerText : null,
+    };
+}"""
+
+# 求人本文を抽出できる状態になったかをブラウザ内で判定するスクリプト (COLLECT_CANDIDATES_JS と同じ候補を見る)
+# JSON-LD の JobPosting か __NEXT_DATA__ があるか、メインコンテンツ要素に minChars 文字以上のテキストが描画されていれば真
+CONTENT_READY_JS = """(minChars) => {
+    const hasJobPosting = Array.from(document.querySelectorAll('script[type="application/ld+json"]'))
+        .some(s => s.textContent.includes('JobPosting'));
+    if (hasJobPosting || document.getElementById('__NEXT_DATA__')) {
+        return true;
+    }
+    const main = document.querySelector('main, [role="main"], article');
+    return !!main && main.innerText.trim().length >= minChars;
+}"""
+
+# 本文の抽出に不要なキー (画像・ID・トラッキング用の値など)
+_IGNORED_KEYS = re.compile(r'(^@|^id$|Id$|_id$|__typename|(?i:image|logo|icon|avatar|thumbnail|url$|createdat|updatedat))')
+
+def _clean_text(value: str) -> str:
+    """HTMLタグと実体参照を取り除き、余分な空白をまとめる"""
+    text = re.sub(r'<br\s*/?>|</p>|</li>|</h\d>', '\n', value, flags=re.IGNORECASE)
+    text = html.unescape(re.sub(r'<[^>]+>', ' ', text))
+    text = re.sub(r'[ \t　]+', ' ', text)
+    return re.sub(r'\n\s*\n+', '\n', text).strip()
+
+def _label(path: str) -> str:
+    # 「hiringOrganization.name」のように末尾2階層をラベルにする
+    return ".".join(path.split('.')[-2:])
+
+def _flatten_to_lines(node, path: str = "", lines: list | None = None, seen: set | None = None) -> list[str]:
+    """JSONを「キー: 値」の行に平坦化する (同じ文字列は1度だけ出力する)"""
+    lines = [] if lines is None else lines
+    seen = set() if seen is None else seen
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if _IGNORED_KEYS.search(str(key)):
+                continue
+            _flatten_to_lines(value, f"{path}.{key}" if path else str(key), lines, seen)
+    elif isinstance(node, list):
+        for value in node:
+            _flatten_to_lines(value, path, lines, seen)
+    elif isinstance(node, str):
+        text = _clean_text(node)
+        if text and text not in seen and not text.startswith('http'):
+            seen.add(text)
+            lines.append(f"{_label(path)}: {text}" if path else text)
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        lines.append(f"{_label(path)}: {node}")
+    return lines
+
+def _find_job_postings(node) -> list[dict]:
+    """JSON-LD (単体・配列・@graph) から JobPosting を探す"""
+    if isinstance(node, list):
+        return [posting for item in node for posting in _find_job_postings(item)]
+    if not isinstance(node, dict):
+        return []
+    types = node.get('@type')
+    types = types if isinstance(types, list) else [types]
+    if 'JobPosting' in types:
+        return [node]
+    return _find_job_postings(node.get('@graph', []))
+
+def _text_from_json_ld(scripts: list[str]) -> str | None:
+    postings = []
+    for script in scripts or []:
+        try:
+            postings.extend(_find_job_postings(json.loads(script)))
+        except (json.JSONDecodeError, TypeError):
+            continue
+    if not postings:
+        return None
+    return "\n".join(line for posting in postings for line in _flatten_to_lines(posting))
+
+def _find_job_subtree(node, depth: int = 0):
+    """pageProps から求人らしきキー (job, jobPosting など) の値を探す。見つからなければ None"""
+    if depth > 4 or not isinstance(node, dict):
+        return None
+    for key, value in node.items():
+        if isinstance(value, dict) and re.search(r'job', str(key), re.IGNORECASE) and not re.search(r'(recommend|related|similar|other)', str(key), re.IGNORECASE):
+            return value
+    for value in node.values():
+        found = _find_job_subtree(value, depth + 1)
+        if found is not None:
+            return found
+    return None
+
+def _text_from_next_data(raw: str | None) -> str | None:
+    if not raw:
+        return None
+    try:
+        page_props = json.loads(raw).get('props', {}).get('pageProps', {})
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    job = _find_job_subtree(page_props)
+    if job is None:
+        return None
+    return "\n".join(_flatten_to_lines(job))
+
+def extract_job_text(candidates: dict) -> tuple[str | None, str]:
+    """抽出候補から求人本文を選び、(本文, 抽出元) を返す
+
+    JSON-LD の JobPosting → Next.js の __NEXT_DATA__ → メインコンテンツ要素 の順に試し、
+    MIN_CONTENT_CHARS 以上の本文が得られたものを採用する。どれも不十分なら (None, "body")。
+    """
+    extractors = (
+        ("json-ld", lambda: _text_from_json_ld(candidates.get('jsonLd'))),
+        ("next-data", lambda: _text_from_next_data(candidates.get('nextData'))),
+        ("main", lambda: candidates.get('mainText')),
+    )
+    for source, extractor in extractors:
+        try:
+            text = extractor()
+        except Exception as e:
+            logging.debug(f"本文抽出 ({source}) に失敗しました: {e}")
+            continue
+        if text and len(text.strip()) >= MIN_CONTENT_CHARS:
+            return text.strip(), source
+    return None, "body"
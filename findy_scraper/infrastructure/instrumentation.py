@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+# 計測中の RunRecorder (計測していない場合は None で、span は何も記録しない)
+_active_recorder: "RunRecorder | None" = None
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    """線形補間でパーセンタイル値を求める (sorted_values は昇順)"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def _current_task_name() -> str:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task.get_name() if task else "main"
+
+@contextmanager
+def span(stage: str, name: str = "", **attrs):
+    """ブロックの所要時間を stage の計測区間として記録する
+
+    yield される辞書に bytes やトークン数などの数値を入れると、区間の属性として記録され、レポートでステージごとに合計される。
+    例外で抜けた場合は error として記録する。
+    """
+    recorder = _active_recorder
+    if recorder is None:
+        yield attrs
+        return
+    started = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException:
+        attrs["error"] = True
+        raise
+    finally:
+        recorder.record(stage, name, started, time.perf_counter(), attrs)
+
+# 1回の実行の計測区間を集め、レポートとトレースを出力する
+class RunRecorder:
+    """with ブロックの間、span で記録された区間を集める (同時に有効にできるのは1つだけ)"""
+    def __init__(self):
+        self._spans: list[dict] = []
+        self._started = time.perf_counter()
+        self._started_at = datetime.now().isoformat()
+        self._task_ids: dict[str, int] = {}
+
+    def __enter__(self):
+        global _active_recorder
+        self._started = time.perf_counter()
+        self._started_at = datetime.now().isoformat()
+        _active_recorder = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _active_recorder
+        if _active_recorder is self:
+            _active_recorder = None
+        return False
+
+    def record(self, stage: str, name: str, started: float, finished: float, attrs: dict | None = None):
+        task_name = _current_task_name()
+        self._spans.append({
+            "stage": stage,
+            "name": name,
+            "start": started - self._started,
+            "duration": finished - started,
+            "task": self._task_ids.setdefault(task_name, len(self._task_ids) + 1),
+            "task_name": task_name,
+            "attrs": dict(attrs or {}),
+        })
+
+    def build_report(self, jobs: dict | None = None) -> dict:
+        """ステージごとの件数・所要時間の p50/p95/最大・数値属性の合計と、全体のスループットをまとめる"""
+        elapsed = time.perf_counter() - self._started
+        stages = {}
+        for stage in dict.fromkeys(s["stage"] for s in self._spans):
+            spans = [s for s in self._spans if s["stage"] == stage]
+            durations = sorted(s["duration"] for s in spans)
+            totals = {}
+            for s in spans:
+                for key, value in s["attrs"].items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        totals[key] = totals.get(key, 0) + value
+            stages[stage] = {
+                "count": len(spans),
+                "errors": sum(1 for s in spans if s["attrs"].get("error")),
+                "total_sec": round(sum(durations), 3),
+                "p50_sec": round(_percentile(durations, 50), 3),
+                "p95_sec": round(_percentile(durations, 95), 3),
+                "max_sec": round(durations[-1], 3),
+                "totals": totals,
+            }
+        jobs = jobs or {}
+        completed = jobs.get("analyzed", 0)
+        return {
+            "started_at": self._started_at,
+            "elapsed_sec": round(elapsed, 3),
+            "jobs": jobs,
+            "jobs_per_minute": round(completed / (elapsed / 60), 2) if elapsed > 0 else 0.0,
+            "stages": stages,
+        }
+
+    def write_report(self, path: str, jobs: dict | None = None) -> dict:
+        """実行レポートを JSON で保存し、主要な値をログに出力する"""
+        report = self.build_report(jobs)
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            logging.info(f"実行レポートを {path} に保存しました。")
+        except Exception as e:
+            logging.error(f"実行レポート ({path}) の保存に失敗しました: {e}")
+        logging.info(f"--- 実行レポート: {report['elapsed_sec']:.1f}秒, {report['jobs_per_minute']} 件/分 ---")
+        for stage, stats in report["stages"].items():
+            logging.info(f"  {stage}: {stats['count']} 回 (エラー {stats['errors']}), p50 {stats['p50_sec']:.2f}秒, p95 {stats['p95_sec']:.2f}秒, 最大 {stats['max_sec']:.2f}秒")
+        return report
+
+    def write_chrome_trace(self, path: str):
+        """chrome://tracing や Perfetto で開ける形式で区間を保存する (タスクごとに1行で表示される)"""
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": task_id, "args": {"name": task_name}}
+            for task_name, task_id in self._task_ids.items()
+        ]
+        events.extend({
+            "name": f"{s['stage']}: {s['name']}" if s["name"] else s["stage"],
+            "cat": s["stage"],
+            "ph": "X",
+            "ts": round(s["start"] * 1_000_000),
+            "dur": round(s["duration"] * 1_000_000),
+            "pid": 1,
+            "tid": s["task"],
+            "args": s["attrs"],
+        } for s in self._spans)
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+            logging.info(f"トレースを {path} に保存しました ({len(self._spans)} 区間)。")
+        except Exception as e:
+            logging.error(f"トレース ({path}) の保存に失敗しました: {e}")
@@ -1,13 +1,28 @@
 import os
+import re
 import json
+import asyncio
+import hashlib
 import logging # logging を使うように修正
+from contextlib import asynccontextmanager
 from typing import Optional # Optional をインポート
-from openai import AsyncOpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, APIStatusError, APIConnectionError
 
-# 環境変数からAPIキー、対象フィールド、モデル名を取得
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-OPENAI_MODEL_NAME = os.getenv('OPENAI_MODEL_NAME', 'gpt-4o-mini') # デフォルトを設定
-OPENAI_TARGET_FIELDS_STR = os.getenv('OPENAI_TARGET_FIELDS')
+from findy_scraper.infrastructure.retry import RetryPolicy, default_classifier
+# 解析結果に記録するハッシュ値のキーはキャッシュのインデックスと共通
+from findy_scraper.infrastructure.cache_manager import CONTENT_HASH_KEY
+from findy_scraper.infrastructure.instrumentation import span
+from findy_scraper.core.settings import DEFAULT_MAX_IN_FLIGHT
+
+# トークン数の計算には tiktoken を使う (未インストールの場合は文字種から概算する)
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# デフォルトのモデル名
+DEFAULT_OPENAI_MODEL_NAME = 'gpt-4o-mini'
 
 # デフォルトのターゲットフィールドリスト
 DEFAULT_TARGET_FIELDS = [
@@ -19,29 +34,193 @@ DEFAULT_TARGET_FIELDS = [
     "求める人物像 (要約)", "特記事項"
 ]
 
-# 環境変数からフィールドリストを生成、なければデフォルトを使用
-if OPENAI_TARGET_FIELDS_STR:
+# 環境変数 (APIキー、モデル名、対象フィールド等) は、CLIが .env を読み込んだ後の初回利用時に読む
+def get_openai_api_key() -> str | None:
+    return os.getenv('OPENAI_API_KEY')
+
+def get_openai_model_name() -> str:
+    return os.getenv('OPENAI_MODEL_NAME', DEFAULT_OPENAI_MODEL_NAME)
+
+_target_fields = None
+
+def get_target_fields() -> list[str]:
+    """環境変数 OPENAI_TARGET_FIELDS (カンマ区切り) から生成したフィールドリスト。なければデフォルトを使用"""
+    global _target_fields
+    if _target_fields is None:
+        target_fields_str = os.getenv('OPENAI_TARGET_FIELDS')
+        if target_fields_str:
+            try:
+                _target_fields = [field.strip() for field in target_fields_str.split(',') if field.strip()]
+                logging.info(f"環境変数からターゲットフィールドを読み込みました: {len(_target_fields)} 件")
+            except Exception as e:
+                logging.warning(f"環境変数 OPENAI_TARGET_FIELDS のパースに失敗しました。デフォルト値を使用します。エラー: {e}")
+                _target_fields = DEFAULT_TARGET_FIELDS
+        else:
+            logging.info("環境変数 OPENAI_TARGET_FIELDS が未設定のため、デフォルト値を使用します。")
+            _target_fields = DEFAULT_TARGET_FIELDS
+    return _target_fields
+
+def get_text_token_budget() -> int:
+    """解析対象テキストに割り当てるトークン数 (これを超える求人は分割して解析する)"""
+    return int(os.getenv('OPENAI_TEXT_TOKEN_BUDGET', '12000'))
+
+def get_max_chunks() -> int:
+    """1件の求人を分割する上限数 (超えた部分は解析しない)"""
+    return int(os.getenv('OPENAI_MAX_CHUNKS', '4'))
+
+# 解析結果に記録する、トークン使用量のキー
+TOKEN_USAGE_KEY = "トークン使用量"
+
+_encoding = None
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.encoding_for_model(get_openai_model_name())
+        except KeyError:
+            _encoding = tiktoken.get_encoding("o200k_base")
+    return _encoding
+
+def count_tokens(text: str) -> int:
+    """テキストのトークン数を返す (tiktoken が無い場合は 日本語等1文字=1トークン、ASCII 4文字=1トークン で概算)"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (len(text) - ascii_chars) + (ascii_chars + 3) // 4
+
+def _split_long_line(line: str, token_budget: int) -> list[str]:
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(line, disallowed_special=())
+        return [encoding.decode(tokens[i:i + token_budget]) for i in range(0, len(tokens), token_budget)]
+    # 概算の場合は1文字=1トークンとみなして安全側に切る
+    return [line[i:i + token_budget] for i in range(0, len(line), token_budget)]
+
+def split_text_by_tokens(text: str, token_budget: int) -> list[str]:
+    """テキストを行単位でまとめ、各チャンクが token_budget トークン以下になるよう分割する"""
+    if count_tokens(text) <= token_budget:
+        return [text]
+    chunks = []
+    current_lines: list[str] = []
+    current_tokens = 0
+    for line in text.splitlines():
+        line_tokens = count_tokens(line) + 1 # 改行分
+        if line_tokens > token_budget:
+            pieces = _split_long_line(line, token_budget)
+        else:
+            pieces = [line]
+        for piece in pieces:
+            piece_tokens = count_tokens(piece) + 1 if len(pieces) > 1 else line_tokens
+            if current_lines and current_tokens + piece_tokens > token_budget:
+                chunks.append("\n".join(current_lines))
+                current_lines, current_tokens = [], 0
+            current_lines.append(piece)
+            current_tokens += piece_tokens
+    if current_lines:
+        chunks.append("\n".join(current_lines))
+    return chunks
+
+
+def normalize_page_text(page_text_content: str) -> str:
+    """空白・改行の揺れでハッシュが変わらないよう、連続する空白を1つにまとめる"""
+    return re.sub(r'\s+', ' ', page_text_content).strip()
+
+def compute_content_hash(page_text_content: str) -> str:
+    """ページ本文・モデル名・抽出項目から解析結果のキャッシュキーとなるハッシュ値を計算する
+
+    いずれかが変わればハッシュも変わるため、一致すれば前回の解析結果をそのまま使える。
+    """
+    payload = json.dumps({
+        "text": normalize_page_text(page_text_content),
+        "model": get_openai_model_name(),
+        "fields": get_target_fields(),
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+# 使われていない接続を保持しておく秒数
+KEEPALIVE_EXPIRY_SEC = 60.0
+
+# 再試行の対象とするHTTPステータス (429 はクォータ超過以外)
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+def _retry_after_seconds(error: APIStatusError) -> float | None:
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
     try:
-        TARGET_FIELDS = [field.strip() for field in OPENAI_TARGET_FIELDS_STR.split(',') if field.strip()]
-        logging.info(f"環境変数からターゲットフィールドを読み込みました: {len(TARGET_FIELDS)} 件")
-    except Exception as e:
-        logging.warning(f"環境変数 OPENAI_TARGET_FIELDS のパースに失敗しました。デフォルト値を使用します。エラー: {e}")
-        TARGET_FIELDS = DEFAULT_TARGET_FIELDS
-else:
-    logging.info("環境変数 OPENAI_TARGET_FIELDS が未設定のため、デフォルト値を使用します。")
-    TARGET_FIELDS = DEFAULT_TARGET_FIELDS
-
-async def analyze_job_page_with_gpt(page_text_content: str, job_title: str, job_link: str) -> Optional[dict]:
-    if not OPENAI_API_KEY:
-        logging.error("エラー: OPENAI_API_KEYが設定されていません。LLM分析をスキップします。")
-        return {"元タイトル": job_title, "元リンク": job_link, "エラー": "APIキー未設定"}
+        if headers.get('retry-after-ms') is not None:
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after') is not None:
+            return float(headers['retry-after'])
+    except ValueError:
+        pass
+    return None
+
+def classify_openai_error(error: Exception) -> tuple[bool, float | None]:
+    """OpenAI APIの例外を (一時的なエラーか, 待つべき秒数) に分類する"""
+    if isinstance(error, APIStatusError):
+        if error.status_code == 429 and getattr(error, 'code', None) == 'insufficient_quota':
+            # クォータ切れは待っても回復しない
+            return False, None
+        return error.status_code in RETRYABLE_STATUSES or error.status_code >= 500, _retry_after_seconds(error)
+    if isinstance(error, APIConnectionError): # タイムアウトを含む
+        return True, None
+    return default_classifier(error)
+
+# OpenAIクライアントを1回の実行で使い回すためのコンテキストマネージャ
+class OpenAIClientManager:
+    """接続プールを持つ AsyncOpenAI クライアントを1つだけ作り、終了時に閉じる
+
+    max_in_flight は同時に送信中にできるリクエスト数の上限で、接続プールの大きさもこれに合わせる。
+    """
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT):
+        self._max_in_flight = max(1, max_in_flight)
+        self._client: AsyncOpenAI | None = None
+        self._in_flight: asyncio.Semaphore | None = None
+        # 429・5xx・タイムアウトの再試行とサーキットブレーカー (実行全体で共有する)
+        self.retry_policy = RetryPolicy("LLM", classify_openai_error)
+
+    async def __aenter__(self):
+        self._in_flight = asyncio.Semaphore(self._max_in_flight)
+        api_key = get_openai_api_key()
+        if api_key:
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=self._max_in_flight,
+                    max_keepalive_connections=self._max_in_flight,
+                    keepalive_expiry=KEEPALIVE_EXPIRY_SEC,
+                )
+            )
+            # 再試行は retry_policy で行うため、SDK自体の再試行は無効にする
+            self._client = AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+            logging.info(f"OpenAIクライアントを作成しました (同時リクエスト上限: {self._max_in_flight})")
+        return self
 
-    logging.info(f"  [{job_title}] LLM ({OPENAI_MODEL_NAME}) によるページテキスト解析を開始...")
+    @property
+    def client(self) -> AsyncOpenAI | None:
+        return self._client
 
-    # OpenAIクライアントの初期化
-    client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    @asynccontextmanager
+    async def in_flight_slot(self):
+        """同時リクエスト数の上限内でリクエストを送るための枠を確保する"""
+        async with self._in_flight:
+            yield
 
-    user_prompt = f"""
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._client:
+            await self._client.close()
+            self._client = None
+            logging.info("OpenAIクライアントを閉じました。")
+        return False
+
+def build_analysis_prompt(page_text_content: str, job_title: str, job_link: str,
+                          chunk_index: int = 0, chunk_count: int = 1) -> str:
+    """求人1件 (または分割したうちの1チャンク) を解析するプロンプトを組み立てる"""
+    chunk_note = ""
+    if chunk_count > 1:
+        chunk_note = f"\n(このテキストは長い求人ページを {chunk_count} 分割したうちの {chunk_index + 1} 番目です。このテキストに含まれない項目は null としてください)\n"
+
+    return f"""
 以下の求人ページのテキストコンテンツから、指定された項目を抽出し、JSON形式で回答してください。
 項目が存在しない場合は、null または "該当なし" としてください。
 URLは必ず抽出してください。存在しない場合は元のURL `{job_link}` を使用してください。
@@ -52,54 +231,286 @@ URLは必ず抽出してください。存在しない場合は元のURL `{job_l
 求人URL: 「{job_link}」
 
 抽出項目:
-{json.dumps(TARGET_FIELDS, ensure_ascii=False, indent=2)}
+{json.dumps(get_target_fields(), ensure_ascii=False, indent=2)}
 
 解析対象テキスト:
 ---
-{page_text_content[:20000]} 
+{page_text_content}
 ---
-(テキストは情報量を増やすため先頭20000文字を使用)
-
+{chunk_note}
 JSON出力:
 """
 
+def usage_to_dict(usage) -> dict:
+    """SDKの usage オブジェクト (またはBatch API結果の usage 辞書) をキャッシュ保存用の辞書にする"""
+    def get(key):
+        value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, 0)
+        return value or 0
+    return {
+        "prompt_tokens": get('prompt_tokens'),
+        "completion_tokens": get('completion_tokens'),
+        "total_tokens": get('total_tokens'),
+    }
+
+def _sum_usage(usages: list[dict]) -> dict:
+    total = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    for usage in usages:
+        for key in total:
+            total[key] += usage.get(key, 0)
+    total["requests"] = len(usages)
+    return total
+
+def _is_empty_value(value) -> bool:
+    return value is None or value == "" or value == "該当なし" or value == []
+
+def merge_chunk_results(chunk_results: list[dict]) -> dict:
+    """チャンクごとの解析結果を対象フィールド (get_target_fields) ごとにまとめる
+
+    リストの項目は重複を除いて結合し、それ以外は最初に見つかった空でない値を採用する。
+    """
+    merged = {}
+    for field in get_target_fields():
+        values = [result.get(field) for result in chunk_results if not _is_empty_value(result.get(field))]
+        if not values:
+            merged[field] = next((result[field] for result in chunk_results if field in result), None)
+        elif all(isinstance(value, list) for value in values):
+            merged[field] = list(dict.fromkeys(item for value in values for item in value if isinstance(item, (str, int, float))))
+        else:
+            merged[field] = values[0]
+    # 対象フィールド以外にLLMが返した項目は最初のチャンクのものを残す
+    for result in chunk_results:
+        for key, value in result.items():
+            merged.setdefault(key, value)
+    return merged
+
+def build_chat_completion_body(user_prompt: str) -> dict:
+    """Chat Completions API に送るリクエスト本体 (通常の呼び出しとBatch APIで共通)"""
+    return {
+        "model": get_openai_model_name(), # 環境変数から取得したモデル名を使用
+        "messages": [
+            {"role": "user", "content": user_prompt}
+        ],
+        "response_format": {"type": "json_object"},
+        "temperature": 0.2,
+    }
+
+def build_analysis_prompts(page_text_content: str, job_title: str, job_link: str) -> list[str]:
+    """トークン数の上限に収まるよう本文を分割し、チャンクごとのプロンプトを返す (長い求人の末尾が切り捨てられないように)"""
+    chunks = split_text_by_tokens(page_text_content, get_text_token_budget())
+    max_chunks = get_max_chunks()
+    if len(chunks) > max_chunks:
+        logging.warning(f"  [{job_title}] テキストが長いため、先頭 {max_chunks}/{len(chunks)} チャンクのみ解析します。")
+        chunks = chunks[:max_chunks]
+    return [build_analysis_prompt(chunk, job_title, job_link, i, len(chunks)) for i, chunk in enumerate(chunks)]
+
+async def _request_analysis(llm: OpenAIClientManager, user_prompt: str, label: str = ""):
+    """プロンプトを送信し、(応答テキスト, トークン使用量) を返す (一時的なエラーは再試行する)"""
+    async def send():
+        async with llm.in_flight_slot():
+            with span("llm", label) as metrics:
+                response = await llm.client.chat.completions.create(
+                    **build_chat_completion_body(user_prompt),
+                    timeout=180
+                )
+                metrics.update(usage_to_dict(response.usage))
+                return response
+    response = await llm.retry_policy.call(send, label=label)
+    return response.choices[0].message.content, usage_to_dict(response.usage)
+
+def _finalize_analysis_result(analysis_result: dict, job_title: str, job_link: str, content_hash: str, token_usage: dict) -> dict:
+    """LLMの解析結果に元の求人情報・ハッシュ値・トークン使用量を付け、必須項目を補う"""
+    analysis_result["元タイトル"] = job_title
+    analysis_result["元リンク"] = job_link
+    # 次回以降、同じ入力なら再解析しないためのハッシュ値 (成功時のみ記録する)
+    analysis_result[CONTENT_HASH_KEY] = content_hash
+    analysis_result[TOKEN_USAGE_KEY] = token_usage
+
+    if "URL" not in analysis_result or not analysis_result["URL"]:
+        analysis_result["URL"] = job_link
+        logging.warning(f"  [{job_title}] 警告: LLMがURLを抽出できなかったため、元のリンクを使用します。")
+    if "会社名" not in analysis_result or not analysis_result["会社名"]:
+         analysis_result["会社名"] = job_title
+         logging.warning(f"  [{job_title}] 警告: LLMが会社名を抽出できなかったため、元のタイトルを使用します。")
+    return analysis_result
+
+def assemble_analysis_result(responses: list[tuple[str, dict]], job_title: str, job_link: str, content_hash: str) -> dict:
+    """チャンクごとの (応答テキスト, トークン使用量) から、キャッシュに保存する解析結果を組み立てる"""
+    token_usage = _sum_usage([usage for _, usage in responses])
+    result_json_str = responses[0][0]
     try:
-        response = await client.chat.completions.create(
-            model=OPENAI_MODEL_NAME, # 環境変数から取得したモデル名を使用
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.2,
-            timeout=180
-        )
-
-        result_json_str = response.choices[0].message.content
-        logging.info(f"  [{job_title}] LLM解析完了。")
+        chunk_results = []
+        for i, (result_json_str, _) in enumerate(responses):
+            try:
+                chunk_results.append(json.loads(result_json_str))
+            except json.JSONDecodeError as json_error:
+                # 分割解析では一部のチャンクが失敗しても残りで結果をまとめる
+                if len(responses) == 1:
+                    raise
+                logging.warning(f"  [{job_title}] チャンク {i + 1} のJSONパースに失敗したため除外します: {json_error}")
+        if not chunk_results:
+            raise json.JSONDecodeError("全チャンクのJSONパースに失敗しました", result_json_str or "", 0)
 
-        try:
-            analysis_result = json.loads(result_json_str)
-
-            analysis_result["元タイトル"] = job_title
-            analysis_result["元リンク"] = job_link
-
-            if "URL" not in analysis_result or not analysis_result["URL"]:
-                analysis_result["URL"] = job_link
-                logging.warning(f"  [{job_title}] 警告: LLMがURLを抽出できなかったため、元のリンクを使用します。")
-            if "会社名" not in analysis_result or not analysis_result["会社名"]:
-                 analysis_result["会社名"] = job_title
-                 logging.warning(f"  [{job_title}] 警告: LLMが会社名を抽出できなかったため、元のタイトルを使用します。")
-
-            return analysis_result
-        except json.JSONDecodeError as json_error:
-            logging.error(f"  [{job_title}] LLM応答のJSONパースに失敗: {json_error}")
-            logging.debug(f"  LLM応答内容(先頭500文字): {result_json_str[:500]}...")
-            return {"元タイトル": job_title, "元リンク": job_link, "エラー": f"LLM応答パース失敗: {json_error}", "LLM応答": result_json_str}
-        except Exception as parse_err:
-             logging.error(f"  [{job_title}] LLM応答の処理中にエラー: {parse_err}")
-             return {"元タイトル": job_title, "元リンク": job_link, "エラー": f"LLM応答処理エラー: {parse_err}", "LLM応答": result_json_str}
+        analysis_result = chunk_results[0] if len(chunk_results) == 1 else merge_chunk_results(chunk_results)
+        return _finalize_analysis_result(analysis_result, job_title, job_link, content_hash, token_usage)
+    except json.JSONDecodeError as json_error:
+        logging.error(f"  [{job_title}] LLM応答のJSONパースに失敗: {json_error}")
+        logging.debug(f"  LLM応答内容(先頭500文字): {(result_json_str or '')[:500]}...")
+        return {"元タイトル": job_title, "元リンク": job_link, "エラー": f"LLM応答パース失敗: {json_error}", "LLM応答": result_json_str, TOKEN_USAGE_KEY: token_usage}
+    except Exception as parse_err:
+         logging.error(f"  [{job_title}] LLM応答の処理中にエラー: {parse_err}")
+         return {"元タイトル": job_title, "元リンク": job_link, "エラー": f"LLM応答処理エラー: {parse_err}", "LLM応答": result_json_str, TOKEN_USAGE_KEY: token_usage}
+
+async def analyze_job_page_with_gpt(page_text_content: str, job_title: str, job_link: str,
+                                    llm: OpenAIClientManager | None = None,
+                                    content_hash: str | None = None) -> Optional[dict]:
+    if not get_openai_api_key():
+        logging.error("エラー: OPENAI_API_KEYが設定されていません。LLM分析をスキップします。")
+        return {"元タイトル": job_title, "元リンク": job_link, "エラー": "APIキー未設定"}
+
+    # 共有クライアントが渡されなかった場合は、この呼び出しの間だけクライアントを作る
+    if llm is None:
+        async with OpenAIClientManager(max_in_flight=1) as temporary_llm:
+            return await analyze_job_page_with_gpt(page_text_content, job_title, job_link, temporary_llm, content_hash)
 
+    prompts = build_analysis_prompts(page_text_content, job_title, job_link)
+    logging.info(f"  [{job_title}] LLM ({get_openai_model_name()}) によるページテキスト解析を開始... ({len(prompts)} チャンク)")
+
+    try:
+        responses = await asyncio.gather(*(_request_analysis(llm, prompt, job_title) for prompt in prompts))
     except Exception as e:
         error_message = f"LLM API呼び出しエラー: {e}"
         logging.error(f"  [{job_title}] {error_message}")
-        return {"元タイトル": job_title, "元リンク": job_link, "エラー": error_message} 
\ No newline at end of file
+        return {"元タイトル": job_title, "元リンク": job_link, "エラー": error_message}
+
+    result = assemble_analysis_result(responses, job_title, job_link, content_hash or compute_content_hash(page_text_content))
+    token_usage = result[TOKEN_USAGE_KEY]
+    logging.info(f"  [{job_title}] LLM解析完了。トークン: 入力 {token_usage['prompt_tokens']}, 出力 {token_usage['completion_tokens']}")
+    return result
+
+# まとめて解析した応答で、どの求人の結果かを示すキー
+PACKED_URL_KEY = "入力URL"
+
+def is_packable(token_count: int) -> bool:
+    """他の求人とまとめて解析できるほど短いか (解析対象テキストの上限の半分以下)"""
+    return token_count <= get_text_token_budget() // 2
+
+def build_packed_analysis_prompt(jobs: list[tuple[str, str, str]]) -> str:
+    """複数の求人 (本文, タイトル, URL) を1リクエストで解析するプロンプトを組み立てる (指示と抽出項目は1回だけ送る)"""
+    sections = "\n".join(
+        f"""
+=== 求人 {i + 1} ===
+求人タイトル: 「{job_title}」
+求人URL: 「{job_link}」
+解析対象テキスト:
+---
+{page_text_content}
+---"""
+        for i, (page_text_content, job_title, job_link) in enumerate(jobs)
+    )
+    return f"""
+以下の {len(jobs)} 件の求人ページのテキストコンテンツから、求人ごとに指定された項目を抽出し、JSON形式で回答してください。
+回答は {{"jobs": [...]}} の形式のJSONオブジェクトとし、jobs には求人ごとに1つのオブジェクトを入力と同じ順で入れてください。
+各オブジェクトには、その求人の求人URLをそのまま "{PACKED_URL_KEY}" として含めてください。
+異なる求人の情報を混ぜないでください。
+項目が存在しない場合は、null または "該当なし" としてください。
+URLは必ず抽出してください。存在しない場合はその求人の求人URLを使用してください。
+会社名は必ず抽出してください。存在しない場合はその求人のタイトルから推測するか、「会社名不明」としてください。
+回答はJSONオブジェクトのみを出力してください。マークダウンの ```json ... ``` は不要です。
+
+抽出項目:
+{json.dumps(get_target_fields(), ensure_ascii=False, indent=2)}
+{sections}
+
+JSON出力:
+"""
+
+def split_packed_response(result_json_str: str, job_links: list[str], required_fields: list[str] | None = None) -> dict:
+    """まとめて解析した応答を検証し、求人URL -> 解析結果 にする (対応が取れない要素・抽出項目が欠けた要素は含めない)
+
+    required_fields を省略した場合は get_target_fields() の全項目を必須とする。
+    応答全体がJSONとして読めない・jobs 配列が無い場合は ValueError を送出する。
+    """
+    required_fields = get_target_fields() if required_fields is None else required_fields
+    parsed = json.loads(result_json_str)
+    items = parsed.get("jobs") if isinstance(parsed, dict) else None
+    if not isinstance(items, list):
+        raise ValueError("応答に jobs 配列がありません")
+    remaining = set(job_links)
+    results = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        link = item.pop(PACKED_URL_KEY, None)
+        if link not in remaining:
+            # 入力URLが書き換えられていても、抽出したURLが一致すればその求人の結果とみなす
+            extracted_url = item.get("URL")
+            link = extracted_url if isinstance(extracted_url, str) and extracted_url in remaining else None
+        if link is None:
+            continue
+        missing = [field for field in required_fields if field not in item]
+        if missing:
+            logging.warning(f"  まとめて解析した応答で {link} の抽出項目が欠けているため採用しません: {', '.join(missing[:5])}")
+            continue
+        remaining.discard(link)
+        results[link] = item
+    return results
+
+def _share_usage(usage: dict, weights: list[int]) -> list[dict]:
+    """まとめたリクエストのトークン使用量を、入力は本文のトークン数の比で、出力は均等に各求人へ割り振る"""
+    total_weight = max(1, sum(weights))
+    shares = []
+    for weight in weights:
+        prompt_tokens = usage["prompt_tokens"] * weight // total_weight
+        completion_tokens = usage["completion_tokens"] // len(weights)
+        shares.append({
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "requests": 1,
+            "packed_jobs": len(weights),
+        })
+    return shares
+
+async def analyze_job_pages_packed(jobs: list[tuple[str, str, str, str | None]],
+                                   llm: OpenAIClientManager | None = None) -> list[dict]:
+    """短い求人 (本文, タイトル, URL, コンテンツハッシュ) を1リクエストでまとめて解析し、入力と同じ順で結果を返す
+
+    応答が壊れていた場合や、応答に含まれなかった・抽出項目が欠けていた求人は1件ずつ解析し直す。
+    """
+    if len(jobs) == 1 or not get_openai_api_key():
+        return list(await asyncio.gather(*(
+            analyze_job_page_with_gpt(text, title, link, llm, content_hash) for text, title, link, content_hash in jobs
+        )))
+    if llm is None:
+        async with OpenAIClientManager(max_in_flight=1) as temporary_llm:
+            return await analyze_job_pages_packed(jobs, temporary_llm)
+
+    job_links = [link for _, _, link, _ in jobs]
+    logging.info(f"  LLM ({get_openai_model_name()}) で {len(jobs)} 件の求人をまとめて解析開始... ({', '.join(title for _, title, _, _ in jobs)})")
+    try:
+        result_json_str, usage = await _request_analysis(llm, build_packed_analysis_prompt([(text, title, link) for text, title, link, _ in jobs]),
+                                                        f"{len(jobs)} 件まとめ")
+        packed_results = split_packed_response(result_json_str, job_links)
+        usage_shares = _share_usage(usage, [count_tokens(text) for text, _, _, _ in jobs])
+    except Exception as e:
+        logging.warning(f"  まとめて解析した応答を処理できないため、{len(jobs)} 件を個別に解析し直します: {e}")
+        packed_results, usage_shares = {}, []
+
+    results: list[dict | None] = [None] * len(jobs)
+    retry_indexes = []
+    for i, (text, title, link, content_hash) in enumerate(jobs):
+        if link in packed_results:
+            results[i] = _finalize_analysis_result(packed_results[link], title, link,
+                                                   content_hash or compute_content_hash(text), usage_shares[i])
+        else:
+            retry_indexes.append(i)
+
+    if retry_indexes and packed_results:
+        logging.warning(f"  まとめて解析した応答に {len(retry_indexes)} 件の有効な結果が無いため、個別に解析し直します。")
+    retried = await asyncio.gather(*(
+        analyze_job_page_with_gpt(jobs[i][0], jobs[i][1], jobs[i][2], llm, jobs[i][3]) for i in retry_indexes
+    ))
+    for i, result in zip(retry_indexes, retried):
+        results[i] = result
+    logging.info(f"  まとめて解析完了 ({len(jobs) - len(retry_indexes)}/{len(jobs)} 件)")
+    return results
@@ -1,94 +1,131 @@
 import asyncio
 import logging
 import os
+from contextlib import asynccontextmanager
 from typing import Optional # Optional をインポート
+from urllib.parse import urljoin, urlparse, parse_qs
 from playwright.async_api import async_playwright, Page, BrowserContext, Playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 
-BASE_URL = "https://findy-code.io"
+from findy_scraper.infrastructure.content_extractor import COLLECT_CANDIDATES_JS, CONTENT_READY_JS, MIN_CONTENT_CHARS, extract_job_text
+from findy_scraper.infrastructure.retry import RetryPolicy, TransientError, default_classifier
+from findy_scraper.infrastructure.instrumentation import span
+
+# 環境変数 FINDY_BASE_URL で差し替えられる (ベンチマーク用のローカルサーバーなど)
+BASE_URL = os.getenv('FINDY_BASE_URL', 'https://findy-code.io').rstrip('/')
+
+# ログインセッションの有効性確認に使うページ (ログイン必須)
+SESSION_CHECK_PATH = '/likes'
+
+# 詳細ページで本文の描画を待つ上限 (固定時間の待機の代わりに、CONTENT_READY_JS が真になるまで待つ)
+CONTENT_READY_TIMEOUT_MS = 10000
+# 閉じたタブの代わりを作る試行回数 (全て失敗したらプールが1つ小さくなる)
+PAGE_REPLACE_ATTEMPTS = 3
+
+# プールのタブ (詳細ページ取得用) で読み込まないリソースの種類
+# CSSは読み込む: 本文は innerText で取得するため、CSSが無いと非表示の要素や改行の位置が変わってしまう
+DEFAULT_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+# 本文の取得に不要な計測・広告などのサードパーティーホスト (サブドメインも含む)
+DEFAULT_BLOCKED_HOSTS = frozenset({
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googleadservices.com",
+    "googlesyndication.com", "facebook.net", "facebook.com", "hotjar.com", "clarity.ms",
+    "segment.io", "segment.com", "intercom.io", "intercomcdn.com", "sentry.io", "newrelic.com",
+    "nr-data.net", "karte.io", "twitter.com", "linkedin.com", "yahoo.co.jp",
+})
+
+def _host_matches(host: str, domains) -> bool:
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
 
 # === Playwrightヘルパー関数 ===
 
 async def login_findy(page: Page, email: str, password: str):
-    print("Findyにアクセスしています...")
+    logging.info("Findyにアクセスしています...")
     await page.goto(f'{BASE_URL}/home')
-    print("ログインページに移動しています...")
+    logging.info("ログインページに移動しています...")
     try:
         # ログインボタンが表示されるまで待つ (最大10秒)
         await page.locator('text=ログイン').wait_for(timeout=10000)
         await page.click('text=ログイン')
     except Exception:
         # すでにログインページにいるか、レイアウトが変更された可能性
-        print("ログインボタンが見つかりません。現在のURLでログイン試行します。")
+        logging.warning("ログインボタンが見つかりません。現在のURLでログイン試行します。")
         # ログインフォームが表示されるまで待つ (より堅牢に)
         try:
              await page.locator('input[name="email"]').wait_for(timeout=10000)
         except Exception as form_error:
-             print(f"ログインフォームの検出に失敗しました: {form_error}")
+             logging.error(f"ログインフォームの検出に失敗しました: {form_error}")
              await page.screenshot(path='login_form_error.png')
              raise Exception("ログインフォームが見つかりません。Findyのページ構成が変更された可能性があります。")
         
-    print("ログイン情報を入力しています...")
+    logging.info("ログイン情報を入力しています...")
     await page.fill('input[name="email"]', email)
     await page.fill('input[name="password"]', password)
-    print("ログインしています...")
+    logging.info("ログインしています...")
     try:
         # ナビゲーションを待機 (タイムアウトを60秒に延長)
         async with page.expect_navigation(timeout=60000):
             await page.click('button[type="submit"]')
         # ログイン後の特定の要素を確認 (例: 自分のアイコンやホーム画面の要素)
         # await page.locator('[data-testid="user-menu"]').wait_for(timeout=15000)
-        print("ログイン成功")
+        logging.info("ログイン成功")
     except Exception as nav_error:
-        print(f"ログイン後のナビゲーションまたは要素確認に失敗しました: {nav_error}")
+        logging.error(f"ログイン後のナビゲーションまたは要素確認に失敗しました: {nav_error}")
         await page.screenshot(path='login_navigation_error.png')
         # ログイン失敗の可能性を示す例外を発生させる
         raise Exception(f"ログイン失敗の可能性があります: {nav_error}")
 
-async def scrape_likes_page_links(page: Page) -> list[dict]:
-    print(f"現在のページからリンクを収集中: {page.url}")
+# 求人詳細へのリンクと仮定したセレクター (Findyの構造が変わる可能性を考慮)
+JOB_LISTINGS_SELECTOR = 'a[href^="/companies/"][href*="/jobs/"]'
+# いいね一覧のページネーション
+PAGINATION_SELECTOR = 'ul.pagination_component_pagination__h4ax6'
+NEXT_PAGE_SELECTOR = f'{PAGINATION_SELECTOR} li:not(.disabled) a:has-text("次へ")'
+
+# ページ内で一度に実行し、全リンクの (タイトル, href) をまとめて返すスクリプト
+_EXTRACT_LINKS_JS = "elements => elements.map(e => ({ title: e.textContent, href: e.getAttribute('href') }))"
+
+def normalize_job_links(raw_links: list[dict]) -> list[dict]:
+    """ページ内で抽出した {title, href} のリストを {title, link} の形式にまとめて変換する (hrefの無いものは除外)"""
     job_link_data = []
-    # セレクターをより具体的に (Findyの構造が変わる可能性を考慮)
-    job_listings_selector = 'a[href^="/companies/"][href*="/jobs/"]' # 求人詳細へのリンクと仮定
+    for raw in raw_links:
+        job_link_raw = raw.get('href')
+        if not job_link_raw:
+            continue
+        job_title = raw.get('title')
+        job_link_data.append({
+            "title": job_title.strip() if job_title else "タイトル不明",
+            "link": f"{BASE_URL}{job_link_raw}" if job_link_raw.startswith('/') else job_link_raw,
+        })
+    return job_link_data
+
+async def scrape_likes_page_links(page: Page) -> list[dict]:
+    logging.info(f"現在のページからリンクを収集中: {page.url}")
+    with span("likes_page", page.url) as metrics:
+        job_link_data = await _scrape_likes_page_links(page)
+        metrics["links"] = len(job_link_data)
+    return job_link_data
+
+async def _scrape_likes_page_links(page: Page) -> list[dict]:
     try:
         # 要素が表示されるまで少し待つ
-        await page.locator(job_listings_selector).first.wait_for(timeout=15000)
-        job_listings = await page.query_selector_all(job_listings_selector)
+        await page.locator(JOB_LISTINGS_SELECTOR).first.wait_for(timeout=15000)
+        # 要素ごとに text_content / get_attribute を呼ぶとリンク数×2回の往復になるため、ページ内で一括抽出する
+        raw_links = await page.eval_on_selector_all(JOB_LISTINGS_SELECTOR, _EXTRACT_LINKS_JS)
     except Exception as e:
-         print(f"求人リンクのセレクター({job_listings_selector})が見つかりません: {e}")
+         logging.warning(f"求人リンクのセレクター({JOB_LISTINGS_SELECTOR})が見つかりません: {e}")
          # ページの内容を出力してデバッグしやすくする
          # print(await page.content()) 
          return []
-    
-    if not job_listings:
-        print("このページでは求人リンクが見つかりませんでした。")
+
+    if not raw_links:
+        logging.warning("このページでは求人リンクが見つかりませんでした。")
         return []
 
-    print(f"{len(job_listings)}件の求人リンク要素が見つかりました。情報を取得中...")
-    for link_element in job_listings:
-        job_title = await link_element.text_content() # タイトル取得を試みる
-        job_link_raw = await link_element.get_attribute('href')
-        job_link = "不明"
-        
-        if job_link_raw:
-            if job_link_raw.startswith('/'):
-                job_link = f"{BASE_URL}{job_link_raw}"
-            else:
-                job_link = job_link_raw 
-        
-        # 有効なリンクを持つものだけを追加
-        if job_link != "不明":
-            job_link_data.append({
-                "title": job_title.strip() if job_title else "タイトル不明", 
-                "link": job_link
-            })
-        # else: # デバッグ用
-        #     print(f"  無効なリンクをスキップ: raw='{job_link_raw}'")
-            
-    print(f"{len(job_link_data)}件の有効な求人リンクを取得しました。")
+    logging.info(f"{len(raw_links)}件の求人リンク要素が見つかりました。")
+    job_link_data = normalize_job_links(raw_links)
+    logging.info(f"{len(job_link_data)}件の有効な求人リンクを取得しました。")
     return job_link_data
 
 async def get_all_liked_job_links(page: Page) -> list[dict]:
-    print("\n--- いいねページの全リンク収集開始 ---")
+    logging.info("\n--- いいねページの全リンク収集開始 ---")
     await page.goto(f'{BASE_URL}/likes')
     # ネットワークが安定するまで待つ + 少し追加で待つ
     await page.wait_for_load_state('networkidle', timeout=30000) 
@@ -101,19 +138,18 @@ async def get_all_liked_job_links(page: Page) -> list[dict]:
     while True:
         current_url = page.url
         if current_url in processed_urls:
-            print(f"警告: ページループを検出しました ({current_url})。収集を終了します。")
+            logging.warning(f"ページループを検出しました ({current_url})。収集を終了します。")
             break
         processed_urls.add(current_url)
         
-        print(f"--- リンク収集: ページ {page_num} ({current_url}) --- ")
+        logging.info(f"--- リンク収集: ページ {page_num} ({current_url}) --- ")
         # ページが完全に表示されるのを待つ（動的コンテンツ対策）
         await page.wait_for_timeout(1500) 
         page_links_info = await scrape_likes_page_links(page)
         all_job_links_info.extend(page_links_info)
         
         # 次へボタンのセレクターを特定
-        next_page_selector = 'ul.pagination_component_pagination__h4ax6 li:not(.disabled) a:has-text("次へ")'
-        next_page_link = page.locator(next_page_selector)
+        next_page_link = page.locator(NEXT_PAGE_SELECTOR)
         
         try:
             # 「次へ」ボタンが存在し、クリック可能か確認 (タイムアウトを短めに設定)
@@ -122,39 +158,176 @@ async def get_all_liked_job_links(page: Page) -> list[dict]:
             next_page_url_raw = await next_page_link.get_attribute('href')
             if next_page_url_raw:
                 next_page_url = f"{BASE_URL}{next_page_url_raw}" if next_page_url_raw.startswith('/') else next_page_url_raw
-                print(f"次のページへ移動: {next_page_url}")
+                logging.info(f"次のページへ移動: {next_page_url}")
                 # ナビゲーションを待機
                 async with page.expect_navigation(wait_until='networkidle', timeout=30000):
                     await next_page_link.click()
                 await page.wait_for_timeout(1000) # 遷移後の安定待ち
                 page_num += 1
             else: 
-                print("次のページのhref属性が取得できませんでした。")
+                logging.warning("次のページのhref属性が取得できませんでした。")
                 break
         except Exception as e:
             # タイムアウトは「次へ」ボタンがないことを意味する可能性が高い
             if "Timeout" in str(e):
-                print("次のページリンクが見つかりません。リンク収集完了。")
+                logging.info("次のページリンクが見つかりません。リンク収集完了。")
             else:
-                 print(f"次のページへの遷移中にエラー: {e}")
+                 logging.error(f"次のページへの遷移中にエラー: {e}")
             break
             
     # 重複をリンクで除去
     unique_links_info = list({info['link']: info for info in all_job_links_info if info['link'] != "不明"}.values())
-    print(f"\n--- 合計 {len(unique_links_info)} 件のユニークな求人リンクを収集しました --- ")
+    logging.info(f"\n--- 合計 {len(unique_links_info)} 件のユニークな求人リンクを収集しました --- ")
     return unique_links_info
 
-async def get_job_page_content(page: Page, job_link: str, job_title: str) -> Optional[str]:
-    """指定された求人詳細ページのテキストコンテンツを取得する"""
-    logging.info(f"  [{job_title}] 詳細ページ取得中: {job_link}")
+def _page_number_from_url(url: str) -> int | None:
+    values = parse_qs(urlparse(url).query).get('page')
+    try:
+        return int(values[0]) if values else None
+    except ValueError:
+        return None
+
+async def _discover_likes_page_urls(page: Page) -> dict[int, str]:
+    """ページネーション内のリンクから {ページ番号: URL} を集める (?page=N 形式のリンクのみ)"""
+    try:
+        hrefs = await page.eval_on_selector_all(f'{PAGINATION_SELECTOR} a[href]', "elements => elements.map(e => e.getAttribute('href'))")
+    except PlaywrightError:
+        return {}
+    page_urls = {}
+    for href in hrefs:
+        url = urljoin(f'{BASE_URL}/likes', href)
+        page_number = _page_number_from_url(url)
+        if page_number:
+            page_urls[page_number] = url
+    return page_urls
+
+async def get_all_liked_job_links_parallel(page: Page, playwright_manager: "PlaywrightManager", metrics: dict | None = None) -> list[dict]:
+    """1ページ目のページネーションからページURLを割り出し、残りのページをプールのタブで並行に取得する
+
+    ページネーションが省略表示 (1 2 3 ... ) の場合も、取得した各ページのページネーションから
+    新しいページ番号を見つけ次第追加で取得する。ページURLが割り出せない場合は順次取得に切り替える。
+    各ページの取得は詳細ページと同じ再試行ポリシーで再試行し、それでも取得できなかったページ数を
+    metrics の failed_pages に書き込む (計測区間の属性用)。
+    """
+    metrics = {} if metrics is None else metrics
+    metrics["failed_pages"] = 0
+    logging.info("\n--- いいねページの全リンク収集開始 (並行取得) ---")
+    await page.goto(f'{BASE_URL}/likes', wait_until='domcontentloaded')
+    links_by_page = {1: await scrape_likes_page_links(page)}
+    known_page_urls = await _discover_likes_page_urls(page)
+
+    if not known_page_urls:
+        if await page.locator(NEXT_PAGE_SELECTOR).count() > 0:
+            logging.warning("ページ番号付きのURLが見つからないため、順次取得に切り替えます。")
+            return await get_all_liked_job_links(page)
+        logging.info("ページネーションが見つかりません。1ページのみです。")
+
+    async def fetch_likes_page(page_number: int, url: str):
+        logging.info(f"--- リンク収集: ページ {page_number} ({url}) --- ")
+
+        # 試行ごとにタブを借り直すため、閉じてしまったタブは新しいものに替わる
+        async def attempt():
+            async with playwright_manager.borrow_page() as pooled_page:
+                response = await pooled_page.goto(url, wait_until='domcontentloaded', timeout=30000)
+                if response is not None and response.status >= 400:
+                    raise PageLoadError(response.status)
+                return await scrape_likes_page_links(pooled_page), await _discover_likes_page_urls(pooled_page)
+
+        try:
+            page_links, discovered = await playwright_manager.retry_policy.call(attempt, label=f"いいねページ {page_number}")
+        except PagePoolExhaustedError:
+            raise
+        except Exception as e:
+            logging.error(f"いいねページ {page_number} の取得に失敗しました: {e}")
+            return page_number, None, {}
+        return page_number, page_links, discovered
+
+    # 未取得のページ番号が無くなるまで、見つかったページをまとめて並行取得する (再試行しても失敗したページは取得し直さない)
+    failed_pages = set()
+    while pending := sorted(n for n in known_page_urls if n not in links_by_page and n not in failed_pages):
+        logging.info(f"{len(pending)} ページを並行取得します (ページ {pending[0]}〜{pending[-1]})")
+        for page_number, page_links, discovered in await asyncio.gather(
+                *(fetch_likes_page(n, known_page_urls[n]) for n in pending)):
+            if page_links is None:
+                failed_pages.add(page_number)
+            else:
+                links_by_page[page_number] = page_links
+            known_page_urls.update(discovered)
+    metrics["failed_pages"] = len(failed_pages)
+    if failed_pages:
+        logging.warning(f"再試行しても取得できなかったいいねページが {len(failed_pages)} ページあります (ページ {', '.join(map(str, sorted(failed_pages)))})。これらのページの求人は今回の対象に含まれません。")
+
+    # ページ順に結合し、重複をリンクで除去 (先に出たものを残す)
+    unique_links_info = {}
+    for page_number in sorted(links_by_page):
+        for info in links_by_page[page_number]:
+            unique_links_info.setdefault(info['link'], info)
+    logging.info(f"\n--- 合計 {len(unique_links_info)} 件のユニークな求人リンクを収集しました ({len(links_by_page)} ページ, 取得失敗 {len(failed_pages)} ページ) --- ")
+    return list(unique_links_info.values())
+
+# 再試行すれば回復する見込みのある、ページ読み込み時のHTTPステータス
+RETRYABLE_PAGE_STATUSES = {408, 429, 500, 502, 503, 504}
+# 再試行の対象とするネットワーク系のPlaywrightエラー
+_TRANSIENT_ERROR_MARKERS = ("net::ERR_", "NS_ERROR_", "Target page, context or browser has been closed")
+
+class PagePoolExhaustedError(RuntimeError):
+    """プールのタブが全て失われ、代わりも作れなかった (詳細ページの取得を続けられない)"""
+
+class PageLoadError(Exception):
+    """詳細ページがエラーのHTTPステータスを返した"""
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+def classify_playwright_error(error: Exception) -> tuple[bool, float | None]:
+    """ページ取得時の例外を (一時的なエラーか, 待つべき秒数) に分類する"""
+    if isinstance(error, PageLoadError):
+        return error.status in RETRYABLE_PAGE_STATUSES, None
+    if isinstance(error, PlaywrightTimeoutError):
+        return True, None
+    if isinstance(error, PlaywrightError):
+        return any(marker in str(error) for marker in _TRANSIENT_ERROR_MARKERS), None
+    return default_classifier(error)
+
+async def _load_job_page_content(page: Page, job_link: str, job_title: str, metrics: dict | None = None) -> Optional[str]:
+    """詳細ページを1回読み込んでテキストを返す (ページ遷移・HTTPエラーは例外として送出する)
+
+    metrics を渡すと、受信バイト数・読込時間・文字数などを書き込む (計測区間の属性用)。
+    """
+    metrics = {} if metrics is None else metrics
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    # このページ取得で受信したバイト数 (Content-Length の合計、ヘッダーが無いレスポンスは数えない)
+    transfer = {"bytes": 0, "responses": 0}
+    def count_response(response):
+        transfer["responses"] += 1
+        try:
+            transfer["bytes"] += int(response.headers.get('content-length', 0))
+        except ValueError:
+            pass
+    page.on("response", count_response)
     try:
-        await page.goto(job_link, wait_until='domcontentloaded', timeout=30000) # タイムアウトを30秒に
-        await page.wait_for_timeout(1000) # レンダリング待機
+        response = await page.goto(job_link, wait_until='domcontentloaded', timeout=30000) # タイムアウトを30秒に
+        if response is not None and response.status >= 400:
+            retry_after = response.headers.get('retry-after')
+            if response.status == 429 and retry_after and retry_after.isdigit():
+                raise TransientError("HTTP 429", float(retry_after))
+            raise PageLoadError(response.status)
+        loaded = loop.time()
+        # 固定時間ではなく、求人本文 (JSON-LD・__NEXT_DATA__・メインコンテンツ) を抽出できる状態になるまで待つ
+        try:
+            await page.wait_for_function(CONTENT_READY_JS, arg=MIN_CONTENT_CHARS, timeout=CONTENT_READY_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            logging.warning(f"  [{job_title}] 求人本文の描画を確認できませんでした。現在の内容で取得します。")
+        ready = loop.time()
 
-        # ボディ全体のテキストを取得 (より多くの情報を取得する試み)
-        # 特定のコンテナ要素があれば、それを指定する方が確実
-        # 例: content = await page.locator('#job-details-container').inner_text()
-        content = await page.locator('body').inner_text()
+        # 埋め込みの構造化データ (JSON-LD, __NEXT_DATA__) やメインコンテンツから求人本文だけを抽出する
+        # ナビゲーション・フッター・おすすめ求人などを含まない分、LLMへの入力が小さくなる
+        content, source = extract_job_text(await page.evaluate(COLLECT_CANDIDATES_JS))
+        if not content:
+            # 抽出できなければ従来どおりボディ全体のテキストを使う
+            content = await page.locator('body').inner_text()
 
         if not content:
              logging.warning(f"  [{job_title}] ページからテキストコンテンツを取得できませんでした。空の内容です。")
@@ -164,47 +337,222 @@ async def get_job_page_content(page: Page, job_link: str, job_title: str) -> Opt
                   f.write(await page.content())
              return None
 
-        logging.info(f"  [{job_title}] 詳細ページのテキスト取得完了。文字数: {len(content)}")
+        metrics.update(chars=len(content), source=source, load_sec=loaded - started, ready_sec=ready - loaded)
+        logging.info(
+            f"  [{job_title}] 詳細ページのテキスト取得完了。抽出元: {source}, 文字数: {len(content)}, "
+            f"受信 {transfer['bytes'] / 1024:.1f} KB ({transfer['responses']} レスポンス), "
+            f"読込 {loaded - started:.2f}秒 + 描画待ち {ready - loaded:.2f}秒 (合計 {loop.time() - started:.2f}秒)"
+        )
         return content
+    finally:
+        page.remove_listener("response", count_response)
+        metrics.update(bytes=transfer["bytes"], responses=transfer["responses"])
+
+async def fetch_job_page_content(playwright_manager: "PlaywrightManager", job_link: str, job_title: str) -> Optional[str]:
+    """プールのタブで詳細ページのテキストを取得する
+
+    タイムアウト・接続エラー・429/5xx は playwright_manager の再試行ポリシーで再試行する
+    (試行ごとにタブを借り直すため、閉じてしまったタブは新しいものに替わる)。失敗時は None。
+    """
+    logging.info(f"  [{job_title}] 詳細ページ取得中: {job_link}")
+
+    async def attempt():
+        async with playwright_manager.borrow_page() as page:
+            with span("fetch", job_title) as metrics:
+                return await _load_job_page_content(page, job_link, job_title, metrics)
+
+    try:
+        return await playwright_manager.retry_policy.call(attempt, label=job_title)
+    except PagePoolExhaustedError:
+        # この求人だけの失敗ではないため、取得ステージ全体を止める
+        raise
+    except PageLoadError as e:
+        logging.error(f"  [{job_title}] 詳細ページがエラーを返しました ({e}): {job_link}")
     except PlaywrightTimeoutError:
         logging.error(f"  [{job_title}] ページ遷移がタイムアウトしました: {job_link}")
-        return None
     except PlaywrightError as e:
-        # Playwright特有のエラーをキャッチ
         logging.error(f"  [{job_title}] ページ取得中にPlaywrightエラーが発生: {e}")
-        return None
     except Exception as e:
         logging.error(f"  [{job_title}] ページ取得中に予期せぬエラーが発生: {e}")
-        return None
+    return None
 
 # Playwrightの起動とブラウザ操作のコンテキストマネージャ
 class PlaywrightManager:
-    def __init__(self, headless: bool = True):
+    """block_resources が True の場合、プールのタブでは不要なリソースとサードパーティーホストへのリクエストを中断する
+
+    allowed_hosts を指定すると、そのホスト (とサブドメイン) 以外へのリクエストを全て中断する厳格モードになる。
+    ログイン・いいね一覧に使うメインのページには適用しない。
+    """
+    def __init__(self, headless: bool = True, page_pool_size: int = 1, block_resources: bool = True,
+                 blocked_resource_types=DEFAULT_BLOCKED_RESOURCE_TYPES, blocked_hosts=DEFAULT_BLOCKED_HOSTS,
+                 allowed_hosts=None, storage_state_path: str | None = None, restore_storage_state: bool = True):
         self._headless = headless
+        # ログイン済みセッション (Cookie, localStorage) の保存先。restore_storage_state が True なら起動時に復元する
+        # (False の場合も保存先としては使い、ログインし直した後のセッションを保存する)
+        self._storage_state_path = storage_state_path
+        self._restore_storage_state = restore_storage_state
+        self._restored_storage_state = False
+        self._page_pool_size = max(1, page_pool_size)
+        self._block_resources = block_resources
+        self._blocked_resource_types = frozenset(blocked_resource_types)
+        self._blocked_hosts = frozenset(blocked_hosts)
+        self._allowed_hosts = frozenset(allowed_hosts) if allowed_hosts else None
+        self._blocked_request_count = 0
         self._playwright: Playwright | None = None
         self._browser: BrowserContext | None = None
+        # 詳細ページ取得用のタブプール (同一コンテキストなのでログイン状態を共有する)
+        self._page_pool: asyncio.Queue[Page | None] | None = None
+        # プールに属しているタブの数 (貸出中を含む)。0 になったら取得を続けられない
+        self._live_page_count = 0
+        # 詳細ページ取得の再試行とサーキットブレーカー (全タブで共有する)
+        self.retry_policy = RetryPolicy("取得", classify_playwright_error)
 
     async def __aenter__(self):
-        print("Playwrightを起動しています...")
+        logging.info("Playwrightを起動しています...")
         self._playwright = await async_playwright().start()
-        print(f"ブラウザを起動しています... (headless={self._headless})")
+        logging.info(f"ブラウザを起動しています... (headless={self._headless})")
         browser_instance = await self._playwright.chromium.launch(headless=self._headless)
+        context_options = {}
+        if self._restore_storage_state and self._storage_state_path and os.path.isfile(self._storage_state_path):
+            logging.info(f"保存済みのログインセッションを読み込みます: {self._storage_state_path}")
+            context_options['storage_state'] = self._storage_state_path
+            self._restored_storage_state = True
         self._browser = await browser_instance.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36' # 一般的なUA
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36', # 一般的なUA
+            **context_options
         )
-        print("新しいページを作成しています...")
+        logging.info("新しいページを作成しています...")
         page = await self._browser.new_page()
+
+        logging.info(f"詳細ページ取得用のタブを {self._page_pool_size} 個作成しています...")
+        self._page_pool = asyncio.Queue()
+        for _ in range(self._page_pool_size):
+            self._page_pool.put_nowait(await self._new_pool_page())
+        self._live_page_count = self._page_pool_size
         return page # ページオブジェクトを返す
 
+    async def _new_pool_page(self) -> Page:
+        pool_page = await self._browser.new_page()
+        if self._block_resources:
+            await pool_page.route("**/*", self._route_request)
+        return pool_page
+
+    async def _route_request(self, route):
+        request = route.request
+        host = urlparse(request.url).hostname or ""
+        if request.resource_type in self._blocked_resource_types:
+            blocked = True
+        elif self._allowed_hosts is not None:
+            blocked = bool(host) and not _host_matches(host, self._allowed_hosts)
+        else:
+            blocked = _host_matches(host, self._blocked_hosts)
+
+        if blocked:
+            self._blocked_request_count += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @property
+    def page_pool_size(self) -> int:
+        return self._page_pool_size
+
+    async def is_session_valid(self) -> bool:
+        """復元したセッションでログイン済みかを、ログイン必須ページへのリクエスト1回で確認する
+
+        リダイレクトは追わず、3xx (ログイン画面への転送) や 401/403、ログインフォームを含む応答は無効とみなす。
+        """
+        if not self._restored_storage_state:
+            return False
+        try:
+            response = await self._browser.request.get(f'{BASE_URL}{SESSION_CHECK_PATH}', max_redirects=0, timeout=15000)
+            try:
+                if response.status != 200:
+                    logging.warning(f"保存済みセッションは無効です (HTTP {response.status})。")
+                    return False
+                if 'name="password"' in await response.text():
+                    logging.warning("保存済みセッションは無効です (ログインフォームが返されました)。")
+                    return False
+            finally:
+                await response.dispose()
+        except PlaywrightError as e:
+            logging.warning(f"セッションの確認に失敗しました: {e}")
+            return False
+        logging.info("保存済みのログインセッションは有効です。")
+        return True
+
+    async def clear_session(self):
+        """復元したセッションのCookieを消し、ログインフォームが表示される状態に戻す"""
+        if self._browser and self._restored_storage_state:
+            await self._browser.clear_cookies()
+            self._restored_storage_state = False
+
+    async def save_storage_state(self):
+        """現在のセッション (Cookie, localStorage) を一時ファイル経由で保存する"""
+        if not self._storage_state_path or not self._browser:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._storage_state_path) or '.', exist_ok=True)
+            tmp_path = f"{self._storage_state_path}.tmp"
+            await self._browser.storage_state(path=tmp_path)
+            # Cookieを含むため本人以外が読めないようにする
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self._storage_state_path)
+            logging.info(f"ログインセッションを保存しました: {self._storage_state_path}")
+        except (PlaywrightError, OSError) as e:
+            logging.warning(f"ログインセッションの保存に失敗しました: {e}")
+
+    async def _replace_closed_page(self) -> Page | None:
+        """閉じたタブの代わりを作る。PAGE_REPLACE_ATTEMPTS 回とも失敗したら None"""
+        for attempt in range(1, PAGE_REPLACE_ATTEMPTS + 1):
+            try:
+                return await self._new_pool_page()
+            except PlaywrightError as e:
+                logging.error(f"代替タブの作成に失敗しました ({attempt}/{PAGE_REPLACE_ATTEMPTS}): {e}")
+        return None
+
+    @asynccontextmanager
+    async def borrow_page(self):
+        """プールからタブを1つ借りる。ブロックを抜けると自動的にプールへ返却される
+
+        タブが全て失われた場合は、待っている呼び出しも含めて PagePoolExhaustedError を送出する。
+        """
+        if self._page_pool is None or self._browser is None:
+            raise RuntimeError("PlaywrightManager が開始されていません。async with で使用してください。")
+        if self._live_page_count == 0:
+            raise PagePoolExhaustedError("詳細ページ取得用のタブが全て失われました。")
+        page = await self._page_pool.get()
+        if page is None:
+            # 目印を戻し、他に待っている呼び出しにもプールが空になったことを伝える
+            self._page_pool.put_nowait(None)
+            raise PagePoolExhaustedError("詳細ページ取得用のタブが全て失われました。")
+        try:
+            yield page
+        finally:
+            # タブがクラッシュ等で閉じられていた場合は作り直してプールの大きさを保つ
+            if page.is_closed():
+                logging.warning("プール内のタブが閉じられていたため、新しいタブを作成します。")
+                page = await self._replace_closed_page()
+            if page is not None:
+                self._page_pool.put_nowait(page)
+            else:
+                self._live_page_count -= 1
+                logging.error(f"タブプールが縮小しました (残り {self._live_page_count}/{self._page_pool_size} 個)。")
+                if self._live_page_count == 0:
+                    # get() で待っている呼び出しを起こすための目印
+                    self._page_pool.put_nowait(None)
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        print("ブラウザコンテキストを閉じています...")
+        if self._block_resources:
+            logging.info(f"プールのタブで中断したリクエスト: {self._blocked_request_count} 件")
+        logging.info("ブラウザコンテキストを閉じています...")
         if self._browser:
             await self._browser.close()
-        print("Playwrightを停止しています...")
+        logging.info("Playwrightを停止しています...")
         if self._playwright:
             await self._playwright.stop()
-        print("Playwright関連のリソースを解放しました。")
+        logging.info("Playwright関連のリソースを解放しました。")
         if exc_type:
-            print(f"Playwright処理中にエラーが発生しました: {exc_val}")
+            logging.error(f"Playwright処理中にエラーが発生しました: {exc_val}")
         # エラーを再送出しない場合は False を返す
-        return False 
\ No newline at end of file
+        return False
\ No newline at end of file
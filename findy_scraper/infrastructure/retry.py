@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import random
+
+# 1回の呼び出しあたりの最大試行回数 (初回を含む)
+DEFAULT_MAX_ATTEMPTS = 4
+# 指数バックオフの基準と上限 (秒)
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 30.0
+# 再試行の予算: 呼び出し回数に対する再試行回数の割合と、それとは別に許す回数
+# 障害時に全ジョブが再試行を繰り返して負荷を増やさないよう、実行全体で再試行できる回数を抑える
+DEFAULT_RETRY_BUDGET_RATIO = 0.2
+DEFAULT_RETRY_BUDGET_MIN = 10
+# 連続してこの回数だけ一時的なエラーが起きたら、サーキットブレーカーを開く
+DEFAULT_FAILURE_THRESHOLD = 5
+# サーキットブレーカーを開いておく時間 (秒)。試行が失敗するたびに倍にする
+BREAKER_COOLDOWN_SEC = 10.0
+BREAKER_MAX_COOLDOWN_SEC = 120.0
+
+class TransientError(Exception):
+    """再試行すれば成功する見込みのあるエラー (retry_after が分かればその秒数)"""
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def default_classifier(error: Exception) -> tuple[bool, float | None]:
+    """例外を (一時的なエラーか, 待つべき秒数) に分類する。TransientError とタイムアウト・接続エラーを一時的とみなす"""
+    if isinstance(error, TransientError):
+        return True, error.retry_after
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError)), None
+
+# ステージ (取得・LLM解析など) ごとに共有するサーキットブレーカー
+class CircuitBreaker:
+    """一時的なエラーが続いたらステージ全体の呼び出しを一定時間止める
+
+    開いている間、呼び出し側は失敗せずに待たされるため、レート制限中のAPIにリクエストを送り続けて
+    エラー結果を量産する代わりに、パイプライン全体が減速する。待ち時間が過ぎたら1件だけ試し、
+    成功すれば閉じ、失敗すれば待ち時間を倍にして開き直す。
+    """
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 cooldown: float = BREAKER_COOLDOWN_SEC, max_cooldown: float = BREAKER_MAX_COOLDOWN_SEC):
+        self._name = name
+        self._failure_threshold = max(1, failure_threshold)
+        self._base_cooldown = cooldown
+        self._cooldown = cooldown
+        self._max_cooldown = max_cooldown
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._half_open = False
+        self._probe_done: asyncio.Event | None = None
+        self.opened_count = 0
+
+    async def before_call(self) -> tuple[float, bool]:
+        """呼び出してよい状態になるまで待ち、(待った秒数, 半開状態の試行を任されたか) を返す
+
+        試行を任された呼び出し (probe=True) の結果だけがブレーカーを閉じる・開き直すことができるため、
+        呼び出し側は結果を報告するメソッドに probe をそのまま渡す。
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while True:
+            now = loop.time()
+            if now < self._open_until:
+                await asyncio.sleep(self._open_until - now)
+                continue
+            if self._probe_done is not None:
+                # 半開状態: 試行中の1件の結果を待つ
+                await self._probe_done.wait()
+                continue
+            probe = self._half_open
+            if probe:
+                self._probe_done = asyncio.Event()
+            return loop.time() - started, probe
+
+    def _finish_probe(self):
+        if self._probe_done is not None:
+            self._probe_done.set()
+            self._probe_done = None
+
+    def on_success(self, probe: bool = False):
+        if probe:
+            logging.info(f"[{self._name}] サーキットブレーカーを閉じます (試行が成功しました)。")
+            self._cooldown = self._base_cooldown
+            self._half_open = False
+            self._finish_probe()
+        if not self._half_open:
+            self._consecutive_failures = 0
+
+    def on_permanent_failure(self, probe: bool = False):
+        # 恒久的なエラーは相手が応答している証拠なので、ステージの健全性としては成功と同じに扱う
+        self.on_success(probe)
+
+    def on_transient_failure(self, retry_after: float | None = None, probe: bool = False):
+        self._consecutive_failures += 1
+        if probe:
+            # 試行が失敗したら待ち時間を倍にして開き直す
+            self._cooldown = min(self._max_cooldown, self._cooldown * 2)
+            self._open(max(self._cooldown, retry_after or 0.0))
+            self._finish_probe()
+        elif not self._half_open and (retry_after is not None or self._consecutive_failures >= self._failure_threshold):
+            # 閉じている間だけ開く (開く前から実行中だった呼び出しの失敗は、開いている間・半開状態では状態を変えない)
+            self._open(max(self._cooldown, retry_after or 0.0))
+
+    def release(self, probe: bool = False):
+        """呼び出しが中断された場合に、半開状態の試行枠を返す"""
+        if probe:
+            self._finish_probe()
+
+    def _open(self, duration: float):
+        loop = asyncio.get_running_loop()
+        open_until = loop.time() + duration
+        if open_until > self._open_until:
+            self._open_until = open_until
+            self.opened_count += 1
+            logging.warning(f"[{self._name}] 一時的なエラーが続いたため、サーキットブレーカーを開いて {duration:.1f}秒 呼び出しを止めます。")
+        self._half_open = True
+
+class RetryPolicy:
+    """一時的なエラーを指数バックオフ (フルジッター) で再試行し、恒久的なエラーはそのまま送出する
+
+    再試行回数は1回の呼び出しあたり max_attempts まで、実行全体では予算 (呼び出し回数 × budget_ratio + budget_min) まで。
+    ステージごとに1つ作り、試行・再試行・バックオフ時間の統計を集計する。
+    """
+    def __init__(self, stage: str, classifier=default_classifier, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 base_delay: float = BACKOFF_BASE_SEC, max_delay: float = BACKOFF_MAX_SEC,
+                 budget_ratio: float = DEFAULT_RETRY_BUDGET_RATIO, budget_min: int = DEFAULT_RETRY_BUDGET_MIN,
+                 breaker: CircuitBreaker | None = None):
+        self.stage = stage
+        self._classifier = classifier
+        self._max_attempts = max(1, max_attempts)
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._budget_ratio = budget_ratio
+        self._budget_min = budget_min
+        self.breaker = breaker or CircuitBreaker(stage)
+        self.stats = {
+            'calls': 0, 'attempts': 0, 'retries': 0, 'succeeded_after_retry': 0,
+            'transient_errors': 0, 'permanent_errors': 0, 'gave_up': 0, 'budget_exhausted': 0,
+            'backoff_time': 0.0, 'breaker_wait': 0.0,
+        }
+
+    def _has_budget(self) -> bool:
+        return self.stats['retries'] < self._budget_min + self.stats['calls'] * self._budget_ratio
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        return random.uniform(0, min(self._max_delay, self._base_delay * (2 ** attempt)))
+
+    async def call(self, func, *args, label: str = "", **kwargs):
+        """func(*args, **kwargs) を再試行付きで呼び出す。再試行を諦めた場合は最後の例外を送出する"""
+        self.stats['calls'] += 1
+        attempt = 0
+        while True:
+            waited, probe = await self.breaker.before_call()
+            self.stats['breaker_wait'] += waited
+            self.stats['attempts'] += 1
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                self.breaker.release(probe)
+                raise
+            except Exception as e:
+                transient, retry_after = self._classifier(e)
+                if not transient:
+                    self.stats['permanent_errors'] += 1
+                    self.breaker.on_permanent_failure(probe)
+                    raise
+                self.stats['transient_errors'] += 1
+                self.breaker.on_transient_failure(retry_after, probe)
+                attempt += 1
+                if attempt >= self._max_attempts:
+                    self.stats['gave_up'] += 1
+                    logging.error(f"  [{self.stage}] {label} {attempt}回試行しましたが失敗しました: {e}")
+                    raise
+                if not self._has_budget():
+                    self.stats['budget_exhausted'] += 1
+                    logging.error(f"  [{self.stage}] 再試行の予算を使い切ったため {label} の再試行を中止します: {e}")
+                    raise
+                delay = retry_after if retry_after is not None else self._backoff_seconds(attempt)
+                self.stats['retries'] += 1
+                self.stats['backoff_time'] += delay
+                logging.warning(f"  [{self.stage}] {label} 一時的なエラーのため {delay:.1f}秒後に再試行します ({attempt}/{self._max_attempts - 1}): {e}")
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.on_success(probe)
+            if attempt:
+                self.stats['succeeded_after_retry'] += 1
+            return result
+
+    def log_summary(self):
+        stats = self.stats
+        logging.info(
+            f"  再試行 [{self.stage}]: 呼び出し {stats['calls']} 回, 試行 {stats['attempts']} 回, 再試行 {stats['retries']} 回 "
+            f"(再試行で成功 {stats['succeeded_after_retry']}, 断念 {stats['gave_up']}, 予算切れ {stats['budget_exhausted']}), "
+            f"恒久的なエラー {stats['permanent_errors']} 回, バックオフ合計 {stats['backoff_time']:.1f}秒, "
+            f"ブレーカー待ち合計 {stats['breaker_wait']:.1f}秒 (開いた回数 {self.breaker.opened_count})"
+        )
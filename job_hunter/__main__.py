@@ -0,0 +1,4 @@
+from job_hunter.cli import main
+
+# python -m job_hunter で統合CLIを実行する
+main()
@@ -0,0 +1,73 @@
+import asyncio
+import argparse
+import logging
+from dotenv import load_dotenv
+
+# 各サブコマンドの処理が重い依存ライブラリ (Playwright・OpenAI・notion-client) を使う時に読み込むため、
+# ヘルプの表示や status・convert-cache はそれらを読み込まずに起動する
+from findy_scraper import cli as findy_cli
+from notion_updater import cli as notion_cli
+from job_hunter import status
+
+# ロギング設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='job-hunter',
+        description='Findyでいいねされた求人の取得・解析と、Notionデータベースへの反映を行います。'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scrape_parser = subparsers.add_parser(
+        'scrape',
+        help='いいねされた求人のページを取得し、LLMで解析してキャッシュに保存します (findy_scraper/cli.py と同じ)。'
+    )
+    findy_cli.add_fetch_arguments(scrape_parser)
+    findy_cli.add_analysis_arguments(scrape_parser)
+
+    analyze_parser = subparsers.add_parser(
+        'analyze',
+        help='解析が必要な求人のページを取得し、OpenAI Batch APIで一括解析します (findy_scraper/cli.py batch と同じ)。'
+    )
+    findy_cli.add_fetch_arguments(analyze_parser)
+    findy_cli.add_batch_arguments(analyze_parser)
+
+    sync_parser = subparsers.add_parser(
+        'sync',
+        help='解析済みの求人をNotionデータベースに登録・更新します (notion_updater/cli.py と同じ)。'
+    )
+    notion_cli.add_sync_arguments(sync_parser)
+
+    subparsers.add_parser(
+        'status',
+        help='解析結果キャッシュ・直近の実行レポート・Notionの同期状態を表示します (外部サービスには接続しません)。'
+    )
+
+    findy_cli.add_convert_cache_arguments(subparsers.add_parser(
+        'convert-cache',
+        help='解析結果キャッシュの保存形式を変換します (変換後は .env の FINDY_CACHE_FORMAT も合わせて変更します)。'
+    ))
+    return parser
+
+def main(argv: list[str] | None = None):
+    # 環境変数を読み込む (各モジュールは環境変数を使う時に読むため、最初に1回だけ読めばよい)
+    load_dotenv()
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        status.print_status()
+    elif args.command == 'convert-cache':
+        if not findy_cli.run_convert_cache(args):
+            raise SystemExit(1)
+    elif args.command == 'sync':
+        notion_cli.validate_sync_arguments(parser, args)
+        asyncio.run(notion_cli.run_sync(args))
+    else:
+        findy_cli.validate_arguments(parser, args)
+        asyncio.run(findy_cli.run_batch(args) if args.command == 'analyze' else findy_cli.run_scrape(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+import json
+import time
+from datetime import datetime
+
+# ローカルのファイルだけを読むため、Playwright・OpenAI・notion-client は読み込まない
+from findy_scraper.core import settings
+from findy_scraper.infrastructure import cache_manager
+from notion_updater.infrastructure import page_index, schema_cache
+
+def _read_json(path: str) -> dict | None:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def _format_size(size_bytes: int) -> str:
+    return f"{size_bytes / (1024 * 1024):.1f} MB" if size_bytes >= 1024 * 1024 else f"{size_bytes / 1024:.1f} KB"
+
+def _format_age(timestamp: float) -> str:
+    hours = (time.time() - timestamp) / 3600
+    return f"{hours * 60:.0f}分前" if hours < 1 else f"{hours:.1f}時間前"
+
+def collect_status() -> dict:
+    """キャッシュ・直近の実行レポート・ログインセッション・Notionの同期状態をまとめる (外部サービスには接続しない)"""
+    cache_format = cache_manager.cache_format()
+    cache_path = cache_manager.cache_file_path(cache_format)
+    # 解析の実行中でも追記を失わせないよう、キャッシュを書き換えずに選定に使う項目だけを読む
+    summaries = []
+    if os.path.isfile(cache_path):
+        try:
+            summaries = list(cache_manager.iter_cache_summaries())
+        except Exception:
+            summaries = []
+    status = {
+        "cache": {
+            "format": cache_format,
+            "path": cache_path,
+            "size_bytes": os.path.getsize(cache_path) if os.path.isfile(cache_path) else None,
+            "entries": len(summaries),
+            "errors": sum(1 for summary in summaries if summary.get("エラー")),
+            "without_content_hash": sum(1 for summary in summaries if not summary.get(cache_manager.CONTENT_HASH_KEY)),
+        },
+        "report": _read_json(settings.DEFAULT_REPORT_FILE),
+        "session_saved_at": os.path.getmtime(settings.STORAGE_STATE_FILE) if os.path.isfile(settings.STORAGE_STATE_FILE) else None,
+    }
+
+    index = _read_json(page_index.PAGE_INDEX_FILE)
+    database_id = os.getenv('NOTION_DATABASE_ID')
+    status["notion_page_index"] = None if index is None else {
+        "pages": len(index.get("pages", {})),
+        "synced_at": index.get("synced_at"),
+        "same_database": database_id is None or index.get("database_id") == database_id,
+    }
+    schema = _read_json(schema_cache.SCHEMA_CACHE_FILE)
+    status["notion_schema_cache"] = None if schema is None else {
+        "checked_at": schema.get("checked_at"),
+        "valid": bool(database_id) and schema_cache.load_cached_schema(database_id) is not None,
+    }
+    return status
+
+def print_status():
+    """collect_status の内容を表示する"""
+    status = collect_status()
+
+    cache = status["cache"]
+    if cache["size_bytes"] is None:
+        print(f"解析結果キャッシュ: {cache['path']} ({cache['format']}) はまだありません。")
+    else:
+        print(f"解析結果キャッシュ: {cache['path']} ({cache['format']}, {_format_size(cache['size_bytes'])})")
+        print(f"  解析済み {cache['entries']} 件 (エラー {cache['errors']} 件, コンテンツハッシュ未記録 {cache['without_content_hash']} 件)")
+
+    report = status["report"]
+    if report:
+        jobs = ", ".join(f"{key} {value}" for key, value in report.get("jobs", {}).items()) or "なし"
+        print(f"直近の実行: {report.get('started_at')} ({report.get('elapsed_sec', 0):.1f}秒, {report.get('jobs_per_minute', 0)} 件/分, {jobs})")
+    else:
+        print(f"直近の実行: 実行レポート {settings.DEFAULT_REPORT_FILE} がありません。")
+
+    if status["session_saved_at"]:
+        saved_at = datetime.fromtimestamp(status["session_saved_at"]).isoformat(timespec='seconds')
+        print(f"ログインセッション: 保存済み ({saved_at})")
+    else:
+        print("ログインセッション: 未保存")
+
+    index = status["notion_page_index"]
+    if index:
+        note = "" if index["same_database"] else " ※NOTION_DATABASE_ID と異なるデータベースのもの"
+        print(f"Notionページインデックス: {index['pages']} 件 (最終同期 {index['synced_at']}){note}")
+    else:
+        print("Notionページインデックス: 未作成 (次回の sync で全件取得します)")
+
+    schema = status["notion_schema_cache"]
+    if schema:
+        state = "有効" if schema["valid"] else "無効 (次回の sync で確認し直します)"
+        print(f"Notionスキーマキャッシュ: {state}, {_format_age(schema.get('checked_at') or 0)}に確認")
+    else:
+        print("Notionスキーマキャッシュ: 未作成")
@@ -1,101 +1,160 @@
+import asyncio
 import logging
-import os
+from collections import Counter, defaultdict
+from datetime import datetime
 from notion_client import AsyncClient
 
 # 相対インポートに変更
-from notion_updater.infrastructure import file_handler, notion_api
+from notion_updater.infrastructure import file_handler, notion_api, page_index, schema_cache
 from notion_updater.core import notion_formatter, models
+from notion_updater.core.settings import DEFAULT_UPSERT_WORKERS
 
-async def run(client: AsyncClient, database_id: str):
-    """Notion Updater のメイン処理を実行する"""
-    # 1. データベーススキーマの確認と自動更新
-    db_properties = await notion_api.ensure_database_schema(client, database_id)
+async def run(client: AsyncClient, database_id: str, full_resync: bool = False, workers: int = DEFAULT_UPSERT_WORKERS,
+              recheck_schema: bool = False):
+    """Notion Updater のメイン処理を実行する
+
+    full_resync が True の場合はローカルのページインデックスを使わず、データベース全体を取得し直す。
+    workers 個のワーカーが求人を並行に反映する (全リクエストは共有のレートリミッタを通る)。
+    確認済みのスキーマはキャッシュし、有効期限内は確認を省略する (recheck_schema が True なら必ず確認する)。
+    """
+    # 1. データベーススキーマの確認と自動更新 (キャッシュがあれば省略)
+    db_properties, schema_from_cache = await schema_cache.load_database_schema(client, database_id, recheck=recheck_schema)
     if db_properties is None:
          logging.error("データベーススキーマの準備に失敗しました。処理を中断します。")
          return
     logging.info("データベーススキーマの準備が完了しました。")
 
-    # 2. JSONファイル読み込み
+    # 2. 求人データの読み込み (1件ずつ読み出すイテレータ。全件はメモリに保持しない)
     all_job_data = file_handler.load_job_data()
     if all_job_data is None:
         logging.error("求人データの読み込みに失敗しました。処理を中断します。")
         return
 
-    # 3. Notionから既存URLとページID取得
+    # 3. Notionから既存URLとページID、現在のプロパティ値を取得
+    # (ローカルのページインデックスがあれば、前回以降に編集されたページだけを取得する)
     url_property_name = "URL"
-    existing_pages_map = await notion_api.get_existing_notion_pages(client, database_id, url_property_name)
+    schema_fingerprint = page_index.compute_schema_fingerprint(db_properties)
+    existing_pages_map, synced_at = await page_index.load_existing_pages(
+        client, database_id, url_property_name, schema_fingerprint, full_resync=full_resync
+    )
 
     if existing_pages_map is None:
         logging.error("既存ページ情報の取得に失敗したため、処理を中断します。")
         return
 
-    # 4. 差分をNotionに追加または更新
-    new_jobs_count = 0
-    updated_jobs_count = 0
-    failed_jobs_count = 0
-    skipped_due_to_error_count = 0
-    skipped_due_to_invalid_url = 0
+    # 4. 差分をNotionに追加または更新 (全リクエストはレートリミッタを通るため、並行に投げてよい)
+    # スキーマから変換手順を1回だけ組み立て、全求人で使い回す
+    property_plan = notion_formatter.compile_property_plan(db_properties)
+    title_prop_name = property_plan.title_prop_name
+    today = datetime.now().strftime('%Y-%m-%d')
+    # 同じURLの求人が複数あっても、存在確認から作成までを1件ずつ行い、ページを重複して作らない
+    url_locks = defaultdict(asyncio.Lock)
 
-    logging.info("--- Notionへのデータ反映処理開始 ---")
-    for job_data in all_job_data:
+    async def upsert_job(job_data: dict) -> str:
+        """1件の求人をNotionに反映し、結果の種別を返す"""
         # LLM解析時のエラーチェック
         if job_data.get("エラー"):
              logging.info(f"  情報: LLM解析エラーが含まれるためスキップ: {job_data.get('元リンク', 'リンク不明')} ({job_data.get('エラー')})")
-             skipped_due_to_error_count += 1
-             continue
+             return "skipped_error"
 
         # URLの取得と検証 (URLキーを優先、なければ元リンク)
         job_url = job_data.get('URL') or job_data.get('元リンク')
         if not job_url or not isinstance(job_url, str) or not job_url.startswith('http'):
              logging.warning(f"  警告: 無効なURLまたはURLが見つからないためスキップ: {job_data.get('会社名', '会社名不明')} (URL: {job_url})")
-             skipped_due_to_invalid_url += 1
-             continue
+             return "skipped_invalid_url"
+
+        async with url_locks[job_url]:
+            return await upsert_job_url(job_data, job_url)
 
+    async def upsert_job_url(job_data: dict, job_url: str) -> str:
         # 既存ページに含まれているかチェック
         if job_url in existing_pages_map:
-             # --- 更新処理 ---
-             page_id = existing_pages_map[job_url]
-             notion_properties = notion_formatter.convert_to_notion_properties(job_data, db_properties)
+             # --- 更新処理 (Notion上の現在値と異なるプロパティだけを送る) ---
+             existing_page = existing_pages_map[job_url]
+             page_id = existing_page["id"]
+             notion_properties = property_plan.convert(job_data, today)
 
              # 更新に必要なプロパティがあるかチェック (Titleは更新対象外でもOK)
              if not notion_properties:
                   logging.warning(f"  URL: {job_url} (Page ID: {page_id}) - 更新するプロパティがありません。スキップします。")
-                  continue
+                  return "skipped_empty"
+
+             changed_properties = notion_formatter.diff_notion_properties(
+                 notion_properties, existing_page["properties"], models.MANUAL_UPDATE_EXCLUDE_PROPS
+             )
+             if not changed_properties:
+                  logging.debug(f"  変更なしのためスキップ: {job_url}")
+                  return "unchanged"
 
-             success = await notion_api.update_notion_page(client, page_id, notion_properties, models.MANUAL_UPDATE_EXCLUDE_PROPS)
-             if success:
-                  updated_jobs_count += 1
-             else:
-                  failed_jobs_count += 1
+             logging.info(f"  変更のあるプロパティ ({len(changed_properties)} 件): {', '.join(changed_properties)} ({job_url})")
+             # 実際に変更がある場合のみ最終更新日時も更新する
+             if "最終更新日時" in notion_properties:
+                  changed_properties["最終更新日時"] = notion_properties["最終更新日時"]
+             success = await notion_api.update_notion_page(client, page_id, changed_properties, models.MANUAL_UPDATE_EXCLUDE_PROPS)
+             if success is None:
+                  # Notion側で削除・アーカイブされたページはインデックスから外し、新しく作成し直す
+                  logging.info(f"  インデックスから外して新規作成します: {job_url} (旧Page ID: {page_id})")
+                  existing_pages_map.pop(job_url, None)
+                  return await create_job_page(notion_properties, job_url)
+             if not success:
+                  return "failed"
+             # ローカルインデックスの値も更新後の状態に合わせる
+             existing_page["properties"].update(
+                 {name: notion_formatter.normalize_property_value(value) for name, value in changed_properties.items()}
+             )
+             return "updated"
         else:
              # --- 新規作成処理 ---
-             notion_properties = notion_formatter.convert_to_notion_properties(job_data, db_properties)
-
-             # 必須プロパティ(Title, URL)の最終チェック
-             title_prop_name = next((k for k, v in db_properties.items() if v['type'] == 'title'), None)
-             if not title_prop_name or title_prop_name not in notion_properties:
-                  logging.error(f"  致命的エラー: 必須プロパティ '{title_prop_name}' が最終データに含まれていません。スキップ: {job_url}")
-                  failed_jobs_count += 1
-                  continue
-             if url_property_name not in notion_properties:
-                  logging.error(f"  致命的エラー: 必須プロパティ '{url_property_name}' が最終データに含まれていません。スキップ: {job_url}")
-                  failed_jobs_count += 1
-                  continue
-
-             success = await notion_api.create_notion_page(client, database_id, notion_properties)
-             if success:
-                 new_jobs_count += 1
-             else:
-                 failed_jobs_count += 1
-        # else:
-        #      logging.debug(f"  情報: 既存のためスキップ: {job_url}") # この分岐は到達しないはず
-
-    logging.info("--- Notionへのデータ反映処理完了 ---")
-    logging.info(f"新規追加成功: {new_jobs_count} 件")
-    logging.info(f"更新成功: {updated_jobs_count} 件")
-    if failed_jobs_count > 0:
-         logging.warning(f"追加/更新失敗: {failed_jobs_count} 件")
-    if skipped_due_to_error_count > 0:
-         logging.info(f"LLM解析エラーのためスキップ: {skipped_due_to_error_count} 件")
-    if skipped_due_to_invalid_url > 0:
-         logging.info(f"無効なURLのためスキップ: {skipped_due_to_invalid_url} 件") 
\ No newline at end of file
+             return await create_job_page(property_plan.convert(job_data, today), job_url)
+
+    async def create_job_page(notion_properties: dict, job_url: str) -> str:
+        # 必須プロパティ(Title, URL)の最終チェック
+        if not title_prop_name or title_prop_name not in notion_properties:
+             logging.error(f"  致命的エラー: 必須プロパティ '{title_prop_name}' が最終データに含まれていません。スキップ: {job_url}")
+             return "failed"
+        if url_property_name not in notion_properties:
+             logging.error(f"  致命的エラー: 必須プロパティ '{url_property_name}' が最終データに含まれていません。スキップ: {job_url}")
+             return "failed"
+
+        page_id = await notion_api.create_notion_page(client, database_id, notion_properties, url_property_name)
+        if not page_id:
+             return "failed"
+        existing_pages_map[job_url] = {
+            "id": page_id,
+            "last_edited_time": None,
+            "properties": {name: notion_formatter.normalize_property_value(value) for name, value in notion_properties.items()},
+        }
+        return "created"
+
+    # 全ワーカーで1つのイテレータから求人を取り出す (取り出しは同期処理なので重複しない)
+    pending_jobs = iter(all_job_data)
+
+    async def upsert_worker() -> Counter:
+        # 結果はワーカーごとに数え、最後に合算する
+        outcomes = Counter()
+        for job_data in pending_jobs:
+            try:
+                outcomes[await upsert_job(job_data)] += 1
+            except Exception as e:
+                logging.error(f"  求人の反映中に予期せぬエラーが発生しました ({job_data.get('元リンク', 'リンク不明')}): {e}")
+                outcomes['failed'] += 1
+        return outcomes
+
+    worker_count = max(1, workers)
+    logging.info(f"--- Notionへのデータ反映処理開始 (ワーカー {worker_count} 個) ---")
+    outcomes = sum(await asyncio.gather(*(upsert_worker() for _ in range(worker_count))), Counter())
+
+    logging.info(f"--- Notionへのデータ反映処理完了 ({sum(outcomes.values())} 件) ---")
+    page_index.save_page_index(database_id, schema_fingerprint, synced_at, existing_pages_map)
+    logging.info(f"新規追加成功: {outcomes['created']} 件")
+    logging.info(f"更新成功 (変更のあったプロパティのみ): {outcomes['updated']} 件")
+    logging.info(f"変更なしのため更新不要: {outcomes['unchanged']} 件")
+    if outcomes['failed'] > 0:
+         logging.warning(f"追加/更新失敗: {outcomes['failed']} 件")
+         # Notion側でプロパティが変更された可能性があるため、次回はスキーマを確認し直す
+         if schema_from_cache:
+              schema_cache.invalidate_schema_cache()
+    if outcomes['skipped_error'] > 0:
+         logging.info(f"LLM解析エラーのためスキップ: {outcomes['skipped_error']} 件")
+    if outcomes['skipped_invalid_url'] > 0:
+         logging.info(f"無効なURLのためスキップ: {outcomes['skipped_invalid_url']} 件")
@@ -1,18 +1,60 @@
 import os
 import asyncio
+import argparse
 import logging
 from dotenv import load_dotenv
-from notion_client import AsyncClient
 
-# 相対インポートに変更
-from notion_updater.application import main_logic
+# notion-client を読み込むモジュール (application 以下、notion_api) は、反映を実行するときに読み込む
+from notion_updater.core import settings
 
 # ロギング設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-async def main():
-    # 環境変数を読み込む
-    load_dotenv()
+def add_sync_arguments(parser: argparse.ArgumentParser):
+    """Notionデータベースへの反映に関するオプション"""
+    parser.add_argument(
+        '--rate-limit',
+        type=float,
+        default=settings.DEFAULT_RATE_PER_SEC,
+        help=f'Notion APIへの平均リクエスト数/秒 (デフォルト: {settings.DEFAULT_RATE_PER_SEC})。'
+    )
+    parser.add_argument(
+        '--burst',
+        type=int,
+        default=settings.DEFAULT_BURST,
+        help=f'短時間にまとめて送れるリクエスト数 (デフォルト: {settings.DEFAULT_BURST})。'
+    )
+    parser.add_argument(
+        '--full-resync',
+        action='store_true',
+        help='ローカルのページインデックスを使わず、Notionデータベースの全ページを取得し直します。'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=settings.DEFAULT_UPSERT_WORKERS,
+        help=f'求人を並行に反映するワーカー数 (デフォルト: {settings.DEFAULT_UPSERT_WORKERS})。リクエストのレートは --rate-limit で制御されます。'
+    )
+    parser.add_argument(
+        '--recheck-schema',
+        action='store_true',
+        help='キャッシュ済みのデータベーススキーマを使わず、Notionのスキーマを確認・更新し直します。'
+    )
+
+def validate_sync_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    if args.rate_limit <= 0 or args.burst < 1:
+        parser.error('--rate-limit は0より大きく、--burst は1以上の値を指定してください。')
+    if args.workers < 1:
+        parser.error('--workers は1以上の値を指定してください。')
+
+async def run_sync(args: argparse.Namespace):
+    """解析済みの求人データをNotionデータベースに反映する"""
+    from notion_client import AsyncClient
+    from notion_updater.application import main_logic
+    from notion_updater.infrastructure import notion_api
+
+    notion_api.configure_rate_limiter(args.rate_limit, args.burst)
+
     NOTION_API_KEY = os.getenv('NOTION_API_KEY')
     NOTION_DATABASE_ID = os.getenv('NOTION_DATABASE_ID')
 
@@ -21,8 +63,22 @@ async def main():
         return
 
     # Notionクライアント初期化
-    async with AsyncClient(auth=NOTION_API_KEY, timeout_ms=60000, log_level=logging.WARNING) as client: # タイムアウト延長、ログレベル調整
-        await main_logic.run(client, NOTION_DATABASE_ID)
+    # 接続先は環境変数 NOTION_BASE_URL で差し替えられる (ベンチマーク用のローカルサーバーなど)
+    notion_base_url = os.getenv('NOTION_BASE_URL', 'https://api.notion.com')
+    async with AsyncClient(auth=NOTION_API_KEY, base_url=notion_base_url, timeout_ms=60000, log_level=logging.WARNING) as client: # タイムアウト延長、ログレベル調整
+        await main_logic.run(client, NOTION_DATABASE_ID, full_resync=args.full_resync, workers=args.workers,
+                             recheck_schema=args.recheck_schema)
+
+async def main():
+    # 環境変数を読み込む
+    load_dotenv()
+
+    # コマンドライン引数の設定
+    parser = argparse.ArgumentParser(description='解析済みの求人データをNotionデータベースに登録・更新します。')
+    add_sync_arguments(parser)
+    args = parser.parse_args()
+    validate_sync_arguments(parser, args)
+    await run_sync(args)
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
@@ -2,99 +2,180 @@ import logging
 from datetime import datetime
 from .models import PROPERTY_MAP
 
+# --- プロパティの型ごとの値のフォーマット (値が設定できない場合は None) ---
+
+def _format_text(value):
+    return [{"type": "text", "text": {"content": str(value)[:2000]}}]
+
+def _format_number(value):
+    if isinstance(value, str):
+        # 数字、小数点、マイナス記号以外を除去してから変換 (より頑健に)
+        cleaned_value = ''.join(filter(lambda x: x.isdigit() or x == '.' or (x == '-' and value.startswith('-')), value))
+        return float(cleaned_value) if cleaned_value else None
+    if isinstance(value, (int, float)):
+        return float(value)
+    raise ValueError("Invalid number format")
+
+def _format_url(value):
+    # 簡易的なURL形式チェック
+    return value if isinstance(value, str) and value.startswith('http') and len(value) < 2001 else None
+
+def _format_select(value):
+    # Select/Multi-selectのoption名は100文字制限
+    return {"name": str(value)[:100]} if value else None
+
+def _format_multi_select(value):
+    if isinstance(value, list):
+        return [{"name": str(v)[:100]} for v in value if v is not None]
+    if isinstance(value, str):
+        return [{"name": v.strip()[:100]} for v in value.split(',') if v.strip()]
+    # Multi-select は空リストでも有効
+    return []
+
+def _format_date(value):
+    # 値は変換時に渡される実行日の日付 (スクリプト実行日の日付のみを設定する)
+    return {"start": value}
+
+def _format_checkbox(value):
+    return bool(value)
+
+_FORMATTERS = {
+    'title': _format_text,
+    'rich_text': _format_text,
+    'number': _format_number,
+    'url': _format_url,
+    'select': _format_select,
+    'multi_select': _format_multi_select,
+    'date': _format_date,
+    'checkbox': _format_checkbox,
+}
+
+# DBスキーマから事前に組み立てた、プロパティごとの変換手順
+class PropertyPlan:
+    """(Notionプロパティ名, JSONのキー, 型, フォーマット関数) のリストで、求人データをNotionプロパティ形式に変換する
+
+    スキーマの参照・型による分岐・Titleプロパティの検索は compile_property_plan で1回だけ行う。
+    """
+    def __init__(self, entries: list[tuple[str, str | None, str, object]], title_prop_name: str | None,
+                 url_prop_name: str = "URL"):
+        self.entries = entries
+        self.title_prop_name = title_prop_name
+        self.url_prop_name = url_prop_name
+
+    def convert(self, job_data: dict, today: str | None = None) -> dict:
+        """1件の求人データを変換する (today は最終更新日時などに設定する日付。省略時は実行日)"""
+        today = today or datetime.now().strftime('%Y-%m-%d')
+        properties = {}
+        for notion_prop, json_key, prop_type, formatter in self.entries:
+            # json_key が None のプロパティ (最終更新日時) はJSONに無くても生成する
+            if json_key is None:
+                value = today
+            elif json_key in job_data:
+                value = job_data[json_key]
+                if value is None or value == "該当なし":
+                    continue # 空の値は設定しない
+                if prop_type == 'date':
+                    value = today
+            else:
+                continue # JSONに対応するキーがなければスキップ
+            try:
+                formatted_value = formatter(value)
+            except Exception as e:
+                logging.warning(f"値のフォーマット中にエラー (プロパティ: {notion_prop}, タイプ: {prop_type}, 値: {value}): {e}")
+                continue
+            if formatted_value is not None:
+                properties[notion_prop] = {prop_type: formatted_value}
+
+        # 必須プロパティ(Title, URL)の存在チェック
+        if self.title_prop_name not in properties:
+            logging.error(f"必須プロパティ '{self.title_prop_name}' が変換後のデータに含まれていません。")
+        if self.url_prop_name not in properties:
+            # URLがないとページを識別できないため、このページの登録は失敗する可能性が高い
+            logging.error(f"必須プロパティ '{self.url_prop_name}' が変換後のデータに含まれていません。")
+        return properties
+
+    def convert_all(self, jobs: list[dict]) -> list[dict]:
+        """求人データのリストをまとめて変換する (日付の計算は1回だけ行う)"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        return [self.convert(job_data, today) for job_data in jobs]
+
+def compile_property_plan(db_properties: dict) -> PropertyPlan:
+    """PROPERTY_MAP とDBスキーマから変換手順を組み立てる (DBに存在しないプロパティはここで除外する)"""
+    entries = []
+    for notion_prop, json_key in PROPERTY_MAP.items():
+        prop_config = db_properties.get(notion_prop)
+        if not prop_config:
+            logging.warning(f"変換対象のプロパティ '{notion_prop}' がDBスキーマに存在しません。スキップします。")
+            continue
+        prop_type = prop_config['type']
+        formatter = _FORMATTERS.get(prop_type)
+        if formatter is None:
+            logging.warning(f"未対応または不明なプロパティタイプ '{prop_type}' (プロパティ: {notion_prop})。rich_textとして扱います。")
+            formatter = _format_text
+        # 最終更新日時は特別扱い (JSONに無くても生成)
+        entries.append((notion_prop, None if notion_prop == "最終更新日時" else json_key, prop_type, formatter))
+    title_prop_name = next((k for k, v in db_properties.items() if v['type'] == 'title'), None)
+    return PropertyPlan(entries, title_prop_name)
+
 # Notionのデータ型に応じて値をフォーマットする関数
 def format_notion_value(key: str, value: any, db_properties: dict):
     prop_config = db_properties.get(key)
     if not prop_config:
         logging.warning(f"プロパティ '{key}' のスキーマ情報が見つかりません。フォーマットをスキップします。")
         return None
-
-    prop_type = prop_config['type']
-
     if value is None or value == "該当なし":
         return None # 空の値は設定しない
-
+    prop_type = prop_config['type']
+    if prop_type == 'date':
+        value = datetime.now().strftime('%Y-%m-%d')
     try:
-        if prop_type == 'title':
-            return [{"type": "text", "text": {"content": str(value)[:2000]}}]
-        elif prop_type == 'rich_text':
-            return [{"type": "text", "text": {"content": str(value)[:2000]}}]
-        elif prop_type == 'number':
-            if isinstance(value, str):
-                 # 数字、小数点、マイナス記号以外を除去してから変換 (より頑健に)
-                 cleaned_value = ''.join(filter(lambda x: x.isdigit() or x == '.' or (x == '-' and value.startswith('-')), str(value)))
-                 if not cleaned_value: return None
-                 return float(cleaned_value)
-            elif isinstance(value, (int, float)):
-                 return float(value)
-            else:
-                 raise ValueError("Invalid number format")
-        elif prop_type == 'url':
-            # 簡易的なURL形式チェック
-            return str(value) if isinstance(value, str) and value.startswith('http') and len(value) < 2001 else None
-        elif prop_type == 'select':
-            # Select/Multi-selectのoption名は100文字制限
-            return {"name": str(value)[:100]} if value else None
-        elif prop_type == 'multi_select':
-            options = []
-            if isinstance(value, list):
-                options = [{"name": str(v)[:100]} for v in value if v is not None]
-            elif isinstance(value, str):
-                 options = [{"name": v.strip()[:100]} for v in value.split(',') if v.strip()]
-            # Multi-select は空リストでも有効
-            return options
-        elif prop_type == 'date':
-             # スクリプト実行日の日付のみを設定
-             return {"start": datetime.now().strftime('%Y-%m-%d')}
-        elif prop_type == 'checkbox':
-             return bool(value)
-        else:
-            logging.warning(f"未対応または不明なプロパティタイプ '{prop_type}' (プロパティ: {key})。rich_textとして扱います。")
-            return [{"type": "text", "text": {"content": str(value)[:2000]}}]
+        return _FORMATTERS.get(prop_type, _format_text)(value)
     except Exception as e:
         logging.warning(f"値のフォーマット中にエラー (プロパティ: {key}, タイプ: {prop_type}, 値: {value}): {e}")
         return None
 
 # JSONデータをNotionプロパティ形式に変換する関数
+# 複数件を変換する場合は compile_property_plan で組み立てた PropertyPlan を使い回す
 def convert_to_notion_properties(job_data: dict, db_properties: dict) -> dict:
-    properties = {}
-    # PROPERTY_MAP のキー (Notionプロパティ名) を基準にループ
-    for notion_prop, json_key in PROPERTY_MAP.items():
-        # 最終更新日時は特別扱い (JSONに無くても生成)
-        if notion_prop == "最終更新日時":
-            value = datetime.now().strftime('%Y-%m-%d')
-        elif json_key in job_data:
-            value = job_data.get(json_key)
-        else:
-            continue # JSONに対応するキーがなければスキップ
-
-        # Notion DBにプロパティが存在するか再確認
-        if notion_prop not in db_properties:
-            logging.warning(f"変換対象のプロパティ '{notion_prop}' がDBスキーマに存在しません。スキップします。")
-            continue
+    return compile_property_plan(db_properties).convert(job_data)
 
-        formatted_value = format_notion_value(notion_prop, value, db_properties)
-
-        if formatted_value is not None:
-            prop_type = db_properties[notion_prop]['type']
-            # Date型はキーが異なる
-            if prop_type == 'date':
-                 properties[notion_prop] = {"date": formatted_value}
-            else:
-                properties[notion_prop] = {prop_type: formatted_value}
-        # else: # フォーマット結果がNoneの場合は何も設定しない
-        #     logging.debug(f"プロパティ '{notion_prop}' の値がNoneのため設定しません。元値: {value}")
+# Notionプロパティ値を比較用の単純な値に正規化する関数
+# 送信用の形式 ({"rich_text": [...]}) とAPIが返す形式 ({"id": ..., "type": "rich_text", "rich_text": [...]}) のどちらも扱う
+def normalize_property_value(prop_value: dict):
+    if not isinstance(prop_value, dict):
+        return None
+    prop_type = prop_value.get('type') or next((k for k in prop_value if k != 'id'), None)
+    value = prop_value.get(prop_type)
 
-    # 必須プロパティ(Title, URL)の存在チェックを追加
-    title_prop_name = next((k for k, v in db_properties.items() if v['type'] == 'title'), None)
-    url_prop_name = "URL" # 固定
+    if prop_type in ('title', 'rich_text'):
+        # APIの応答には plain_text があり、送信用には text.content しかない
+        return "".join(
+            item.get('plain_text') or (item.get('text') or {}).get('content', '')
+            for item in (value or [])
+        )
+    elif prop_type == 'number':
+        return float(value) if value is not None else None
+    elif prop_type == 'select':
+        return value.get('name') if value else None
+    elif prop_type == 'multi_select':
+        # 並び順の違いは変更とみなさない (JSONに保存しても比較できるようリストで返す)
+        return sorted(option.get('name', '') for option in (value or []))
+    elif prop_type == 'date':
+        return value.get('start') if value else None
+    else:
+        # url, checkbox など値がそのまま入っている型
+        return value
 
-    if title_prop_name not in properties:
-        logging.error(f"必須プロパティ '{title_prop_name}' が変換後のデータに含まれていません。")
-        # 必要であれば空のタイトルを設定するなどのフォールバック処理
-        # properties[title_prop_name] = {"title": [{"type": "text", "text": {"content": "タイトル不明"}}]}
-    if url_prop_name not in properties:
-        logging.error(f"必須プロパティ '{url_prop_name}' が変換後のデータに含まれていません。")
-        # URLがないとページを識別できないため、このページの登録は失敗する可能性が高い
+# 変換後のプロパティのうち、Notion上の現在値と異なるものだけを返す関数
+def diff_notion_properties(new_properties: dict, current_values: dict, exclude_props: set) -> dict:
+    """current_values は {プロパティ名: normalize_property_value() の結果}
 
-    return properties 
\ No newline at end of file
+    最終更新日時はスクリプトが毎回設定する値なので比較対象外とし、手動入力項目 (exclude_props) も除く。
+    """
+    changed = {}
+    for prop_name, prop_value in new_properties.items():
+        if prop_name == "最終更新日時" or prop_name in exclude_props:
+            continue
+        if normalize_property_value(prop_value) != current_values.get(prop_name):
+            changed[prop_name] = prop_value
+    return changed
@@ -0,0 +1,8 @@
+# CLIの既定値など、notion-client を読み込まずに参照できる設定値
+
+# Notion APIの平均レート上限は 3リクエスト/秒 (短時間のバーストは許容される)
+DEFAULT_RATE_PER_SEC = 3.0
+DEFAULT_BURST = 4
+
+# 求人をNotionに反映するワーカー数 (実際のリクエスト数はレートリミッタで制御される)
+DEFAULT_UPSERT_WORKERS = 4
@@ -1,27 +1,22 @@
 import json
 import logging
-import os # osモジュールをインポート
 
-# キャッシュディレクトリとファイル名を定義
-CACHE_DIR = ".cache"
-CACHE_FILE_NAME = "analyzed_findy_jobs.json"
-CACHE_FILE = os.path.join(CACHE_DIR, CACHE_FILE_NAME) # 正しいパスを生成
+# キャッシュの形式・場所は findy_scraper 側と共通 (読むだけでファイルは書き換えない。重複行の圧縮は取得・解析の側で行う)
+from findy_scraper.infrastructure.cache_manager import cache_file_path, iter_cache_entries
 
-def load_job_data() -> list[dict] | None:
-    """JSONファイルから求人データを読み込む"""
+def load_job_data():
+    """キャッシュファイルの求人データを1件ずつ返すイテレータ (全件をメモリに読み込まない)。読み込めない場合は None"""
+    cache_path = cache_file_path()
     try:
-        # 修正: 正しいCACHE_FILEパスを使用
-        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-            all_job_data = json.load(f)
-        logging.info(f"{CACHE_FILE} から {len(all_job_data)} 件の求人データを読み込みました。")
+        all_job_data = iter_cache_entries()
+        logging.info(f"{cache_path} から求人データを順に読み込みます。")
         return all_job_data
     except FileNotFoundError:
-        # 修正: エラーメッセージも正しいファイルパスを表示するように
-        logging.error(f"{CACHE_FILE} が見つかりません。先に findy_scraper/cli.py を実行してください。")
+        logging.error(f"{cache_path} が見つかりません。先に findy_scraper/cli.py を実行してください。")
         return None
     except json.JSONDecodeError:
-        logging.error(f"{CACHE_FILE} のJSON形式が正しくありません。")
+        logging.error(f"{cache_path} のJSON形式が正しくありません。")
         return None
     except Exception as e:
         logging.error(f"ファイル読み込み中にエラーが発生しました: {e}")
-        return None 
\ No newline at end of file
+        return None
@@ -1,15 +1,29 @@
 import logging
 import json
-import asyncio
 from notion_client import AsyncClient, APIResponseError, APIErrorCode
 from notion_updater.core.models import DESIRED_PROPERTIES_SCHEMA # 相対インポートに変更
+from notion_updater.core.notion_formatter import normalize_property_value
+from notion_updater.infrastructure.rate_limiter import TokenBucketRateLimiter, call_with_rate_limit, DEFAULT_RATE_PER_SEC, DEFAULT_BURST
+
+# --- レート制御 ---
+# 全てのNotion API呼び出しはこのリミッタを通す (固定のsleepは行わない)
+_rate_limiter = TokenBucketRateLimiter()
+
+def configure_rate_limiter(rate_per_sec: float = DEFAULT_RATE_PER_SEC, burst: int = DEFAULT_BURST):
+    """Notion APIのリクエストレートを設定する (処理開始前に呼び出す)"""
+    global _rate_limiter
+    _rate_limiter = TokenBucketRateLimiter(rate_per_sec=rate_per_sec, burst=burst)
+    logging.info(f"Notion APIのリクエストレートを {rate_per_sec} req/s (バースト {burst}) に設定しました。")
+
+async def _request(request, before_retry=None, **kwargs):
+    return await call_with_rate_limit(_rate_limiter, request, before_retry=before_retry, **kwargs)
 
 # --- Notionデータベース スキーマ管理 ---
 
 async def ensure_database_schema(client: AsyncClient, database_id: str):
     logging.info(f"データベースID: {database_id} のスキーマを確認・更新します...")
     try:
-        db_info = await client.databases.retrieve(database_id=database_id)
+        db_info = await _request(client.databases.retrieve, database_id=database_id)
         existing_properties = db_info.get("properties", {})
         logging.info(f"既存のプロパティを {len(existing_properties)} 件取得しました。")
         # print(json.dumps(existing_properties, ensure_ascii=False, indent=2)) # デバッグ用
@@ -72,15 +86,14 @@ async def ensure_database_schema(client: AsyncClient, database_id: str):
             logging.info(f"{len(properties_to_update)} 件のプロパティを作成・更新します...")
             # print(json.dumps({"properties": properties_to_update}, indent=2)) # デバッグ用
             try:
-                await client.databases.update(
+                # 更新APIは更新後のデータベース情報を返すため、スキーマを取得し直す必要はない
+                db_info = await _request(
+                    client.databases.update,
                     database_id=database_id,
                     properties=properties_to_update
                 )
-                logging.info("データベーススキーマの更新に成功しました。")
-                # 更新後のスキーマを再取得
-                db_info = await client.databases.retrieve(database_id=database_id)
                 existing_properties = db_info.get("properties", {})
-                logging.info("更新後のスキーマ情報を取得しました。")
+                logging.info("データベーススキーマの更新に成功しました。")
             except APIResponseError as api_error:
                 logging.error(f"データベーススキーマの更新中にAPIエラーが発生しました: {api_error}")
                 logging.error(f"送信したデータ: {json.dumps({'properties': properties_to_update}, indent=2)}")
@@ -107,60 +120,129 @@ async def ensure_database_schema(client: AsyncClient, database_id: str):
         logging.error(f"データベース情報取得中に予期せぬエラーが発生しました: {e}")
         return None
 
-# Notionデータベースから既存の求人URLとページIDを取得する関数
-async def get_existing_notion_pages(client: AsyncClient, database_id: str, url_property_name: str) -> dict[str, str] | None:
+# データベースのクエリ結果を、ページ送りしながら1件ずつ返す (APIエラーは呼び出し側で処理する)
+async def _query_database_pages(client: AsyncClient, database_id: str, query_filter: dict):
+    has_more = True
+    next_cursor = None
+    page_count = 0
+    while has_more:
+        response = await _request(
+            client.databases.query,
+            database_id=database_id,
+            filter=query_filter,
+            page_size=100,
+            start_cursor=next_cursor
+        )
+        results = response.get('results', [])
+        page_count += len(results)
+        for page in results:
+            yield page
+
+        has_more = response.get('has_more', False)
+        next_cursor = response.get('next_cursor')
+        if has_more:
+             logging.info(f"  ... 現在ページ {page_count} 件取得済み、次のページを取得中 ...")
+
+def _page_entry(page: dict) -> dict:
+    """クエリ結果のページを、ローカルで保持するページ情報にする"""
+    return {
+        "id": page.get('id'),
+        "last_edited_time": page.get('last_edited_time'),
+        "properties": {
+            name: normalize_property_value(value)
+            for name, value in page.get('properties', {}).items()
+        },
+    }
+
+def _log_query_error(e: Exception, url_property_name: str):
+    if isinstance(e, APIResponseError):
+        # URLプロパティが見つからない場合のエラーハンドリングを追加
+        if e.code == APIErrorCode.ValidationError and f'property "{url_property_name}" does not exist' in str(e.body):
+             logging.error(f"データベースに '{url_property_name}' という名前のURLプロパティが見つかりません。スキーマ自動更新が正しく機能したか確認してください。")
+        else:
+             logging.error(f"NotionデータベースからのURL取得中にAPIエラーが発生しました: {e}")
+    else:
+        logging.error(f"NotionデータベースからのURL取得中に予期せぬエラーが発生しました: {e}")
+
+# Notionデータベースから既存の求人URLとページID・現在のプロパティ値を取得する関数
+# 戻り値: {URL: {"id": ページID, "last_edited_time": 最終編集日時, "properties": {プロパティ名: 正規化した値}}}
+async def get_existing_notion_pages(client: AsyncClient, database_id: str, url_property_name: str) -> dict[str, dict] | None:
     existing_pages = {}
-    logging.info("Notionデータベースから既存の求人ページ (URL->ID) を取得中...")
+    logging.info("Notionデータベースから既存の求人ページ (URL->ID, プロパティ値) を取得中...")
     if not url_property_name:
          logging.error("URLプロパティ名が指定されていません。")
          return None
 
+    # 指定されたURLプロパティが存在するものだけを対象
+    query_filter = {
+        "property": url_property_name,
+        "url": {
+            "is_not_empty": True
+        }
+    }
     try:
-        has_more = True
-        next_cursor = None
-        page_count = 0
-        while has_more:
-            response = await client.databases.query(
-                database_id=database_id,
-                filter={ # 指定されたURLプロパティが存在するものだけを対象
-                    "property": url_property_name,
-                    "url": {
-                        "is_not_empty": True
-                    }
-                },
-                page_size=100,
-                start_cursor=next_cursor
-            )
-            results = response.get('results', [])
-            page_count += len(results)
-            for page in results:
-                url_prop = page.get('properties', {}).get(url_property_name, {})
-                if url_prop and url_prop.get('url'):
-                    page_id = page.get('id')
-                    if page_id:
-                         existing_pages[url_prop['url']] = page_id
-
-            has_more = response.get('has_more', False)
-            next_cursor = response.get('next_cursor')
-            if has_more:
-                 logging.info(f"  ... {len(existing_pages)} 件取得済み (現在ページ {page_count} 件)、次のページを取得中 ...")
-                 await asyncio.sleep(0.35) # Rate limit対策 (少し長めに)
-
+        async for page in _query_database_pages(client, database_id, query_filter):
+            url_prop = page.get('properties', {}).get(url_property_name, {})
+            if url_prop and url_prop.get('url') and page.get('id'):
+                existing_pages[url_prop['url']] = _page_entry(page)
         logging.info(f"既存のページ情報を {len(existing_pages)} 件取得しました。")
         return existing_pages
-    except APIResponseError as e:
-        # URLプロパティが見つからない場合のエラーハンドリングを追加
-        if e.code == APIErrorCode.ValidationFailed and f'property "{url_property_name}" does not exist' in str(e.body):
-             logging.error(f"データベースに '{url_property_name}' という名前のURLプロパティが見つかりません。スキーマ自動更新が正しく機能したか確認してください。")
-        else:
-             logging.error(f"NotionデータベースからのURL取得中にAPIエラーが発生しました: {e}")
+    except Exception as e:
+        _log_query_error(e, url_property_name)
         return None
+
+# edited_since (ISO 8601) 以降に編集されたページを取得する関数 (ローカルのページインデックスの差分更新用)
+# 戻り値: (get_existing_notion_pages と同じ形式の辞書, インデックスから外すページIDの集合)
+# URLが空になったページも取得し、アーカイブ・ゴミ箱に入ったページとともに外す対象にする
+async def get_edited_notion_pages(client: AsyncClient, database_id: str, url_property_name: str,
+                                  edited_since: str) -> tuple[dict[str, dict], set[str]] | None:
+    edited_pages = {}
+    removed_page_ids = set()
+    logging.info(f"Notionデータベースから {edited_since} 以降に編集された求人ページを取得中...")
+    if not url_property_name:
+         logging.error("URLプロパティ名が指定されていません。")
+         return None
+
+    query_filter = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": edited_since}}
+    try:
+        async for page in _query_database_pages(client, database_id, query_filter):
+            page_id = page.get('id')
+            if not page_id:
+                continue
+            url = (page.get('properties', {}).get(url_property_name) or {}).get('url')
+            if page.get('archived') or page.get('in_trash') or not url:
+                removed_page_ids.add(page_id)
+            else:
+                edited_pages[url] = _page_entry(page)
+        logging.info(f"編集されたページ情報を {len(edited_pages)} 件取得しました (インデックスから外すページ {len(removed_page_ids)} 件)。")
+        return edited_pages, removed_page_ids
     except Exception as e:
-        logging.error(f"NotionデータベースからのURL取得中に予期せぬエラーが発生しました: {e}")
+        _log_query_error(e, url_property_name)
         return None
 
+# URLプロパティが一致するページを1件探す関数 (見つからない・取得に失敗した場合は None)
+async def find_page_by_url(client: AsyncClient, database_id: str, url_property_name: str, url: str) -> dict | None:
+    try:
+        response = await _request(
+            client.databases.query,
+            database_id=database_id,
+            filter={"property": url_property_name, "url": {"equals": url}},
+            page_size=1
+        )
+    except Exception as e:
+        logging.warning(f"  URLによるページの検索に失敗しました ({url}): {e}")
+        return None
+    results = response.get('results', [])
+    return results[0] if results else None
+
 # Notionに新しいページを作成する関数
-async def create_notion_page(client: AsyncClient, database_id: str, properties: dict):
+async def create_notion_page(client: AsyncClient, database_id: str, properties: dict,
+                             url_property_name: str = "URL") -> str | None:
+    """ページを作成し、作成したページIDを返す (失敗時は None)
+
+    5xx やタイムアウトの後は、作成自体は成功している可能性があるため、再送する前にURLでページを検索し、
+    見つかればそのページIDを返す (再試行で同じURLのページが重複して作られないように)。
+    """
     # Titleプロパティ名を取得してログに出力
     title_prop_name = next((k for k, v in properties.items() if 'title' in v), None)
     page_title = "タイトル不明"
@@ -169,13 +251,24 @@ async def create_notion_page(client: AsyncClient, database_id: str, properties:
 
     logging.info(f"  Notionに新規ページ作成中: {page_title}")
     try:
-        await client.pages.create(
+        url = (properties.get(url_property_name) or {}).get('url')
+
+        async def find_created_page():
+            if not url:
+                return None
+            page = await find_page_by_url(client, database_id, url_property_name, url)
+            if page:
+                logging.info(f"  作成済みのページが見つかったため再送しません: {url}")
+            return page
+
+        response = await _request(
+            client.pages.create,
+            before_retry=find_created_page,
             parent={"database_id": database_id},
             properties=properties
         )
         logging.info("  ...作成成功")
-        await asyncio.sleep(0.55) # Rate limit対策 (少し長めに)
-        return True
+        return response.get('id')
     except APIResponseError as e:
         logging.error(f"  Notionページ作成中にAPIエラーが発生しました: {e}")
         logging.error(f"  エラーコード: {e.code}")
@@ -187,13 +280,20 @@ async def create_notion_page(client: AsyncClient, database_id: str, properties:
             logging.error(f"  エラーメッセージ (raw): {e.body}")
         # 失敗したプロパティ内容もログに出力 (長すぎる可能性に注意)
         # logging.error(f"  送信したプロパティ: {json.dumps(properties, ensure_ascii=False, indent=2)}")
-        return False
+        return None
     except Exception as e:
         logging.error(f"  Notionページ作成中に予期せぬエラーが発生しました: {e}")
-        return False
+        return None
+
+def is_page_gone_error(e: APIResponseError) -> bool:
+    """更新しようとしたページが削除・アーカイブ済み (ゴミ箱を含む) であることを示すエラーか"""
+    return e.code == APIErrorCode.ObjectNotFound or (
+        e.code == APIErrorCode.ValidationError and "archived" in str(e.body)
+    )
 
 # Notionの既存ページを更新する関数
-async def update_notion_page(client: AsyncClient, page_id: str, properties: dict, exclude_props: set):
+# 戻り値: 成功 (更新不要を含む) なら True、失敗なら False、ページが削除・アーカイブ済みなら None
+async def update_notion_page(client: AsyncClient, page_id: str, properties: dict, exclude_props: set) -> bool | None:
     # 更新対象プロパティから除外対象を除き、最終更新日時を強制的に含める
     properties_to_update = {
         k: v for k, v in properties.items()
@@ -214,14 +314,17 @@ async def update_notion_page(client: AsyncClient, page_id: str, properties: dict
     # logging.debug(f"  送信するプロパティ: {json.dumps(properties_to_update, ensure_ascii=False, indent=2)}")
 
     try:
-        await client.pages.update(
+        await _request(
+            client.pages.update,
             page_id=page_id,
             properties=properties_to_update
         )
         logging.info("  ...更新成功")
-        await asyncio.sleep(0.55) # Rate limit対策 (少し長めに)
         return True
     except APIResponseError as e:
+        if is_page_gone_error(e):
+            logging.warning(f"  ページが削除またはアーカイブされているため更新できません (Page ID: {page_id}): {e}")
+            return None
         logging.error(f"  Notionページ更新中にAPIエラーが発生しました (Page ID: {page_id}): {e}")
         logging.error(f"  エラーコード: {e.code}")
         try:
@@ -0,0 +1,98 @@
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+# インデックスは求人キャッシュと同じディレクトリに置く
+from findy_scraper.infrastructure.cache_manager import CACHE_DIR
+
+# status コマンドがインデックスを読むときに notion-client を読み込まないよう、APIの呼び出し側は使う時に読み込む
+if TYPE_CHECKING:
+    from notion_client import AsyncClient
+
+# Notionの URL -> ページID -> 最終編集日時 (と比較用のプロパティ値) のローカルインデックス
+PAGE_INDEX_FILE_NAME = "notion_page_index.json"
+PAGE_INDEX_FILE = os.path.join(CACHE_DIR, PAGE_INDEX_FILE_NAME)
+PAGE_INDEX_VERSION = 1
+# Notionの last_edited_time は分単位に丸められるため、差分取得の開始時刻に余裕を持たせる
+INCREMENTAL_MARGIN = timedelta(minutes=5)
+
+def compute_schema_fingerprint(db_properties: dict) -> str:
+    """データベースのプロパティ構成 (名前と型) から、インデックスの有効性判定に使うハッシュ値を計算する"""
+    schema = sorted((name, prop.get('type')) for name, prop in db_properties.items())
+    return hashlib.sha256(json.dumps(schema, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def load_page_index(database_id: str, schema_fingerprint: str) -> dict | None:
+    """保存済みのインデックスを読み込む。存在しない・データベースIDやスキーマが変わった場合は None"""
+    if not os.path.isfile(PAGE_INDEX_FILE):
+        logging.info(f"ページインデックス {PAGE_INDEX_FILE} が見つかりません。全件取得します。")
+        return None
+    try:
+        with open(PAGE_INDEX_FILE, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except Exception as e:
+        logging.warning(f"ページインデックス ({PAGE_INDEX_FILE}) の読み込みに失敗しました。全件取得します: {e}")
+        return None
+
+    if index.get("version") != PAGE_INDEX_VERSION:
+        logging.info("ページインデックスの形式が古いため、全件取得します。")
+        return None
+    if index.get("database_id") != database_id:
+        logging.info("データベースIDが変わったため、ページインデックスを作り直します。")
+        return None
+    if index.get("schema_fingerprint") != schema_fingerprint:
+        logging.info("データベースのスキーマが変わったため、ページインデックスを作り直します。")
+        return None
+    return index
+
+def save_page_index(database_id: str, schema_fingerprint: str, synced_at: str, pages: dict):
+    """インデックスを一時ファイル経由で保存する"""
+    index = {
+        "version": PAGE_INDEX_VERSION,
+        "database_id": database_id,
+        "schema_fingerprint": schema_fingerprint,
+        "synced_at": synced_at,
+        "pages": pages,
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{PAGE_INDEX_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, PAGE_INDEX_FILE)
+        logging.info(f"ページインデックスを {PAGE_INDEX_FILE} に保存しました ({len(pages)} 件)。")
+    except Exception as e:
+        logging.error(f"ページインデックス ({PAGE_INDEX_FILE}) の保存に失敗しました: {e}")
+
+async def load_existing_pages(client: "AsyncClient", database_id: str, url_property_name: str,
+                              schema_fingerprint: str, full_resync: bool = False) -> tuple[dict | None, str]:
+    """既存ページの URL -> ページ情報 の辞書と、今回の同期開始時刻を返す
+
+    有効なインデックスがあれば前回の同期以降に編集されたページだけを取得して反映し、
+    無い場合や full_resync の場合はデータベース全体を取得する。
+    """
+    from notion_updater.infrastructure import notion_api
+
+    synced_at = datetime.now(timezone.utc).isoformat()
+    index = None if full_resync else load_page_index(database_id, schema_fingerprint)
+
+    if index is None:
+        pages = await notion_api.get_existing_notion_pages(client, database_id, url_property_name)
+        return pages, synced_at
+
+    pages = index.get("pages", {})
+    edited_since = (datetime.fromisoformat(index["synced_at"]) - INCREMENTAL_MARGIN).isoformat()
+    edited = await notion_api.get_edited_notion_pages(client, database_id, url_property_name, edited_since)
+    if edited is None:
+        return None, synced_at
+    updated_pages, removed_page_ids = edited
+
+    # URLが書き換えられたページは古いURLのエントリを消してから反映し、
+    # アーカイブ・ゴミ箱に入ったページとURLが空になったページはインデックスから外す
+    stale_ids = {page["id"] for page in updated_pages.values()} | removed_page_ids
+    pages = {url: page for url, page in pages.items() if page["id"] not in stale_ids}
+    pages.update(updated_pages)
+    logging.info(f"ページインデックスを差分更新しました (更新 {len(updated_pages)} 件, 削除 {len(removed_page_ids)} 件, 合計 {len(pages)} 件)。")
+    return pages, synced_at
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import random
+from notion_client import APIResponseError, APIErrorCode
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+# Notion APIの平均レート上限 (DEFAULT_RATE_PER_SEC, DEFAULT_BURST) はCLIからも参照するため settings に置く
+from notion_updater.core.settings import DEFAULT_RATE_PER_SEC, DEFAULT_BURST
+# 429を受けたときに下げられる下限のレート
+MIN_RATE_PER_SEC = 0.5
+# 再試行の回数と、Retry-After が無い場合のバックオフ (秒)
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 30.0
+# 再試行の対象とする一時的なエラーのHTTPステータス
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+# Notion APIの全リクエストが通る非同期トークンバケット
+class TokenBucketRateLimiter:
+    """rate_per_sec の速度でトークンを補充し、最大 burst 個まで溜められるレートリミッタ
+
+    429 (RateLimited) を受けたら Retry-After の間は全リクエストを止め、レートを半分に下げる。
+    その後は成功するたびに少しずつ元のレートへ戻す。
+    """
+    def __init__(self, rate_per_sec: float = DEFAULT_RATE_PER_SEC, burst: int = DEFAULT_BURST):
+        self._max_rate = rate_per_sec
+        self._rate = rate_per_sec
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._last_refill: float | None = None
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def _refill(self, now: float):
+        if self._last_refill is not None:
+            self._tokens = min(self._burst, self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """トークンが1つ得られるまで待つ (待っているリクエストは到着順に処理される)"""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def on_success(self):
+        # 加算的にレートを回復させる
+        if self._rate < self._max_rate:
+            self._rate = min(self._max_rate, self._rate + 0.05)
+
+    def on_rate_limited(self, retry_after: float):
+        # 全リクエストを Retry-After の間止め、レートを半分に下げる
+        loop = asyncio.get_running_loop()
+        self._blocked_until = max(self._blocked_until, loop.time() + retry_after)
+        self._tokens = 0.0
+        self._rate = max(MIN_RATE_PER_SEC, self._rate / 2)
+        logging.warning(f"Notion APIのレート制限に達しました。{retry_after:.1f}秒待機し、レートを {self._rate:.2f} req/s に下げます。")
+
+def _retry_after_seconds(error: HTTPResponseError) -> float | None:
+    headers = getattr(error, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, APIResponseError):
+        return error.code in (APIErrorCode.RateLimited, APIErrorCode.ServiceUnavailable, APIErrorCode.ConflictError)
+    if isinstance(error, HTTPResponseError):
+        return error.status in RETRYABLE_STATUSES
+    return False
+
+def _backoff_seconds(attempt: int) -> float:
+    # 指数バックオフ + フルジッター
+    return random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * (2 ** attempt)))
+
+async def call_with_rate_limit(limiter: TokenBucketRateLimiter, request, *args,
+                               max_retries: int = DEFAULT_MAX_RETRIES, before_retry=None, **kwargs):
+    """limiter でレートを制御しつつ request(*args, **kwargs) を呼び出す
+
+    429 と一時的な 5xx・タイムアウトはジッター付きで再試行し、それ以外のエラーや再試行上限を超えた場合は例外をそのまま送出する。
+    before_retry (引数なしの async 関数) を渡すと、サーバー側で処理された可能性のある失敗 (5xx・タイムアウト) の
+    再試行前に呼び出し、None 以外を返した場合は再試行せずにその値を結果とする (ページ作成の重複防止用)。
+    """
+    attempt = 0
+    while True:
+        await limiter.acquire()
+        try:
+            response = await request(*args, **kwargs)
+            limiter.on_success()
+            return response
+        except (HTTPResponseError, RequestTimeoutError) as e:
+            timed_out = isinstance(e, RequestTimeoutError)
+            if not (timed_out or _is_retryable(e)) or attempt >= max_retries:
+                raise
+            retry_after = None if timed_out else _retry_after_seconds(e)
+            if not timed_out and e.status == 429:
+                # Retry-After に少しジッターを足し、待っていたリクエストが一斉に再送されるのを防ぐ
+                limiter.on_rate_limited((retry_after if retry_after is not None else _backoff_seconds(attempt)) + random.uniform(0, 0.5))
+            else:
+                delay = retry_after if retry_after is not None else _backoff_seconds(attempt)
+                reason = "タイムアウト" if timed_out else f"HTTP {e.status}"
+                logging.warning(f"Notion APIの一時的なエラー ({reason})。{delay:.1f}秒後に再試行します ({attempt + 1}/{max_retries})。")
+                await asyncio.sleep(delay)
+                if before_retry is not None:
+                    result = await before_retry()
+                    if result is not None:
+                        return result
+            attempt += 1
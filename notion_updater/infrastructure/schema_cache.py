@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import TYPE_CHECKING
+
+# キャッシュは求人キャッシュと同じディレクトリに置く
+from findy_scraper.infrastructure.cache_manager import CACHE_DIR
+from notion_updater.core.models import DESIRED_PROPERTIES_SCHEMA
+
+# status コマンドがキャッシュを読むときに notion-client を読み込まないよう、APIの呼び出し側は使う時に読み込む
+if TYPE_CHECKING:
+    from notion_client import AsyncClient
+
+# 確認済みのデータベーススキーマ (ensure_database_schema の結果) のキャッシュ
+SCHEMA_CACHE_FILE_NAME = "notion_schema_cache.json"
+SCHEMA_CACHE_FILE = os.path.join(CACHE_DIR, SCHEMA_CACHE_FILE_NAME)
+SCHEMA_CACHE_VERSION = 1
+# この時間を過ぎたキャッシュは使わず、スキーマを確認し直す (秒)
+SCHEMA_CACHE_TTL_SEC = 24 * 60 * 60
+
+def compute_desired_schema_fingerprint(database_id: str) -> str:
+    """データベースIDと DESIRED_PROPERTIES_SCHEMA から、キャッシュの有効性判定に使うハッシュ値を計算する"""
+    payload = {"database_id": database_id, "schema": DESIRED_PROPERTIES_SCHEMA}
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+def load_cached_schema(database_id: str, ttl_sec: float = SCHEMA_CACHE_TTL_SEC) -> dict | None:
+    """有効なキャッシュがあればデータベースのプロパティ情報を返す。無い・期限切れ・定義が変わった場合は None"""
+    if not os.path.isfile(SCHEMA_CACHE_FILE):
+        return None
+    try:
+        with open(SCHEMA_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except Exception as e:
+        logging.warning(f"スキーマキャッシュ ({SCHEMA_CACHE_FILE}) の読み込みに失敗しました。スキーマを確認し直します: {e}")
+        return None
+
+    if cache.get("version") != SCHEMA_CACHE_VERSION:
+        return None
+    if cache.get("fingerprint") != compute_desired_schema_fingerprint(database_id):
+        logging.info("データベースIDまたはプロパティ定義が変わったため、スキーマを確認し直します。")
+        return None
+    age = time.time() - cache.get("checked_at", 0)
+    if not 0 <= age < ttl_sec:
+        logging.info(f"スキーマキャッシュの有効期限 ({ttl_sec / 3600:.0f}時間) が切れたため、スキーマを確認し直します。")
+        return None
+    return cache.get("properties")
+
+def save_cached_schema(database_id: str, db_properties: dict):
+    """確認済みのプロパティ情報を一時ファイル経由で保存する"""
+    cache = {
+        "version": SCHEMA_CACHE_VERSION,
+        "fingerprint": compute_desired_schema_fingerprint(database_id),
+        "checked_at": time.time(),
+        "properties": db_properties,
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{SCHEMA_CACHE_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_path, SCHEMA_CACHE_FILE)
+        logging.info(f"データベーススキーマを {SCHEMA_CACHE_FILE} にキャッシュしました。")
+    except Exception as e:
+        logging.error(f"スキーマキャッシュ ({SCHEMA_CACHE_FILE}) の保存に失敗しました: {e}")
+
+def invalidate_schema_cache():
+    """次回の実行でスキーマを確認し直すよう、キャッシュを削除する"""
+    try:
+        os.remove(SCHEMA_CACHE_FILE)
+        logging.info("次回の実行でデータベーススキーマを確認し直すよう、スキーマキャッシュを削除しました。")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"スキーマキャッシュ ({SCHEMA_CACHE_FILE}) の削除に失敗しました: {e}")
+
+async def load_database_schema(client: "AsyncClient", database_id: str, recheck: bool = False) -> tuple[dict | None, bool]:
+    """データベースのプロパティ情報と、それがキャッシュから得たものかを返す
+
+    有効なキャッシュがあれば Notion API を呼ばずにそれを使い、無い場合や recheck の場合は
+    ensure_database_schema でスキーマを確認・更新してからキャッシュする。
+    """
+    if not recheck:
+        db_properties = load_cached_schema(database_id)
+        if db_properties is not None:
+            logging.info(f"キャッシュ済みのデータベーススキーマを使用します ({len(db_properties)} 件のプロパティ)。")
+            return db_properties, True
+
+    from notion_updater.infrastructure import notion_api
+
+    db_properties = await notion_api.ensure_database_schema(client, database_id)
+    if db_properties is not None:
+        save_cached_schema(database_id, db_properties)
+    return db_properties, False